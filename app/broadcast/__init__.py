@@ -0,0 +1 @@
+"""Forecast broadcast module for pushing weather to many LINE users at once."""
@@ -0,0 +1,116 @@
+"""Broadcast database models and SQLAlchemy table definitions."""
+
+from datetime import UTC, datetime
+
+from sqlalchemy import (
+    Boolean,
+    CheckConstraint,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class BroadcastRun(Base):
+    """
+    Database model for forecast broadcast checkpoints.
+
+    One row per run key records the last recipient whose multicast chunk was
+    settled, so an interrupted run resumes after it instead of starting over.
+    """
+
+    __tablename__ = "broadcast_run"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    run_key: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    last_location_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    last_user_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    recipients_sent: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    recipients_failed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    started_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC))
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class BroadcastRecipient(Base):
+    """
+    Database model for the recipient snapshot of one forecast broadcast run.
+
+    Recipients are copied once when the run starts, with their multicast chunk
+    already assigned, so every attempt of the run walks the same chunks and
+    derives the same retry keys even after users subscribe or leave.
+    """
+
+    __tablename__ = "broadcast_recipient"
+
+    run_id: Mapped[int] = mapped_column(
+        ForeignKey("broadcast_run.id", ondelete="CASCADE"), primary_key=True
+    )
+    location_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    line_user_id: Mapped[str] = mapped_column(String, nullable=False)
+    chunk_index: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class SubscriptionRecipient(Base):
+    """
+    Database model for the recipient snapshot of one scheduled bucket shard.
+
+    The first attempt at a shard copies its subscribers here with their
+    multicast chunk assigned, so a retried shard walks the same chunks and
+    derives the same retry keys even after users subscribe or move.
+    """
+
+    __tablename__ = "subscription_recipient"
+
+    bucket_date: Mapped[str] = mapped_column(String(10), primary_key=True)
+    send_minute: Mapped[int] = mapped_column(Integer, primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True)
+    location_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    line_user_id: Mapped[str] = mapped_column(String, nullable=False)
+    chunk_index: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class ForecastSubscription(Base):
+    """
+    Database model for scheduled daily forecast subscriptions.
+
+    Each user can subscribe once per preset (``home`` or ``office``) and picks
+    the minute of the day, in Taiwan time, at which the forecast is pushed.
+    """
+
+    __tablename__ = "forecast_subscription"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
+    preset: Mapped[str] = mapped_column(String(10), nullable=False)
+    send_minute: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC))
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=lambda: datetime.now(UTC),
+        onupdate=lambda: datetime.now(UTC),
+    )
+
+    __table_args__ = (
+        CheckConstraint("preset IN ('home', 'office')", name="check_subscription_preset"),
+        CheckConstraint(
+            "send_minute >= 0 AND send_minute < 1440", name="check_subscription_send_minute"
+        ),
+        UniqueConstraint("user_id", "preset", name="unique_subscription_user_preset"),
+    )
+
+
+# Serves the scheduler's per-minute bucket lookup over active subscriptions.
+Index(
+    "ix_forecast_subscription_active_minute",
+    ForecastSubscription.send_minute,
+    postgresql_where=ForecastSubscription.is_active.is_(True),
+)
@@ -0,0 +1,358 @@
+"""
+Push scheduled daily forecasts for subscriptions due in each minute bucket.
+
+Subscriptions are bucketed by their ``send_minute`` (Taiwan time). Each bucket
+is split into shards by Location ID, and a worker claims a shard with a Redis
+lease before sending, so several workers or pods share a busy minute without
+sending twice. Within a shard, subscribers are grouped by the Location of their
+preset, so each forecast is fetched and rendered once per bucket.
+
+The first attempt at a shard copies its recipients into
+``subscription_recipient`` with their multicast chunk assigned, and every later
+attempt sends from that snapshot. Each chunk's retry key is derived from the
+bucket, its Location and its chunk index, so a retried chunk carries the same
+recipients under the same key even after users subscribe or move.
+
+A claimed shard keeps its lease for a day once every chunk was sent, and drops
+its snapshot. A shard with a failed chunk releases its lease, and a worker that
+dies mid-shard lets the short lease expire; either way the shard is retried by
+the next tick within the catch-up window, and multicast retry keys keep the
+repeated chunks from reaching users twice. Like the processing lock, leases
+fail open when Redis is unavailable, which suits single-worker deployments.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta, timezone
+from itertools import groupby
+
+from redis.exceptions import RedisError
+from sqlalchemy import ColumnElement, Select, case, delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.broadcast.models import ForecastSubscription, SubscriptionRecipient
+from app.broadcast.service import (
+    multicast_retry_key,
+    render_location_forecast,
+    send_multicast_chunk,
+)
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.redis_client import shared_redis
+from app.line.messaging import MULTICAST_MAX_RECIPIENTS, MulticastMessenger
+from app.user.models import User
+
+logger = logging.getLogger(__name__)
+SessionFactory = Callable[[], Session]
+
+TAIWAN_TZ = timezone(timedelta(hours=8))
+_DONE_TTL_SECONDS = 24 * 60 * 60
+
+
+@dataclass(frozen=True, slots=True)
+class SubscriptionBucket:
+    """Identify the subscriptions due at one minute of one Taiwan date."""
+
+    date: str
+    minute: int
+
+    @classmethod
+    def at(cls, moment: datetime) -> "SubscriptionBucket":
+        """Return the bucket containing an aware datetime."""
+        local = moment.astimezone(TAIWAN_TZ)
+        return cls(date=f"{local:%Y-%m-%d}", minute=local.hour * 60 + local.minute)
+
+    def lease_key(self, shard: int) -> str:
+        """Return the Redis lease key of one shard of this bucket."""
+        return f"forecast:bucket:{self.date}:{self.minute}:{shard}"
+
+
+@dataclass(frozen=True, slots=True)
+class ShardResult:
+    """Count the subscribers of one shard that were sent to or failed."""
+
+    sent: int = 0
+    failed: int = 0
+
+
+def due_buckets(now: datetime, catch_up_minutes: int) -> list[SubscriptionBucket]:
+    """List the current bucket and the missed ones in the catch-up window, oldest first."""
+    return [
+        SubscriptionBucket.at(now - timedelta(minutes=offset))
+        for offset in range(catch_up_minutes, -1, -1)
+    ]
+
+
+class BucketLeaseService:
+    """Claim bucket shards across workers with Redis leases (fail-open)."""
+
+    def __init__(self) -> None:
+        """Initialize the local record of shards this worker already sent."""
+        # Without Redis, this record alone keeps catch-up ticks from resending.
+        self._done: dict[str, float] = {}
+
+    def try_claim(self, key: str) -> bool:
+        """
+        Claim a shard for sending with a short lease.
+
+        Returns:
+            bool: True if this worker should send the shard
+        """
+        if key in self._done:
+            return False
+        redis_client = shared_redis.get_client()
+        if redis_client is None:
+            return True
+        try:
+            is_claimed = redis_client.set(
+                key, "sending", nx=True, ex=settings.FORECAST_SCHEDULER_LEASE_SECONDS
+            )
+        except RedisError as e:
+            shared_redis.record_failure()
+            logger.warning("Failed to claim forecast bucket lease, sending anyway: %s", e)
+            return True
+        shared_redis.record_success()
+        return bool(is_claimed)
+
+    def mark_done(self, key: str) -> None:
+        """Keep a sent shard's lease long enough that catch-up ticks skip it."""
+        now = time.monotonic()
+        self._done = {
+            done_key: done_at
+            for done_key, done_at in self._done.items()
+            if now - done_at < _DONE_TTL_SECONDS
+        }
+        self._done[key] = now
+        redis_client = shared_redis.get_client()
+        if redis_client is None:
+            return
+        try:
+            redis_client.set(key, "done", ex=_DONE_TTL_SECONDS)
+        except RedisError as e:
+            shared_redis.record_failure()
+            logger.warning("Failed to mark forecast bucket lease done: %s", e)
+            return
+        shared_redis.record_success()
+
+    def release(self, key: str) -> None:
+        """Drop a lease after a failed shard so another worker can retry it."""
+        redis_client = shared_redis.get_client()
+        if redis_client is None:
+            return
+        try:
+            redis_client.delete(key)
+        except RedisError as e:
+            shared_redis.record_failure()
+            logger.warning("Failed to release forecast bucket lease: %s", e)
+            return
+        shared_redis.record_success()
+
+
+def _shard_statement(minute: int, shard: int, shards: int) -> Select:
+    """Select one shard's distinct recipients for a minute with their preset Location."""
+    location_id = case(
+        (ForecastSubscription.preset == "home", User.home_location_id),
+        else_=User.work_location_id,
+    ).label("location_id")
+    return (
+        select(location_id, User.id.label("user_id"), User.line_user_id)
+        .select_from(ForecastSubscription)
+        .join(User, User.id == ForecastSubscription.user_id)
+        .where(
+            ForecastSubscription.is_active.is_(True),
+            ForecastSubscription.send_minute == minute,
+            User.is_active.is_(True),
+            location_id.is_not(None),
+            location_id % shards == shard,
+        )
+        .distinct()
+    )
+
+
+def _snapshot_filter(bucket: SubscriptionBucket, shard: int) -> tuple[ColumnElement[bool], ...]:
+    """Return the conditions selecting one shard's snapshot rows."""
+    return (
+        SubscriptionRecipient.bucket_date == bucket.date,
+        SubscriptionRecipient.send_minute == bucket.minute,
+        SubscriptionRecipient.shard == shard,
+    )
+
+
+def snapshot_shard(session: Session, bucket: SubscriptionBucket, shard: int, shards: int) -> None:
+    """
+    Copy a shard's recipients into its snapshot unless an earlier attempt did.
+
+    The chunk of each recipient is its position within its Location divided by
+    ``MULTICAST_MAX_RECIPIENTS``, so chunk indexes are fixed for every attempt.
+    Taking a snapshot also drops the ones left by buckets before yesterday.
+    """
+    if session.scalar(select(literal(1)).where(*_snapshot_filter(bucket, shard)).limit(1)):
+        return
+    yesterday = (date.fromisoformat(bucket.date) - timedelta(days=1)).isoformat()
+    session.execute(
+        delete(SubscriptionRecipient).where(SubscriptionRecipient.bucket_date < yesterday)
+    )
+    recipients = _shard_statement(bucket.minute, shard, shards).subquery()
+    position = (
+        func.row_number().over(partition_by=recipients.c.location_id, order_by=recipients.c.user_id)
+        - 1
+    )
+    session.execute(
+        insert(SubscriptionRecipient).from_select(
+            [
+                "bucket_date",
+                "send_minute",
+                "shard",
+                "location_id",
+                "user_id",
+                "line_user_id",
+                "chunk_index",
+            ],
+            select(
+                literal(bucket.date),
+                literal(bucket.minute),
+                literal(shard),
+                recipients.c.location_id,
+                recipients.c.user_id,
+                recipients.c.line_user_id,
+                position // MULTICAST_MAX_RECIPIENTS,
+            ),
+        )
+    )
+    session.commit()
+
+
+def _iter_shard_chunks(
+    session: Session, bucket: SubscriptionBucket, shard: int
+) -> Iterator[tuple[int, int, tuple[str, ...]]]:
+    """Yield each snapshot chunk of a shard as its Location, index and LINE user IDs."""
+    rows = session.execute(
+        select(
+            SubscriptionRecipient.location_id,
+            SubscriptionRecipient.chunk_index,
+            SubscriptionRecipient.line_user_id,
+        )
+        .where(*_snapshot_filter(bucket, shard))
+        .order_by(SubscriptionRecipient.location_id, SubscriptionRecipient.user_id)
+    ).all()
+    for (location_id, index), chunk_rows in groupby(
+        rows, key=lambda row: (row.location_id, row.chunk_index)
+    ):
+        yield location_id, index, tuple(row.line_user_id for row in chunk_rows)
+
+
+class ForecastScheduler:
+    """Send due subscription buckets, sharing shards with other workers."""
+
+    def __init__(
+        self,
+        messenger: MulticastMessenger,
+        *,
+        session_factory: SessionFactory | None = None,
+        leases: BucketLeaseService | None = None,
+    ) -> None:
+        """
+        Create a scheduler.
+
+        Args:
+            messenger: Thread-safe multicast adapter
+            session_factory: Session factory, defaults to the application's
+            leases: Shard lease service, defaults to Redis leases
+        """
+        self._messenger = messenger
+        self._session_factory = session_factory or SessionLocal
+        self._leases = leases or BucketLeaseService()
+
+    def send_shard(self, bucket: SubscriptionBucket, shard: int, shards: int) -> ShardResult:
+        """
+        Send one shard of a bucket, rendering each Location's forecast once.
+
+        A failed chunk does not stop the shard; the remaining chunks are still
+        sent and the failure is reported in the result. The shard's snapshot is
+        kept for the retry until every chunk was sent.
+
+        Returns:
+            ShardResult: Subscribers the forecast was sent to and failed for
+        """
+        sent = failed = 0
+        with self._session_factory() as session:
+            snapshot_shard(session, bucket, shard, shards)
+            for location_id, location_chunks in groupby(
+                _iter_shard_chunks(session, bucket, shard), key=lambda chunk: chunk[0]
+            ):
+                recipe = render_location_forecast(session, location_id)
+                if recipe is None:
+                    logger.warning("No forecast to push for location_id=%s", location_id)
+                    continue
+                for _, index, batch in location_chunks:
+                    retry_key = multicast_retry_key(
+                        "subscription", bucket.date, bucket.minute, location_id, index
+                    )
+                    result = send_multicast_chunk(self._messenger, batch, recipe, retry_key)
+                    if result.success:
+                        sent += len(batch)
+                    else:
+                        failed += len(batch)
+                        logger.warning(
+                            "Scheduled forecast chunk failed",
+                            extra={"location_id": location_id, "category": result.error_category},
+                        )
+            if not failed:
+                session.execute(
+                    delete(SubscriptionRecipient).where(*_snapshot_filter(bucket, shard))
+                )
+                session.commit()
+        return ShardResult(sent=sent, failed=failed)
+
+    def run_once(self, now: datetime | None = None) -> int:
+        """
+        Send every unclaimed shard of the due buckets.
+
+        A shard is marked done only when all its chunks were sent; otherwise its
+        lease is released so the next tick retries it.
+
+        Args:
+            now: Current time, defaults to the wall clock
+
+        Returns:
+            int: Number of subscribers this worker sent forecasts to
+        """
+        shards = settings.FORECAST_SCHEDULER_SHARDS
+        sent = 0
+        buckets = due_buckets(
+            now or datetime.now(UTC), settings.FORECAST_SCHEDULER_CATCH_UP_MINUTES
+        )
+        for bucket in buckets:
+            for shard in range(shards):
+                key = bucket.lease_key(shard)
+                if not self._leases.try_claim(key):
+                    continue
+                try:
+                    result = self.send_shard(bucket, shard, shards)
+                except Exception:
+                    logger.exception("Failed to send forecast bucket shard %s", key)
+                    self._leases.release(key)
+                    continue
+                sent += result.sent
+                if result.failed:
+                    logger.warning(
+                        "Forecast bucket shard %s failed for %s subscribers, releasing it",
+                        key,
+                        result.failed,
+                    )
+                    self._leases.release(key)
+                else:
+                    self._leases.mark_done(key)
+        return sent
+
+    def run_forever(self, stop: threading.Event) -> None:
+        """Run one tick shortly after every minute boundary until stopped."""
+        while not stop.is_set():
+            sent = self.run_once()
+            if sent:
+                logger.info("Scheduled forecasts sent to %s subscribers", sent)
+            now = datetime.now(UTC)
+            stop.wait(60 - now.second - now.microsecond / 1_000_000 + 1)
@@ -0,0 +1,354 @@
+"""
+Push the current forecast to every active user with a home Location.
+
+When a run starts, its recipients are copied into ``broadcast_recipient`` in
+``(home_location_id, id)`` order, each assigned to a LINE multicast chunk of up
+to 500 user IDs. The snapshot is streamed from a server-side cursor, so each
+Location's users arrive together. The forecast is rendered once per Location
+and sent with a bounded number of chunks in flight.
+
+Progress is checkpointed in ``broadcast_run`` after each chunk settles, in
+stream order, up to the first failed chunk. A run with failed chunks stays open;
+running it again resumes after the checkpoint and retries them. Every chunk
+carries a retry key derived from the run key, its Location and its index in the
+snapshot, so LINE drops chunks that were already accepted by an earlier attempt.
+"""
+
+import logging
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from itertools import groupby
+
+from sqlalchemy import Select, delete, func, insert, literal, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.broadcast.models import BroadcastRecipient, BroadcastRun
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.line.messaging import (
+    MULTICAST_MAX_RECIPIENTS,
+    MulticastMessenger,
+    ReplyRecipe,
+    SendErrorCategory,
+    SendResult,
+)
+from app.line.weather_presentation import build_forecast_broadcast
+from app.user.models import User
+from app.weather.workflow import load_location_forecast
+
+logger = logging.getLogger(__name__)
+SessionFactory = Callable[[], Session]
+
+# Failures worth another attempt; retry keys make the repeated multicast safe.
+_RETRYABLE_CATEGORIES = frozenset(
+    {SendErrorCategory.RATE_LIMITED, SendErrorCategory.LINE_API, SendErrorCategory.TRANSPORT}
+)
+_RETRY_KEY_NAMESPACE = uuid.UUID("6f1f3a52-3f0e-4c1b-9a51-4f7c7a1d2e60")
+
+
+@dataclass(frozen=True, slots=True)
+class BroadcastCursor:
+    """Identify a recipient position in the ``(home_location_id, id)`` stream."""
+
+    location_id: int
+    user_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class BroadcastChunk:
+    """Hold one multicast request's recipients and the cursor after them."""
+
+    location_id: int
+    index: int
+    line_user_ids: tuple[str, ...]
+    cursor: BroadcastCursor
+
+
+@dataclass(slots=True)
+class BroadcastSummary:
+    """Report the outcome of one broadcast run."""
+
+    run_key: str
+    recipients_sent: int = 0
+    recipients_failed: int = 0
+    recipients_skipped: int = 0
+    chunks_sent: int = 0
+    chunks_failed: int = 0
+    resumed: bool = False
+    already_completed: bool = False
+
+
+def snapshot_recipients(session: Session, run_id: int) -> None:
+    """
+    Copy the active users with a home Location into a run's recipient snapshot.
+
+    The chunk of each recipient is its position within its Location divided by
+    ``MULTICAST_MAX_RECIPIENTS``, so chunk indexes are fixed for the whole run.
+    The copy runs as one ``INSERT ... SELECT`` in the caller's transaction.
+
+    Args:
+        session: Session whose transaction also creates the run
+        run_id: Broadcast run the snapshot belongs to
+    """
+    position = func.row_number().over(partition_by=User.home_location_id, order_by=User.id) - 1
+    recipients = select(
+        literal(run_id),
+        User.home_location_id,
+        User.id,
+        User.line_user_id,
+        position // MULTICAST_MAX_RECIPIENTS,
+    ).where(User.is_active.is_(True), User.home_location_id.is_not(None))
+    session.execute(
+        insert(BroadcastRecipient).from_select(
+            ["run_id", "location_id", "user_id", "line_user_id", "chunk_index"], recipients
+        )
+    )
+
+
+def _recipient_statement(run_id: int, after: BroadcastCursor | None) -> Select:
+    """Select a run's snapshot recipients in keyset order after a cursor."""
+    statement = (
+        select(
+            BroadcastRecipient.location_id,
+            BroadcastRecipient.chunk_index,
+            BroadcastRecipient.user_id,
+            BroadcastRecipient.line_user_id,
+        )
+        .where(BroadcastRecipient.run_id == run_id)
+        .order_by(BroadcastRecipient.location_id, BroadcastRecipient.user_id)
+    )
+    if after is not None:
+        statement = statement.where(
+            tuple_(BroadcastRecipient.location_id, BroadcastRecipient.user_id)
+            > tuple_(literal(after.location_id), literal(after.user_id))
+        )
+    return statement
+
+
+def iter_broadcast_chunks(
+    session: Session, run_id: int, after: BroadcastCursor | None = None
+) -> Iterator[BroadcastChunk]:
+    """
+    Stream a run's snapshot recipients after a cursor as multicast chunks.
+
+    ``yield_per`` makes PostgreSQL drivers use a server-side cursor, so memory
+    stays bounded by the batch size regardless of the user count.
+
+    Args:
+        session: Session dedicated to the stream; committing it ends the cursor
+        run_id: Broadcast run whose snapshot is streamed
+        after: Resume position, or None to start from the first recipient
+
+    Yields:
+        BroadcastChunk: Up to ``MULTICAST_MAX_RECIPIENTS`` users of one Location
+    """
+    rows = session.execute(
+        _recipient_statement(run_id, after).execution_options(
+            yield_per=settings.BROADCAST_STREAM_BATCH_SIZE
+        )
+    )
+    for (location_id, index), chunk_rows in groupby(
+        rows, key=lambda row: (row.location_id, row.chunk_index)
+    ):
+        batch = list(chunk_rows)
+        yield BroadcastChunk(
+            location_id=location_id,
+            index=index,
+            line_user_ids=tuple(row.line_user_id for row in batch),
+            cursor=BroadcastCursor(location_id, batch[-1].user_id),
+        )
+
+
+def render_location_forecast(session: Session, location_id: int) -> ReplyRecipe | None:
+    """Render the broadcast recipe for one Location, or None without a forecast."""
+    result = load_location_forecast(session, location_id)
+    if result is None or result.selected_location is None:
+        return None
+    return build_forecast_broadcast(result.selected_location, result.forecast)
+
+
+def multicast_retry_key(*parts: object) -> str:
+    """Derive a stable multicast retry key (a UUID, as LINE requires) from its parts."""
+    return str(uuid.uuid5(_RETRY_KEY_NAMESPACE, ":".join(str(part) for part in parts)))
+
+
+def _retry_key(run_key: str, chunk: BroadcastChunk) -> str:
+    """Derive a chunk's retry key so a resumed run cannot double-send."""
+    return multicast_retry_key(run_key, chunk.location_id, chunk.index)
+
+
+def send_multicast_chunk(
+    messenger: MulticastMessenger,
+    line_user_ids: tuple[str, ...],
+    recipe: ReplyRecipe,
+    retry_key: str,
+) -> SendResult:
+    """Send one multicast chunk, retrying transient failures with exponential backoff."""
+    result = SendResult.failed(SendErrorCategory.INTERNAL)
+    for attempt in range(settings.BROADCAST_MAX_ATTEMPTS):
+        if attempt:
+            time.sleep(settings.BROADCAST_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+        result = messenger.multicast(line_user_ids, recipe, retry_key)
+        if result.success or result.error_category not in _RETRYABLE_CATEGORIES:
+            return result
+    return result
+
+
+def _start_run(session: Session, run_key: str) -> tuple[BroadcastRun, BroadcastCursor | None, bool]:
+    """
+    Load or create the checkpoint row and return its resume cursor.
+
+    A new run and its recipient snapshot are committed together. An existing
+    run starts a new attempt, so its failure count is reset.
+
+    Returns:
+        The run, its resume cursor, and whether the run already existed
+    """
+    run = session.scalars(select(BroadcastRun).where(BroadcastRun.run_key == run_key)).first()
+    if run is None:
+        run = BroadcastRun(run_key=run_key, recipients_sent=0, recipients_failed=0)
+        session.add(run)
+        session.flush()
+        snapshot_recipients(session, run.id)
+        session.commit()
+        return run, None, False
+    if run.completed_at is None:
+        run.recipients_failed = 0
+        session.commit()
+    if run.last_location_id is None or run.last_user_id is None:
+        return run, None, True
+    return run, BroadcastCursor(run.last_location_id, run.last_user_id), True
+
+
+class _Checkpointer:
+    """Settle in-flight chunks in stream order and persist the run's progress."""
+
+    def __init__(self, session: Session, run: BroadcastRun, summary: BroadcastSummary) -> None:
+        """Track pending chunks for one run."""
+        self._session = session
+        self._run = run
+        self._summary = summary
+        self._blocked = False
+        self.pending: deque[tuple[BroadcastChunk, Future[SendResult]]] = deque()
+
+    def settle_oldest(self) -> None:
+        """
+        Wait for the oldest in-flight chunk, then checkpoint after it.
+
+        After the first failed chunk the checkpoint stops advancing, so the
+        next attempt of the run starts from that chunk. Chunks sent after it are
+        repeated with the same retry key, which LINE reports as already accepted.
+        """
+        chunk, future = self.pending.popleft()
+        result = future.result()
+        recipients = len(chunk.line_user_ids)
+        if result.success:
+            self._summary.chunks_sent += 1
+            self._summary.recipients_sent += recipients
+            if not self._blocked:
+                self._run.recipients_sent += recipients
+                self.advance(chunk.cursor)
+            return
+
+        logger.warning(
+            "Broadcast chunk failed",
+            extra={"location_id": chunk.location_id, "category": result.error_category},
+        )
+        self._summary.chunks_failed += 1
+        self._summary.recipients_failed += recipients
+        self._run.recipients_failed += recipients
+        self._blocked = True
+        self._session.commit()
+
+    def skip(self, chunk: BroadcastChunk) -> None:
+        """Checkpoint after a chunk without a forecast if nothing is in flight."""
+        self._summary.recipients_skipped += len(chunk.line_user_ids)
+        if not self.pending and not self._blocked:
+            self.advance(chunk.cursor)
+
+    def advance(self, cursor: BroadcastCursor) -> None:
+        """Persist a cursor once every chunk before it has settled."""
+        self._run.last_location_id = cursor.location_id
+        self._run.last_user_id = cursor.user_id
+        self._session.commit()
+
+
+def run_forecast_broadcast(
+    messenger: MulticastMessenger,
+    run_key: str,
+    *,
+    session_factory: SessionFactory | None = None,
+    max_concurrency: int | None = None,
+) -> BroadcastSummary:
+    """
+    Push each home Location's forecast to its active users, resuming by run key.
+
+    Args:
+        messenger: Thread-safe multicast adapter
+        run_key: Identifies the run for checkpoints and retry keys, e.g. a date
+        session_factory: Session factory, defaults to the application's
+        max_concurrency: Multicast requests in flight, defaults to
+            BROADCAST_MAX_CONCURRENCY
+
+    Returns:
+        BroadcastSummary: Counts for the chunks processed by this call
+    """
+    factory = session_factory or SessionLocal
+    concurrency = max_concurrency or settings.BROADCAST_MAX_CONCURRENCY
+    summary = BroadcastSummary(run_key=run_key)
+
+    # The stream session holds the server-side cursor open, so checkpoints and
+    # forecast reads go through a second session that can commit freely.
+    with factory() as work_session, factory() as stream_session:
+        run, after, summary.resumed = _start_run(work_session, run_key)
+        if run.completed_at is not None:
+            summary.already_completed = True
+            return summary
+        checkpointer = _Checkpointer(work_session, run, summary)
+        location_id: int | None = None
+        recipe: ReplyRecipe | None = None
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for chunk in iter_broadcast_chunks(stream_session, run.id, after):
+                if chunk.location_id != location_id:
+                    location_id = chunk.location_id
+                    recipe = render_location_forecast(work_session, location_id)
+                if recipe is None:
+                    checkpointer.skip(chunk)
+                    continue
+
+                future = executor.submit(
+                    send_multicast_chunk,
+                    messenger,
+                    chunk.line_user_ids,
+                    recipe,
+                    _retry_key(run_key, chunk),
+                )
+                checkpointer.pending.append((chunk, future))
+                while len(checkpointer.pending) >= concurrency:
+                    checkpointer.settle_oldest()
+
+            while checkpointer.pending:
+                checkpointer.settle_oldest()
+
+        # A run with failed chunks stays open so running it again retries them.
+        if not summary.chunks_failed:
+            run.completed_at = datetime.now(UTC)
+            work_session.execute(
+                delete(BroadcastRecipient).where(BroadcastRecipient.run_id == run.id)
+            )
+            work_session.commit()
+
+    logger.info(
+        "Forecast broadcast %s finished: %s sent, %s failed, %s skipped",
+        run_key,
+        summary.recipients_sent,
+        summary.recipients_failed,
+        summary.recipients_skipped,
+    )
+    return summary
@@ -0,0 +1,69 @@
+"""Manage scheduled daily forecast subscriptions."""
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.broadcast.models import ForecastSubscription
+from app.user.models import User
+
+FORECAST_PRESETS = frozenset({"home", "office"})
+MINUTES_PER_DAY = 24 * 60
+
+
+def subscribe_forecast(session: Session, line_user_id: str, preset: str, send_minute: int) -> bool:
+    """
+    Create or update a user's daily forecast subscription for one preset.
+
+    Args:
+        session: Database session
+        line_user_id: LINE user ID of the subscriber
+        preset: ``home`` or ``office``
+        send_minute: Minute of the day in Taiwan time, 0 to 1439
+
+    Returns:
+        bool: True if saved, False if the user does not exist
+    """
+    if preset not in FORECAST_PRESETS:
+        raise ValueError("preset must be 'home' or 'office'")
+    if not 0 <= send_minute < MINUTES_PER_DAY:
+        raise ValueError("send_minute must be between 0 and 1439")
+
+    user_id = session.scalar(select(User.id).where(User.line_user_id == line_user_id))
+    if user_id is None:
+        return False
+
+    subscription = session.scalar(
+        select(ForecastSubscription).where(
+            ForecastSubscription.user_id == user_id, ForecastSubscription.preset == preset
+        )
+    )
+    if subscription is None:
+        session.add(ForecastSubscription(user_id=user_id, preset=preset, send_minute=send_minute))
+    else:
+        subscription.send_minute = send_minute
+        subscription.is_active = True
+    session.commit()
+    return True
+
+
+def unsubscribe_forecast(session: Session, line_user_id: str, preset: str) -> bool:
+    """
+    Deactivate a user's daily forecast subscription for one preset.
+
+    Returns:
+        bool: True if an active subscription was deactivated
+    """
+    subscription = session.scalar(
+        select(ForecastSubscription)
+        .join(User, User.id == ForecastSubscription.user_id)
+        .where(
+            User.line_user_id == line_user_id,
+            ForecastSubscription.preset == preset,
+            ForecastSubscription.is_active.is_(True),
+        )
+    )
+    if subscription is None:
+        return False
+    subscription.is_active = False
+    session.commit()
+    return True
@@ -0,0 +1,159 @@
+"""
+Cache of verified LINE access tokens.
+
+Verifying a LIFF access token takes two sequential calls to LINE (token verify
+and profile). This module remembers the LINE user ID of tokens that passed both
+calls, keyed by the SHA-256 hash of the token so raw tokens are never stored.
+Entries live in a bounded in-process LRU, optionally backed by Redis so workers
+share them.
+
+Consistency model:
+- An entry expires with its token (``expires_in``), capped by
+  ``ACCESS_TOKEN_CACHE_MAX_TTL_SECONDS``; a token revoked at LINE is accepted
+  for at most that long.
+- Only fully verified tokens are stored; any verification failure leaves the
+  cache untouched.
+- Redis failures are logged and ignored (fail-open), like the processing lock.
+
+The blocking Redis tier runs in a worker thread, so a slow Redis never stalls
+the event loop of the async token verification; local hits stay on the loop.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import cast
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis_client import shared_redis
+
+logger = logging.getLogger(__name__)
+
+
+def _token_digest(access_token: str) -> str:
+    """Hash an access token for use as a cache key."""
+    return hashlib.sha256(access_token.encode()).hexdigest()
+
+
+class AccessTokenCache:
+    """Two-tier cache of verified access tokens: in-process LRU with optional Redis."""
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _redis_key(digest: str) -> str:
+        """Build the Redis key for a cached token digest."""
+        return f"auth:access:{digest}"
+
+    async def get(self, access_token: str) -> str | None:
+        """
+        Get the LINE user ID of a previously verified token.
+
+        Args:
+            access_token: LINE access token from LIFF
+
+        Returns:
+            str | None: LINE user ID, or None when not cached
+        """
+        if not settings.ACCESS_TOKEN_CACHE_ENABLED:
+            return None
+
+        digest = _token_digest(access_token)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                line_user_id, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(digest)
+                    return line_user_id
+                del self._entries[digest]
+
+        if not settings.ACCESS_TOKEN_CACHE_REDIS_ENABLED:
+            return None
+        return await asyncio.to_thread(self._get_from_redis, digest)
+
+    async def set(self, access_token: str, line_user_id: str, expires_in: int) -> None:
+        """
+        Cache a token that passed verification.
+
+        Args:
+            access_token: LINE access token from LIFF
+            line_user_id: LINE user ID from the token's profile
+            expires_in: Remaining token lifetime reported by LINE, in seconds
+        """
+        if not settings.ACCESS_TOKEN_CACHE_ENABLED:
+            return
+        ttl_seconds = min(expires_in, settings.ACCESS_TOKEN_CACHE_MAX_TTL_SECONDS)
+        if ttl_seconds <= 0:
+            return
+
+        digest = _token_digest(access_token)
+        self._store_locally(digest, line_user_id, time.monotonic() + ttl_seconds)
+        if settings.ACCESS_TOKEN_CACHE_REDIS_ENABLED:
+            await asyncio.to_thread(self._set_in_redis, digest, line_user_id, ttl_seconds)
+
+    def clear(self) -> None:
+        """Drop every locally cached token."""
+        with self._lock:
+            self._entries.clear()
+
+    def _store_locally(self, digest: str, line_user_id: str, expires_at: float) -> None:
+        """Store an entry in the bounded in-process tier."""
+        with self._lock:
+            self._entries[digest] = (line_user_id, expires_at)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > settings.ACCESS_TOKEN_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _get_redis_client():  # noqa: ANN205 - optional redis.Redis client
+        """Get the shared Redis client when the Redis tier is enabled."""
+        if not settings.ACCESS_TOKEN_CACHE_REDIS_ENABLED:
+            return None
+        return shared_redis.get_client()
+
+    def _get_from_redis(self, digest: str) -> str | None:
+        """Load an entry from the shared Redis tier, keeping its remaining TTL locally."""
+        redis_client = self._get_redis_client()
+        if redis_client is None:
+            return None
+        try:
+            with redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(self._redis_key(digest))
+                pipe.ttl(self._redis_key(digest))
+                line_user_id, ttl_seconds = cast(list, pipe.execute())
+        except RedisError as e:
+            shared_redis.record_failure()
+            logger.warning("Failed to read verified access token from Redis: %s", e)
+            return None
+        shared_redis.record_success()
+        if not line_user_id or ttl_seconds <= 0:
+            return None
+        self._store_locally(digest, line_user_id, time.monotonic() + ttl_seconds)
+        return line_user_id
+
+    def _set_in_redis(self, digest: str, line_user_id: str, ttl_seconds: int) -> None:
+        """Store an entry in the shared Redis tier."""
+        redis_client = self._get_redis_client()
+        if redis_client is None:
+            return
+        try:
+            redis_client.set(self._redis_key(digest), line_user_id, ex=ttl_seconds)
+        except RedisError as e:
+            shared_redis.record_failure()
+            logger.warning("Failed to write verified access token to Redis: %s", e)
+            return
+        shared_redis.record_success()
+
+
+# Global instance - module-level singleton pattern
+access_token_cache = AccessTokenCache()
@@ -2,12 +2,21 @@
 Taiwan administrative divisions management.
 
 This module provides a singleton to load and validate Taiwan administrative divisions
-from the static JSON data file during application startup.
+from the static JSON data file, or from its compiled snapshot when one matches the
+file (see ``app.core.admin_divisions_snapshot``). The data is loaded by the
+application lifespan at startup, or on first validation when running outside the
+application.
 """
 
 import json
 import logging
-from pathlib import Path
+
+from app.core.admin_divisions_snapshot import (
+    ADMIN_DIVISIONS_JSON_PATH,
+    ADMIN_DIVISIONS_SNAPSHOT_PATH,
+    AdminDivisionsData,
+    load_snapshot,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +25,7 @@ class AdminDivisionsManager:
     """Singleton manager for Taiwan administrative divisions validation."""
 
     _instance = None
-    _valid_divisions: set[str] | None = None
+    _valid_divisions: frozenset[str] | None = None
 
     def __new__(cls) -> "AdminDivisionsManager":
         """Ensure singleton pattern."""
@@ -24,45 +33,48 @@ class AdminDivisionsManager:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self) -> None:
-        """Initialize the manager (only once due to singleton)."""
+    def ensure_loaded(self) -> None:
+        """Load the divisions data unless it is already loaded."""
         if self._valid_divisions is None:
             self._load_admin_divisions()
 
     def _load_admin_divisions(self) -> None:
         """
-        Load Taiwan administrative divisions from JSON file and build validation set.
+        Load Taiwan administrative divisions and build the validation set.
 
-        The JSON file contains county/city -> districts mapping.
-        We build a set of all valid full_name combinations (e.g., "臺北市信義區").
+        The compiled snapshot is used when it matches the JSON file's hash;
+        otherwise the JSON (county/city -> districts mapping) is parsed and the
+        set of all valid full_name combinations (e.g., "臺北市信義區") is built.
         """
         try:
-            # Path to the static data file
-            json_path = (
-                Path(__file__).parent.parent.parent / "static" / "data" / "tw_admin_divisions.json"
-            )
+            json_path = ADMIN_DIVISIONS_JSON_PATH
 
             if not json_path.exists():
-                logger.error(f"Admin divisions JSON file not found: {json_path}")
-                self._valid_divisions = set()
+                logger.error("Admin divisions JSON file not found: %s", json_path)
+                self._set_data(None)
                 return
 
-            with open(json_path, encoding="utf-8") as f:
-                admin_data = json.load(f)
+            with open(json_path, "rb") as f:
+                json_bytes = f.read()
 
-            # Build set of valid full names
-            valid_divisions = set()
-            for county_city, districts in admin_data.items():
-                for district in districts:
-                    full_name = f"{county_city}{district}"
-                    valid_divisions.add(full_name)
+            data = load_snapshot(json_bytes, ADMIN_DIVISIONS_SNAPSHOT_PATH)
+            source = "snapshot"
+            if data is None:
+                data = AdminDivisionsData.from_mapping(json.loads(json_bytes))
+                source = "JSON"
 
-            self._valid_divisions = valid_divisions
-            logger.info(f"Loaded {len(self._valid_divisions)} Taiwan administrative divisions")
+            self._set_data(data)
+            logger.info(
+                "Loaded %s Taiwan administrative divisions from %s", len(data.full_names), source
+            )
 
         except Exception:
             logger.exception("Failed to load admin divisions")
-            self._valid_divisions = set()
+            self._set_data(None)
+
+    def _set_data(self, data: AdminDivisionsData | None) -> None:
+        """Install loaded data, or empty data when loading failed."""
+        self._valid_divisions = data.full_names if data is not None else frozenset()
 
     def is_valid_division(self, full_name: str) -> bool:
         """
@@ -104,6 +116,7 @@ def is_valid_taiwan_division(full_name: str) -> bool:
     Returns:
         bool: True if valid Taiwan administrative division, False otherwise
     """
+    admin_divisions_manager.ensure_loaded()
     return admin_divisions_manager.is_valid_division(full_name)
 
 
@@ -112,9 +125,8 @@ def initialize_admin_divisions() -> None:
     Initialize the administrative divisions manager.
 
     This function should be called during application startup to ensure
-    the admin divisions data is loaded early.
+    the admin divisions data is loaded before the first request.
     """
-    global admin_divisions_manager
-    admin_divisions_manager = AdminDivisionsManager()
+    admin_divisions_manager.ensure_loaded()
     count = admin_divisions_manager.get_valid_divisions_count()
-    logger.info(f"Admin divisions manager initialized with {count} divisions")
+    logger.info("Admin divisions manager initialized with %s divisions", count)
@@ -0,0 +1,142 @@
+"""
+Compiled snapshot of the Taiwan administrative divisions data.
+
+Parsing ``tw_admin_divisions.json`` and rebuilding the full-name set on every
+worker start is avoidable work. A build step (``python -m
+app.core.admin_divisions_snapshot``, run by the Docker image build) compiles the
+parsed data into a versioned binary snapshot. Workers load it with a single
+``marshal`` read and fall back to the JSON file when the snapshot is missing,
+was written by another snapshot format or ``marshal`` version, or no longer
+matches the JSON's SHA-256 hash.
+
+Snapshot layout: an 8-byte magic, a header with the snapshot format version,
+the ``marshal`` version and the JSON hash, followed by the marshalled data.
+"""
+
+import hashlib
+import json
+import logging
+import marshal
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+ADMIN_DIVISIONS_JSON_PATH = (
+    Path(__file__).parent.parent.parent / "static" / "data" / "tw_admin_divisions.json"
+)
+ADMIN_DIVISIONS_SNAPSHOT_PATH = Path(__file__).parent / "data" / "tw_admin_divisions.snapshot"
+
+SNAPSHOT_FORMAT_VERSION = 2
+_MAGIC = b"WMADSNAP"
+# Format version, marshal version, SHA-256 digest of the source JSON.
+_HEADER = struct.Struct(">HH32s")
+
+
+@dataclass(frozen=True, slots=True)
+class AdminDivisionsData:
+    """Parsed administrative divisions ready for validation."""
+
+    full_names: frozenset[str]
+
+    @classmethod
+    def from_mapping(cls, admin_data: dict[str, list[str]]) -> "AdminDivisionsData":
+        """
+        Build the data from the JSON county/city -> districts mapping.
+
+        Args:
+            admin_data: Parsed ``tw_admin_divisions.json``
+
+        Returns:
+            AdminDivisionsData: Full names such as "臺北市信義區"
+        """
+        return cls(
+            full_names=frozenset(
+                f"{county}{district}"
+                for county, districts in admin_data.items()
+                for district in districts
+            )
+        )
+
+
+def _digest(json_bytes: bytes) -> bytes:
+    """Hash the source JSON the snapshot was compiled from."""
+    return hashlib.sha256(json_bytes).digest()
+
+
+def build_snapshot(json_bytes: bytes, snapshot_path: Path) -> AdminDivisionsData:
+    """
+    Compile the divisions JSON into a snapshot file.
+
+    The file is written next to its final path and renamed into place, so a
+    starting worker never reads a partial snapshot.
+
+    Args:
+        json_bytes: Contents of ``tw_admin_divisions.json``
+        snapshot_path: Where to write the snapshot
+
+    Returns:
+        AdminDivisionsData: The compiled data
+    """
+    data = AdminDivisionsData.from_mapping(json.loads(json_bytes))
+    payload = marshal.dumps((data.full_names,))
+    header = _HEADER.pack(SNAPSHOT_FORMAT_VERSION, marshal.version, _digest(json_bytes))
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = snapshot_path.with_name(f"{snapshot_path.name}.tmp")
+    temporary_path.write_bytes(_MAGIC + header + payload)
+    os.replace(temporary_path, snapshot_path)
+    return data
+
+
+def load_snapshot(json_bytes: bytes, snapshot_path: Path) -> AdminDivisionsData | None:
+    """
+    Load a snapshot compiled from exactly this JSON.
+
+    Args:
+        json_bytes: Current contents of ``tw_admin_divisions.json``
+        snapshot_path: Snapshot file to load
+
+    Returns:
+        AdminDivisionsData | None: The data, or None when the snapshot is
+        missing, stale, or unreadable and the JSON must be parsed instead
+    """
+    try:
+        with open(snapshot_path, "rb") as f:
+            snapshot = f.read()
+    except FileNotFoundError:
+        logger.info("Admin divisions snapshot not found: %s", snapshot_path)
+        return None
+
+    header_end = len(_MAGIC) + _HEADER.size
+    if not snapshot.startswith(_MAGIC) or len(snapshot) < header_end:
+        logger.warning("Ignoring unrecognized admin divisions snapshot: %s", snapshot_path)
+        return None
+    format_version, marshal_version, digest = _HEADER.unpack_from(snapshot, len(_MAGIC))
+    if (format_version, marshal_version) != (SNAPSHOT_FORMAT_VERSION, marshal.version):
+        logger.info("Admin divisions snapshot was built by another format version, ignoring it")
+        return None
+    if digest != _digest(json_bytes):
+        logger.info("Admin divisions snapshot is stale, ignoring it")
+        return None
+
+    try:
+        # The snapshot is a build artifact of this image, never external input.
+        payload = marshal.loads(snapshot[header_end:])  # noqa: S302
+        (full_names,) = payload
+    except (EOFError, ValueError, TypeError):
+        logger.warning("Ignoring corrupt admin divisions snapshot: %s", snapshot_path)
+        return None
+    return AdminDivisionsData(full_names)
+
+
+def main() -> None:
+    """Compile the bundled divisions JSON into the default snapshot path."""
+    json_bytes = ADMIN_DIVISIONS_JSON_PATH.read_bytes()
+    data = build_snapshot(json_bytes, ADMIN_DIVISIONS_SNAPSHOT_PATH)
+    print(f"Wrote {len(data.full_names)} divisions to {ADMIN_DIVISIONS_SNAPSHOT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,15 @@ This module provides utilities for verifying LINE tokens:
 - ID Token verification with signature (RS256/ES256) and audience checks using JWKS
 
 Notes:
-- JWKS are cached in-memory with TTL to reduce network calls and support key rotation.
+- Auth calls share the application-scoped pooled clients in ``app.core.http_client``.
+- Verified access tokens are cached by hash so repeat LIFF requests skip both LINE calls.
+- Signature-verified ID tokens are cached by hash until their `exp`.
+- JWKS are cached in-memory as parsed public keys with TTL to reduce network calls and
+  support key rotation; a lifespan task refreshes them ahead of expiry.
 - In production, signature verification must be enabled and `LINE_CHANNEL_ID` must be set.
 """
 
+import asyncio
 import base64
 import json
 import logging
@@ -22,18 +27,25 @@ import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+from app.core.access_token_cache import access_token_cache
 from app.core.config import settings
+from app.core.http_client import line_platform_http
+from app.core.id_token_cache import id_token_cache
 
 logger = logging.getLogger(__name__)
 
 # Constants for JWKS handling
 JWKS_URL = "https://api.line.me/oauth2/v2.1/certs"
+VERIFY_URL = "https://api.line.me/oauth2/v2.1/verify"
+PROFILE_URL = "https://api.line.me/v2/profile"
 JWKS_TTL_SECONDS = 24 * 60 * 60  # 24 hours
+JWKS_REFRESH_AHEAD_SECONDS = 60 * 60  # background refresh 1 hour before expiry
+JWKS_REFRESH_RETRY_SECONDS = 5 * 60
 HTTP_TIMEOUT_SECONDS = 5.0
 SUPPORTED_ALGS = ["RS256", "ES256"]
 
-# In-memory cache: (jwks_dict, fetched_at)
-_JWKS_CACHE: tuple[dict[str, dict], float] | None = None
+# In-memory cache: (public keys by kid, fetched_at); None marks an unusable JWK
+_JWKS_CACHE: tuple[dict[str, Any], float] | None = None
 _JWKS_LOCK = threading.Lock()
 
 
@@ -62,10 +74,9 @@ def _load_jwks_from_network() -> dict[str, dict]:
         httpx.RequestError: On network errors
         ValueError: If JWKS payload is invalid
     """
-    with httpx.Client(timeout=HTTP_TIMEOUT_SECONDS) as client:
-        resp = client.get(JWKS_URL)
-        resp.raise_for_status()
-        data = resp.json()
+    resp = line_platform_http.get_sync_client().get(JWKS_URL, timeout=HTTP_TIMEOUT_SECONDS)
+    resp.raise_for_status()
+    data = resp.json()
     keys = data.get("keys")
     if not isinstance(keys, list):
         raise TypeError("Invalid JWKS format: 'keys' not found")
@@ -77,19 +88,39 @@ def _load_jwks_from_network() -> dict[str, dict]:
     return by_kid
 
 
+def _parse_jwks(jwks_by_kid: dict[str, dict]) -> dict[str, Any]:
+    """
+    Convert JWKS to ready-to-use public keys, once per download.
+
+    Args:
+        jwks_by_kid: Mapping of `kid` to JWK dict
+
+    Returns:
+        Mapping of `kid` to public key object, or None for a JWK that cannot be used
+    """
+    keys: dict[str, Any] = {}
+    for kid, jwk in jwks_by_kid.items():
+        try:
+            keys[kid] = _public_key_from_jwk(jwk)
+        except Exception:  # noqa: BLE001
+            logger.exception("Failed to parse JWK for kid=%s", kid)
+            keys[kid] = None
+    return keys
+
+
 def _get_cached_jwks(
     force_refresh: bool = False,
     allow_stale_on_error: bool = True,
-) -> dict[str, dict]:
+) -> dict[str, Any]:
     """
-    Get JWKS with caching and optional stale-if-error behavior.
+    Get JWKS public keys with caching and optional stale-if-error behavior.
 
     Args:
         force_refresh: If True, fetch from network regardless of TTL
         allow_stale_on_error: If True, return cached data when network fails
 
     Returns:
-        Mapping of `kid` to JWK dict
+        Mapping of `kid` to public key object (None for an unusable JWK)
 
     Raises:
         HTTPException: 503 when network fails and no cache is available
@@ -108,7 +139,7 @@ def _get_cached_jwks(
 
     if need_refresh:
         try:
-            by_kid = _load_jwks_from_network()
+            by_kid = _parse_jwks(_load_jwks_from_network())
             # Update cache under lock to avoid race conditions in multi-thread contexts
             with _JWKS_LOCK:
                 _JWKS_CACHE = (by_kid, now)
@@ -136,7 +167,7 @@ def _get_cached_jwks(
     if _JWKS_CACHE is None:
         # Should not happen: when not refreshing and cache is None; safeguard
         try:
-            by_kid = _load_jwks_from_network()
+            by_kid = _parse_jwks(_load_jwks_from_network())
         except httpx.RequestError as e:  # pragma: no cover - defensive branch
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -148,6 +179,44 @@ def _get_cached_jwks(
     return _JWKS_CACHE[0]
 
 
+def _seconds_until_jwks_refresh() -> float:
+    """Return how long the background refresher should wait before its next check."""
+    if _JWKS_CACHE is None:
+        # Nothing to keep fresh until the first ID token loads JWKS
+        return JWKS_REFRESH_RETRY_SECONDS
+    _, fetched_at = _JWKS_CACHE
+    refresh_at = fetched_at + JWKS_TTL_SECONDS - JWKS_REFRESH_AHEAD_SECONDS
+    return max(0.0, refresh_at - time.time())
+
+
+def prefetch_jwks() -> None:
+    """Load JWKS ahead of the first ID token, so no request pays for the fetch."""
+    keys = _get_cached_jwks()
+    logger.info("Prefetched %s JWKS keys", len(keys))
+
+
+async def refresh_jwks_periodically() -> None:
+    """
+    Refresh cached JWKS ahead of expiry until cancelled.
+
+    Keeps ID token requests from fetching JWKS on the request path. A failed
+    refresh keeps the current keys (stale-if-error) and is retried later;
+    request-time refresh for expired caches and unknown `kid`s is unchanged.
+    """
+    while True:
+        await asyncio.sleep(_seconds_until_jwks_refresh())
+        if _JWKS_CACHE is None or _seconds_until_jwks_refresh() > 0:
+            continue
+        try:
+            await asyncio.to_thread(
+                _get_cached_jwks, force_refresh=True, allow_stale_on_error=False
+            )
+            logger.info("JWKS refreshed in background")
+        except HTTPException:
+            logger.warning("Background JWKS refresh failed, keeping cached keys")
+            await asyncio.sleep(JWKS_REFRESH_RETRY_SECONDS)
+
+
 def _public_key_from_jwk(jwk: dict) -> Any:  # noqa: ANN401 - PyJWT returns crypto key object
     """
     Convert a single JWK dict to a public key object usable by PyJWT.
@@ -186,21 +255,18 @@ def _get_signing_key_for_kid(kid: str) -> Any:  # noqa: ANN401 - crypto key
         HTTPException: 401 if kid not found; 503 if JWKS unavailable
     """
     jwks = _get_cached_jwks(force_refresh=False)
-    jwk = jwks.get(kid)
-    if jwk is None:
+    if kid not in jwks:
         # Try one refresh for rotation
         jwks = _get_cached_jwks(force_refresh=True)
-        jwk = jwks.get(kid)
-        if jwk is None:
+        if kid not in jwks:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unknown key id")
-    try:
-        return _public_key_from_jwk(jwk)
-    except Exception as e:  # noqa: BLE001
-        logger.exception("Failed to parse JWK for kid=%s", kid)
+    key = jwks[kid]
+    if key is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Unable to use JWKS key",
-        ) from e
+        )
+    return key
 
 
 async def verify_line_access_token(access_token: str) -> str:
@@ -216,51 +282,51 @@ async def verify_line_access_token(access_token: str) -> str:
     Raises:
         HTTPException: If token is invalid
     """
-    try:
-        # Verify access token using LINE Platform API
-        async with httpx.AsyncClient() as client:
-            verify_response = await client.get(
-                "https://api.line.me/oauth2/v2.1/verify",
-                params={"access_token": access_token},
-                timeout=10.0,
-            )
+    cached_line_user_id = await access_token_cache.get(access_token)
+    if cached_line_user_id is not None:
+        return cached_line_user_id
 
-            if verify_response.status_code != 200:
-                logger.warning(f"Token verification failed: {verify_response.status_code}")
-                raise ValueError("Access token verification failed")
+    try:
+        # Both calls only read from LINE, so the profile is fetched alongside
+        # verification; the user ID is still returned only after both checks pass.
+        client = line_platform_http.get_async_client()
+        verify_response, profile_response = await asyncio.gather(
+            client.get(VERIFY_URL, params={"access_token": access_token}),
+            client.get(PROFILE_URL, headers={"Authorization": f"Bearer {access_token}"}),
+            return_exceptions=True,
+        )
+        if isinstance(verify_response, BaseException):
+            raise verify_response
 
-            verify_data = verify_response.json()
+        if verify_response.status_code != 200:
+            logger.warning("Token verification failed: %s", verify_response.status_code)
+            raise ValueError("Access token verification failed")
 
-            # Check if the token is valid and matches our LIFF app
-            if not verify_data.get("client_id"):
-                raise ValueError("Invalid token response")
+        verify_data = verify_response.json()
 
-            expires_in = verify_data.get("expires_in", 0)
-            if expires_in <= 0:
-                raise ValueError("Token expired")
+        # Check if the token is valid and matches our LIFF app
+        if not verify_data.get("client_id"):
+            raise ValueError("Invalid token response")
 
-            logger.info(f"Access token verified successfully, expires in: {expires_in} seconds")
+        expires_in = verify_data.get("expires_in", 0)
+        if expires_in <= 0:
+            raise ValueError("Token expired")
 
-        # Get user profile using the access token
-        async with httpx.AsyncClient() as client:
-            profile_response = await client.get(
-                "https://api.line.me/v2/profile",
-                headers={"Authorization": f"Bearer {access_token}"},
-                timeout=10.0,
-            )
+        logger.info("Access token verified successfully, expires in: %s seconds", expires_in)
 
-            if profile_response.status_code != 200:
-                logger.warning(f"Profile retrieval failed: {profile_response.status_code}")
-                raise ValueError("Failed to retrieve user profile")
+        if isinstance(profile_response, BaseException):
+            raise profile_response
+        if profile_response.status_code != 200:
+            logger.warning("Profile retrieval failed: %s", profile_response.status_code)
+            raise ValueError("Failed to retrieve user profile")
 
-            profile_data = profile_response.json()
-            line_user_id = profile_data.get("userId")
+        profile_data = profile_response.json()
+        line_user_id = profile_data.get("userId")
 
-            if not line_user_id:
-                raise ValueError("No user ID in profile")
+        if not line_user_id:
+            raise ValueError("No user ID in profile")
 
-            logger.info("Access token verified successfully")
-            return line_user_id
+        logger.info("Access token verified successfully")
 
     except httpx.RequestError as e:
         logger.exception("Network error during token verification")
@@ -269,11 +335,14 @@ async def verify_line_access_token(access_token: str) -> str:
             detail="Unable to verify token due to network error",
         ) from e
     except Exception as e:
-        logger.warning(f"Token verification failed: {e}")
+        logger.warning("Token verification failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid LINE Access Token: {str(e)}",
         ) from e
+    else:
+        await access_token_cache.set(access_token, line_user_id, expires_in)
+        return line_user_id
 
 
 def verify_line_id_token(token: str) -> str:
@@ -402,7 +471,12 @@ def verify_line_id_token(token: str) -> str:
         logger.info("ID Token verified (lightweight, signature disabled)")
         return line_user_id
 
-    # Signature verification path
+    # Signature verification path: LIFF resends the same token until it expires
+    cached_line_user_id = id_token_cache.get(token, audience)
+    if cached_line_user_id is not None:
+        logger.debug("ID Token verified from cache")
+        return cached_line_user_id
+
     kid = header_data.get("kid")
     if not kid:
         raise HTTPException(
@@ -460,6 +534,9 @@ def verify_line_id_token(token: str) -> str:
     if len(line_user_id) != 33:
         logger.warning("Suspicious LINE user id length: %s", len(line_user_id))
     logger.info("ID Token verified successfully")
+    exp = decoded.get("exp")
+    if isinstance(exp, int | float):
+        id_token_cache.set(token, audience, line_user_id, exp)
     return line_user_id
 
 
@@ -0,0 +1,121 @@
+"""
+Circuit breaker for calls to shared infrastructure such as Redis.
+
+The breaker counts consecutive failures. At the threshold it opens, and callers
+skip the dependency entirely for a cooldown. After the cooldown a single probe
+call is let through (half-open): success closes the breaker, failure reopens it
+for another cooldown. Callers decide what skipping means; for the fail-open
+processing lock it means proceeding without a lock at no per-request cost.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from enum import StrEnum
+
+from app.core import metrics as core_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(StrEnum):
+    """Breaker states, valued by their metric label."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Thread-safe closed / open / half-open circuit breaker."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int,
+        cooldown_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Create a closed breaker.
+
+        Args:
+            name: Breaker name used in logs and metric labels
+            failure_threshold: Consecutive failures that open the breaker
+            cooldown_seconds: Time the breaker stays open before probing
+            clock: Monotonic clock, replaceable in tests
+        """
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at: float | None = None
+        core_metrics.record_circuit_state(name, CircuitState.CLOSED)
+
+    @property
+    def state(self) -> CircuitState:
+        """Return the current state."""
+        return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Decide whether the caller may use the dependency now.
+
+        Returns:
+            bool: False while open, and for all but one probe while half-open
+        """
+        with self._lock:
+            if self._state is CircuitState.CLOSED:
+                return True
+            now = self._clock()
+            if self._state is CircuitState.OPEN:
+                if now - self._opened_at < self._cooldown_seconds:
+                    return False
+                self._transition(CircuitState.HALF_OPEN)
+            # A probe that never reported back must not wedge the breaker half-open.
+            if (
+                self._probe_started_at is not None
+                and now - self._probe_started_at < self._cooldown_seconds
+            ):
+                return False
+            self._probe_started_at = now
+            return True
+
+    def record_success(self) -> None:
+        """Reset the failure count, closing the breaker after a successful probe."""
+        with self._lock:
+            self._failures = 0
+            if self._state is not CircuitState.CLOSED:
+                self._transition(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the breaker at the threshold or after a failed probe."""
+        with self._lock:
+            self._failures += 1
+            if self._state is CircuitState.HALF_OPEN or (
+                self._state is CircuitState.CLOSED and self._failures >= self._failure_threshold
+            ):
+                self._opened_at = self._clock()
+                self._transition(CircuitState.OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        """Move to a new state and record the transition. Caller holds the lock."""
+        previous = self._state
+        self._state = state
+        self._probe_started_at = None
+        core_metrics.record_circuit_transition(self.name, previous, state)
+        if state is CircuitState.OPEN:
+            logger.warning(
+                "Circuit breaker %s opened for %ss after %s failures",
+                self.name,
+                self._cooldown_seconds,
+                self._failures,
+            )
+        else:
+            logger.info("Circuit breaker %s moved from %s to %s", self.name, previous, state)
@@ -1,11 +1,15 @@
 """Application settings, environment variable management, and logging configuration."""
 
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from app.core.log_handlers import CompressedRotatingFileHandler, InfoRateLimitFilter
+
 # Base directory of the project (similar to Django's BASE_DIR)
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -29,9 +33,32 @@ class Settings(BaseSettings):
     # LINE Bot settings
     LINE_CHANNEL_SECRET: str
     LINE_CHANNEL_ACCESS_TOKEN: str
+    LINE_API_POOL_MAXSIZE: int = 10
+    LINE_API_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    LINE_API_READ_TIMEOUT_SECONDS: float = 10.0
+    # Outbound LINE API governor settings
+    LINE_OUTBOUND_GOVERNOR_ENABLED: bool = True
+    LINE_OUTBOUND_MAX_CONCURRENCY: int = 16
+    LINE_OUTBOUND_RATE_PER_SECOND: float = 500.0
+    LINE_OUTBOUND_BURST: int = 100
+    LINE_OUTBOUND_MAX_WAIT_SECONDS: float = 2.0
+    LINE_OUTBOUND_BACKOFF_SECONDS: float = 5.0
+    LINE_OUTBOUND_BACKOFF_MAX_SECONDS: float = 60.0
+    LINE_OUTBOUND_BACKOFF_RATE_FACTOR: float = 0.25
     # LINE Login settings
     LINE_CHANNEL_ID: str | None = None
     ENABLE_ID_TOKEN_SIGNATURE_VERIFICATION: bool = True
+    ID_TOKEN_CACHE_ENABLED: bool = True
+    ID_TOKEN_CACHE_MAX_ENTRIES: int = 10_000
+    ACCESS_TOKEN_CACHE_ENABLED: bool = True
+    ACCESS_TOKEN_CACHE_MAX_TTL_SECONDS: int = 300
+    ACCESS_TOKEN_CACHE_MAX_ENTRIES: int = 10_000
+    ACCESS_TOKEN_CACHE_REDIS_ENABLED: bool = False
+    LINE_AUTH_HTTP_TIMEOUT_SECONDS: float = 10.0
+    LINE_AUTH_HTTP_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    LINE_AUTH_HTTP_MAX_CONNECTIONS: int = 20
+    LINE_AUTH_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    LINE_AUTH_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
 
     # Application URL settings
     BASE_URL: str = "https://api.kyomind.tw"
@@ -39,7 +66,54 @@ class Settings(BaseSettings):
     # Processing lock settings
     PROCESSING_LOCK_ENABLED: bool = True
     PROCESSING_LOCK_TTL_SECONDS: int = 1
+    PROCESSING_LOCK_REDIS_MAX_CONNECTIONS: int = 50
+    PROCESSING_LOCK_REDIS_SOCKET_TIMEOUT_SECONDS: float = 0.2
+    PROCESSING_LOCK_REDIS_CONNECT_TIMEOUT_SECONDS: float = 0.2
+    PROCESSING_LOCK_REDIS_HEALTH_CHECK_INTERVAL_SECONDS: int = 30
+    PROCESSING_LOCK_BREAKER_FAILURE_THRESHOLD: int = 3
+    PROCESSING_LOCK_BREAKER_COOLDOWN_SECONDS: float = 30.0
     REDIS_URL: str | None = "redis://redis:6379/0"
+    SHARED_REDIS_SOCKET_TIMEOUT_SECONDS: float = 0.5
+    SHARED_REDIS_CONNECT_TIMEOUT_SECONDS: float = 0.5
+    SHARED_REDIS_BREAKER_FAILURE_THRESHOLD: int = 3
+    SHARED_REDIS_BREAKER_COOLDOWN_SECONDS: float = 30.0
+
+    # Startup warm-up and readiness settings
+    WARMUP_ENABLED: bool = True
+    WARMUP_DATABASE_CONNECTIONS: int = 2
+    WARMUP_HOT_FORECAST_LOCATIONS: int = 20
+    READINESS_CHECK_CACHE_SECONDS: float = 5.0
+
+    # Logging settings
+    LOG_FILE_MAX_BYTES: int = 20 * 1024 * 1024
+    LOG_FILE_BACKUP_COUNT: int = 10
+    LOG_INFO_RATE_PER_SECOND: float = 50.0
+    LOG_INFO_BURST: int = 200
+
+    # Per-user rate limit settings (requests per period, per event kind)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_TEXT_REQUESTS: int = 10
+    RATE_LIMIT_TEXT_PERIOD_SECONDS: float = 60.0
+    RATE_LIMIT_LOCATION_REQUESTS: int = 10
+    RATE_LIMIT_LOCATION_PERIOD_SECONDS: float = 60.0
+    RATE_LIMIT_POSTBACK_REQUESTS: int = 20
+    RATE_LIMIT_POSTBACK_PERIOD_SECONDS: float = 60.0
+
+    # User profile cache settings
+    USER_PROFILE_CACHE_ENABLED: bool = True
+    USER_PROFILE_CACHE_TTL_SECONDS: int = 30
+    USER_PROFILE_CACHE_MAX_ENTRIES: int = 10_000
+    USER_PROFILE_CACHE_REDIS_ENABLED: bool = False
+    USER_PROFILE_CACHE_REDIS_TTL_SECONDS: int = 3600
+
+    # Forecast broadcast settings
+    BROADCAST_MAX_CONCURRENCY: int = 4
+    BROADCAST_STREAM_BATCH_SIZE: int = 1000
+    BROADCAST_MAX_ATTEMPTS: int = 3
+    BROADCAST_RETRY_BACKOFF_SECONDS: float = 1.0
+    FORECAST_SCHEDULER_SHARDS: int = 4
+    FORECAST_SCHEDULER_LEASE_SECONDS: int = 300
+    FORECAST_SCHEDULER_CATCH_UP_MINUTES: int = 5
 
     @property
     def logs_dir(self) -> Path:
@@ -75,16 +149,15 @@ class Settings(BaseSettings):
 
 settings = Settings()  # type: ignore
 
+# Background writer and the queue handler feeding it, owned by setup_logging
+_log_listener: logging.handlers.QueueListener | None = None
+_queue_handler: logging.Handler | None = None
+
 
 def setup_logging() -> None:
     """Setup application logging configuration."""
-    # Determine log level based on environment and debug settings
-    if settings.DEBUG:
-        log_level = logging.DEBUG
-    elif settings.is_production:
-        log_level = logging.DEBUG
-    else:
-        log_level = logging.INFO
+    # DEBUG only when explicitly enabled; production logs at INFO
+    log_level = logging.DEBUG if settings.DEBUG else logging.INFO
 
     # Using log format with milliseconds for precise timing analysis
     # eg. "2025-09-14 05:48:16.123 INFO [app.module:line:123] Message processed"
@@ -94,17 +167,39 @@ def setup_logging() -> None:
     logs_dir = settings.logs_dir
     logs_dir.mkdir(exist_ok=True)
 
-    # Setup handlers: console and file
+    # Setup handlers: console and size-bounded file with compressed rotations
     console_handler = logging.StreamHandler(sys.stdout)
-    file_handler = logging.FileHandler(logs_dir / "app.log", encoding="utf-8")
+    file_handler = CompressedRotatingFileHandler(
+        logs_dir / "app.log",
+        maxBytes=settings.LOG_FILE_MAX_BYTES,
+        backupCount=settings.LOG_FILE_BACKUP_COUNT,
+        encoding="utf-8",
+    )
+    formatter = logging.Formatter(log_format, datefmt="%Y-%m-%d %H:%M:%S")
+    console_handler.setFormatter(formatter)
+    file_handler.setFormatter(formatter)
+
+    # Logging threads format each message and enqueue the record; a background
+    # thread applies the formatter and writes it, so file I/O stays off callers
+    global _log_listener, _queue_handler
+    stop_logging()
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    if settings.LOG_INFO_RATE_PER_SECOND > 0:
+        # The access log is one record per request and must stay complete
+        queue_handler.addFilter(
+            InfoRateLimitFilter(
+                settings.LOG_INFO_RATE_PER_SECOND,
+                settings.LOG_INFO_BURST,
+                exempt_loggers=("uvicorn.access",),
+            )
+        )
+    _log_listener = logging.handlers.QueueListener(log_queue, console_handler, file_handler)
+    _log_listener.start()
+    _queue_handler = queue_handler
 
     # Basic logging configuration
-    logging.basicConfig(
-        level=log_level,
-        format=log_format,
-        datefmt="%Y-%m-%d %H:%M:%S",
-        handlers=[console_handler, file_handler],
-    )
+    logging.basicConfig(level=log_level, handlers=[queue_handler])
 
     # Set SQLAlchemy logging level based on DEBUG setting
     if settings.DEBUG:
@@ -119,12 +214,26 @@ def setup_logging() -> None:
     uvicorn_logger.setLevel(logging.INFO)
     uvicorn_access_logger.setLevel(logging.INFO)
 
-    # Add file handler to uvicorn loggers so they also write to file
-    uvicorn_logger.addHandler(file_handler)
-    uvicorn_access_logger.addHandler(file_handler)
+    # Route uvicorn loggers through the queue so they also write to file
+    uvicorn_logger.addHandler(queue_handler)
+    uvicorn_access_logger.addHandler(queue_handler)
 
     # Log startup info
     logger = logging.getLogger(__name__)
-    logger.info(f"Logging configured for {settings.ENV} environment")
-    logger.info(f"Log level set to: {logging.getLevelName(log_level)}")
-    logger.info(f"Logs directory: {logs_dir}")
+    logger.info("Logging configured for %s environment", settings.ENV)
+    logger.info("Log level set to: %s", logging.getLevelName(log_level))
+    logger.info("Logs directory: %s", logs_dir)
+
+
+def stop_logging() -> None:
+    """Detach the queue handler and flush queued records through the background writer."""
+    global _log_listener, _queue_handler
+    if _queue_handler is not None:
+        for name in (None, "uvicorn", "uvicorn.access"):
+            logging.getLogger(name).removeHandler(_queue_handler)
+        _queue_handler = None
+    if _log_listener is not None:
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+        _log_listener = None
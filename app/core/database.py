@@ -1,8 +1,9 @@
 """Database connection and session management for the app."""
 
+import contextlib
 import typing
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -47,3 +48,19 @@ def get_session() -> typing.Generator[Session, None, None]:
         yield session
     finally:
         session.close()
+
+
+def warm_up_connections(count: int) -> None:
+    """
+    Open pool connections ahead of the first requests.
+
+    The connections are held at the same time, so the pool has to open that
+    many distinct ones, and are then returned to it for reuse.
+
+    Args:
+        count: Number of connections to open, at most the pool size
+    """
+    with contextlib.ExitStack() as stack:
+        for _ in range(count):
+            connection = stack.enter_context(engine.connect())
+            connection.execute(text("SELECT 1"))
@@ -0,0 +1,82 @@
+"""
+Application-scoped HTTP clients for LINE Platform auth calls.
+
+LIFF token verification and JWKS downloads used to open a new client, and so a
+new TLS connection, for every call. This module keeps one pooled client per
+calling style instead: an ``httpx.AsyncClient`` for the async access token
+checks and an ``httpx.Client`` for the JWKS download, which runs on the sync
+ID token path. Both keep connections to ``api.line.me`` alive between
+requests.
+
+The FastAPI lifespan starts the async client and closes both on shutdown.
+Outside the application (scripts, tests) they are created lazily on first use.
+"""
+
+import logging
+import threading
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _limits() -> httpx.Limits:
+    """Build the connection pool limits shared by both clients."""
+    return httpx.Limits(
+        max_connections=settings.LINE_AUTH_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LINE_AUTH_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.LINE_AUTH_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    """Build the default timeout shared by both clients."""
+    return httpx.Timeout(
+        settings.LINE_AUTH_HTTP_TIMEOUT_SECONDS,
+        connect=settings.LINE_AUTH_HTTP_CONNECT_TIMEOUT_SECONDS,
+    )
+
+
+class LinePlatformHttpClients:
+    """Own the pooled HTTP clients used for LINE Platform auth calls."""
+
+    def __init__(self) -> None:
+        """Initialize without creating any client."""
+        self._async_client: httpx.AsyncClient | None = None
+        self._sync_client: httpx.Client | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Create the async client ahead of the first request."""
+        self.get_async_client()
+        logger.info("LINE Platform HTTP client started")
+
+    def get_async_client(self) -> httpx.AsyncClient:
+        """Get the pooled async client, creating it on first use."""
+        with self._lock:
+            if self._async_client is None or self._async_client.is_closed:
+                self._async_client = httpx.AsyncClient(limits=_limits(), timeout=_timeout())
+            return self._async_client
+
+    def get_sync_client(self) -> httpx.Client:
+        """Get the pooled sync client, creating it on first use."""
+        with self._lock:
+            if self._sync_client is None or self._sync_client.is_closed:
+                self._sync_client = httpx.Client(limits=_limits(), timeout=_timeout())
+            return self._sync_client
+
+    async def aclose(self) -> None:
+        """Close both clients and their pooled connections."""
+        with self._lock:
+            async_client, self._async_client = self._async_client, None
+            sync_client, self._sync_client = self._sync_client, None
+        if async_client is not None:
+            await async_client.aclose()
+        if sync_client is not None:
+            sync_client.close()
+
+
+# Global instance - module-level singleton pattern
+line_platform_http = LinePlatformHttpClients()
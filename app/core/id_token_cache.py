@@ -0,0 +1,93 @@
+"""
+Cache of verified LINE ID tokens.
+
+LIFF resends the same ID token with every request until it expires, and each
+call to ``verify_line_id_token`` would otherwise repeat full signature
+verification. This module keeps the verified LINE user ID of each token in a
+bounded in-process LRU keyed by the SHA-256 hash of the token, until the
+token's ``exp``.
+
+Consistency model:
+- Entries record the audience they were verified against, so a changed
+  ``LINE_CHANNEL_ID`` never reuses a result verified for another channel.
+- Only tokens that passed verification are stored.
+- Entries are per process; workers verify a token once each.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+
+
+def _token_digest(token: str) -> str:
+    """Hash an ID token for use as a cache key."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class IdTokenCache:
+    """Bounded in-process LRU of verified ID tokens."""
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._entries: OrderedDict[str, tuple[str, str | None, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str, audience: str | None) -> str | None:
+        """
+        Get the LINE user ID of a token verified for the same audience.
+
+        Args:
+            token: LINE ID token from LIFF
+            audience: Audience the caller would verify against
+
+        Returns:
+            str | None: LINE user ID, or None when not cached
+        """
+        if not settings.ID_TOKEN_CACHE_ENABLED:
+            return None
+
+        digest = _token_digest(token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            line_user_id, verified_audience, exp = entry
+            if exp <= time.time():
+                del self._entries[digest]
+                return None
+            if verified_audience != audience:
+                return None
+            self._entries.move_to_end(digest)
+            return line_user_id
+
+    def set(self, token: str, audience: str | None, line_user_id: str, exp: float) -> None:
+        """
+        Cache a token that passed signature verification.
+
+        Args:
+            token: LINE ID token from LIFF
+            audience: Audience the token was verified against
+            line_user_id: The token's ``sub`` claim
+            exp: The token's ``exp`` claim, in Unix seconds
+        """
+        if not settings.ID_TOKEN_CACHE_ENABLED or exp <= time.time():
+            return
+
+        digest = _token_digest(token)
+        with self._lock:
+            self._entries[digest] = (line_user_id, audience, exp)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > settings.ID_TOKEN_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached token."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global instance - module-level singleton pattern
+id_token_cache = IdTokenCache()
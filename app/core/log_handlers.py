@@ -0,0 +1,139 @@
+"""
+Logging handlers and filters used by ``setup_logging``.
+
+Request threads only put records on a queue; a ``QueueListener`` thread
+formats them and writes them to stdout and to a size-bounded log file whose
+rotated copies are gzip-compressed. A per-logger rate limit keeps noisy INFO
+lines from flooding the queue, while warnings, errors, and exempt loggers such
+as the per-request access log always pass.
+"""
+
+import gzip
+import logging
+import os
+import shutil
+import threading
+import time
+from collections.abc import Callable, Collection
+from logging.handlers import RotatingFileHandler
+
+
+class CompressedRotatingFileHandler(RotatingFileHandler):
+    """
+    Size-rotating file handler that gzip-compresses rotated files.
+
+    Several uvicorn workers append to the same file. Before each write the
+    handler checks whether another worker already rotated the file and, if so,
+    reopens it instead of rotating a second time.
+    """
+
+    def __init__(self, filename: str | os.PathLike[str], **kwargs: object) -> None:
+        """
+        Open the log file.
+
+        Args:
+            filename: Path of the active log file
+            **kwargs: ``RotatingFileHandler`` options such as ``maxBytes``
+        """
+        super().__init__(filename, **kwargs)  # type: ignore[arg-type]
+        self.namer = self._gzip_name
+        self.rotator = self._gzip_rotate
+        self._file_id = self._stream_file_id()
+
+    @staticmethod
+    def _gzip_name(default_name: str) -> str:
+        """Name rotated files ``app.log.1.gz`` and so on."""
+        return f"{default_name}.gz"
+
+    @staticmethod
+    def _gzip_rotate(source: str, dest: str) -> None:
+        """Compress the file being rotated out and remove the original."""
+        with open(source, "rb") as plain, gzip.open(dest, "wb") as compressed:
+            shutil.copyfileobj(plain, compressed)
+        os.remove(source)
+
+    def _stream_file_id(self) -> tuple[int, int] | None:
+        """Return the device and inode of the open stream, if any."""
+        if self.stream is None:
+            return None
+        stat = os.fstat(self.stream.fileno())
+        return stat.st_dev, stat.st_ino
+
+    def _reopen_if_rotated(self) -> None:
+        """Follow a rotation done by another process."""
+        try:
+            stat = os.stat(self.baseFilename)
+            current_id: tuple[int, int] | None = (stat.st_dev, stat.st_ino)
+        except FileNotFoundError:
+            current_id = None
+        if self.stream is not None and current_id == self._file_id:
+            return
+        if self.stream is not None:
+            self.stream.close()
+        self.stream = self._open()
+        self._file_id = self._stream_file_id()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """Decide on rollover against the file currently on disk."""
+        self._reopen_if_rotated()
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        """Rotate, then remember the identity of the new file."""
+        super().doRollover()
+        self._file_id = self._stream_file_id()
+
+
+class InfoRateLimitFilter(logging.Filter):
+    """
+    Rate-limit INFO and lower records per logger with a token bucket.
+
+    Each logger may emit ``burst`` records at once and ``rate_per_second``
+    afterwards. WARNING and above, and records from exempt loggers, are never
+    limited. The first record let
+    through after a suppression notes how many records were dropped.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: int,
+        exempt_loggers: Collection[str] = (),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Create the filter.
+
+        Args:
+            rate_per_second: Sustained records per second per logger
+            burst: Records a logger may emit at once
+            exempt_loggers: Logger names whose records always pass
+            clock: Monotonic clock, replaceable in tests
+        """
+        super().__init__()
+        self._rate = rate_per_second
+        self._burst = burst
+        self._exempt_loggers = frozenset(exempt_loggers)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # logger name -> (tokens, last refill time, suppressed records)
+        self._buckets: dict[str, tuple[float, float, int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Let a record through unless its logger exceeded its INFO budget."""
+        if record.levelno > logging.INFO or record.name in self._exempt_loggers:
+            return True
+
+        with self._lock:
+            now = self._clock()
+            tokens, refilled_at, suppressed = self._buckets.get(record.name, (self._burst, now, 0))
+            tokens = min(self._burst, tokens + (now - refilled_at) * self._rate)
+            if tokens < 1:
+                self._buckets[record.name] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[record.name] = (tokens - 1, now, 0)
+
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar records suppressed)"
+            record.args = None
+        return True
@@ -0,0 +1,196 @@
+"""
+Prometheus metrics for shared core services, and rendering for ``/metrics``.
+
+With ``uvicorn --workers N`` every worker keeps its own values, so the default
+registry would expose whichever worker answered the scrape. Setting the
+``PROMETHEUS_MULTIPROC_DIR`` environment variable before the server starts
+switches ``prometheus_client`` to multiprocess mode: each worker writes its
+values to memory-mapped files in that directory, and ``/metrics`` aggregates
+the files of all workers. The directory must be emptied before the server
+starts (the production compose file mounts a fresh tmpfs). Every gauge declares
+how worker values combine through ``multiprocess_mode``.
+"""
+
+import logging
+import os
+import re
+from pathlib import Path
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+logger = logging.getLogger(__name__)
+
+MULTIPROCESS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+# Value files are named <type>[_<gauge mode>]_<pid>.db
+_VALUE_FILE_PID = re.compile(r"_(\d+)\.db$")
+
+processing_lock_duration_seconds = Histogram(
+    "processing_lock_duration_seconds",
+    "Round-trip time of processing lock acquisition against Redis in seconds.",
+    labelnames=("outcome",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5),
+)
+
+processing_lock_local_lookups_total = Counter(
+    "processing_lock_local_lookups_total",
+    "Processing lock lookups in the in-process tier; hits are saved Redis round trips.",
+    labelnames=("result",),
+)
+
+circuit_breaker_transitions_total = Counter(
+    "circuit_breaker_transitions_total",
+    "Total number of circuit breaker state transitions.",
+    labelnames=("breaker", "from_state", "to_state"),
+)
+
+circuit_breaker_state = Gauge(
+    "circuit_breaker_state",
+    "Current circuit breaker state: 0 closed, 1 half-open, 2 open.",
+    labelnames=("breaker",),
+    multiprocess_mode="livemax",
+)
+
+rate_limit_denied_total = Counter(
+    "rate_limit_denied_total",
+    "Total number of inbound events denied by the per-user rate limiter.",
+    labelnames=("kind",),
+)
+
+startup_phase_duration_seconds = Gauge(
+    "startup_phase_duration_seconds",
+    "Duration of each application startup phase in seconds, slowest live worker.",
+    labelnames=("phase",),
+    multiprocess_mode="livemax",
+)
+
+startup_duration_seconds = Gauge(
+    "startup_duration_seconds",
+    "Time from the start of the application lifespan until it was ready in seconds.",
+    multiprocess_mode="livemax",
+)
+
+_CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def record_lock_duration(outcome: str, duration_seconds: float) -> None:
+    """
+    Observe one processing lock round trip.
+
+    Args:
+        outcome: ``acquired``, ``denied``, or ``error``.
+        duration_seconds: Measured round-trip duration in seconds.
+    """
+    processing_lock_duration_seconds.labels(outcome=outcome).observe(duration_seconds)
+
+
+def record_local_lock_lookup(result: str) -> None:
+    """Count one in-process lock lookup, ``hit`` (Redis skipped) or ``miss``."""
+    processing_lock_local_lookups_total.labels(result=result).inc()
+
+
+def record_circuit_state(breaker: str, state: str) -> None:
+    """Set the state gauge of one circuit breaker."""
+    circuit_breaker_state.labels(breaker=breaker).set(_CIRCUIT_STATE_VALUES[state])
+
+
+def record_circuit_transition(breaker: str, from_state: str, to_state: str) -> None:
+    """
+    Count one circuit breaker state transition and update its state gauge.
+
+    Args:
+        breaker: Name of the circuit breaker.
+        from_state: ``closed``, ``open``, or ``half_open`` state being left.
+        to_state: State being entered.
+    """
+    circuit_breaker_transitions_total.labels(
+        breaker=breaker, from_state=from_state, to_state=to_state
+    ).inc()
+    record_circuit_state(breaker, to_state)
+
+
+def record_rate_limit_denied(kind: str) -> None:
+    """Count one event denied by the per-user rate limiter."""
+    rate_limit_denied_total.labels(kind=kind).inc()
+
+
+def record_startup_phase(phase: str, duration_seconds: float) -> None:
+    """Set the measured duration of one startup phase."""
+    startup_phase_duration_seconds.labels(phase=phase).set(duration_seconds)
+
+
+def record_startup_duration(duration_seconds: float) -> None:
+    """Set the measured time until the application was ready."""
+    startup_duration_seconds.set(duration_seconds)
+
+
+def multiprocess_dir() -> str | None:
+    """Return the shared metrics directory, or None in single-process mode."""
+    return os.environ.get(MULTIPROCESS_DIR_ENV) or None
+
+
+def render_latest() -> bytes:
+    """
+    Render all metrics in the Prometheus text format.
+
+    Returns:
+        bytes: This process's registry, or the aggregate of every worker's
+        value files in multiprocess mode
+    """
+    directory = multiprocess_dir()
+    if directory is None:
+        return generate_latest()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=directory)
+    return generate_latest(registry)
+
+
+def _process_exists(pid: int) -> bool:
+    """Check whether a process ID is still in use."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def cleanup_dead_workers() -> list[int]:
+    """
+    Drop the live gauge values of workers that exited without shutting down.
+
+    A worker that crashed or was killed never runs its lifespan shutdown, so
+    its ``live*`` gauge values would linger in the aggregate. Counter and
+    histogram files are kept so totals do not drop.
+
+    Returns:
+        list[int]: Process IDs of the dead workers that were cleaned up
+    """
+    directory = multiprocess_dir()
+    if directory is None:
+        return []
+    pids = {
+        int(match[1])
+        for path in Path(directory).glob("gauge_live*.db")
+        if (match := _VALUE_FILE_PID.search(path.name))
+    }
+    dead_pids = sorted(pid for pid in pids if not _process_exists(pid))
+    for pid in dead_pids:
+        multiprocess.mark_process_dead(pid, directory)
+    if dead_pids:
+        logger.info("Removed live metrics of dead workers: %s", dead_pids)
+    return dead_pids
+
+
+def mark_worker_stopped() -> None:
+    """Remove this worker's live gauge values on shutdown, in multiprocess mode."""
+    directory = multiprocess_dir()
+    if directory is not None:
+        multiprocess.mark_process_dead(os.getpid(), directory)
@@ -11,15 +11,23 @@ Key features:
 - Atomic lock acquisition using Redis SET NX EX command
 - Configurable TTL for automatic lock expiration
 - Graceful degradation when Redis is unavailable
+- A circuit breaker that skips Redis entirely for a cooldown during outages
+- An in-process first tier that denies locks this worker already holds
 - Support for LINE Bot webhook event sources
+- A bounded connection pool with socket and connect timeouts, so a slow Redis
+  costs at most the configured timeouts before the fail-open fallback
 """
 
 import logging
+import threading
+import time
 from typing import TYPE_CHECKING
 
 import redis
 from redis.exceptions import ConnectionError, RedisError
 
+from app.core import metrics as core_metrics
+from app.core.circuit_breaker import CircuitBreaker
 from app.core.config import settings
 
 if TYPE_CHECKING:
@@ -27,13 +35,68 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+_LOCAL_LOCK_MAX_ENTRIES = 10_000
+
+
+class _LocalLockTable:
+    """
+    Remember locks this worker acquired in Redis until their TTL runs out.
+
+    A key held here is also held in Redis, so a local hit can be denied without
+    a round trip. A miss says nothing about other workers and falls through to
+    Redis.
+    """
+
+    def __init__(self, max_entries: int = _LOCAL_LOCK_MAX_ENTRIES) -> None:
+        """Initialize an empty table."""
+        self._expires_at: dict[str, float] = {}
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def is_held(self, key: str) -> bool:
+        """Return True if this worker holds an unexpired lock on the key."""
+        with self._lock:
+            expires_at = self._expires_at.get(key)
+            if expires_at is None:
+                return False
+            if expires_at > time.monotonic():
+                return True
+            del self._expires_at[key]
+            return False
+
+    def hold(self, key: str, ttl_seconds: float) -> None:
+        """Record a lock acquired in Redis, pruning expired entries when full."""
+        now = time.monotonic()
+        with self._lock:
+            if len(self._expires_at) >= self._max_entries:
+                self._expires_at = {
+                    held_key: expires_at
+                    for held_key, expires_at in self._expires_at.items()
+                    if expires_at > now
+                }
+                if len(self._expires_at) >= self._max_entries:
+                    # Every entry is live; dropping the oldest only costs a round trip.
+                    del self._expires_at[next(iter(self._expires_at))]
+            self._expires_at[key] = now + ttl_seconds
+
 
 class ProcessingLockService:
     """Service for managing processing locks using Redis."""
 
-    def __init__(self) -> None:
-        """Initialize the processing lock service."""
+    def __init__(self, breaker: CircuitBreaker | None = None) -> None:
+        """
+        Initialize the processing lock service.
+
+        Args:
+            breaker: Circuit breaker guarding Redis, defaults to one built from settings
+        """
         self._redis_client: redis.Redis | None = None
+        self._local_locks = _LocalLockTable()
+        self._breaker = breaker or CircuitBreaker(
+            "processing_lock_redis",
+            failure_threshold=settings.PROCESSING_LOCK_BREAKER_FAILURE_THRESHOLD,
+            cooldown_seconds=settings.PROCESSING_LOCK_BREAKER_COOLDOWN_SECONDS,
+        )
 
     def _get_redis_client(self) -> redis.Redis | None:
         """Get Redis client connection."""
@@ -44,16 +107,35 @@ class ProcessingLockService:
         # Reuse existing connection if available
         if self._redis_client is None:
             try:
-                self._redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+                # Health checks verify idle pooled connections before they are reused
+                self._redis_client = redis.from_url(
+                    settings.REDIS_URL,
+                    decode_responses=True,
+                    max_connections=settings.PROCESSING_LOCK_REDIS_MAX_CONNECTIONS,
+                    socket_timeout=settings.PROCESSING_LOCK_REDIS_SOCKET_TIMEOUT_SECONDS,
+                    socket_connect_timeout=settings.PROCESSING_LOCK_REDIS_CONNECT_TIMEOUT_SECONDS,
+                    health_check_interval=settings.PROCESSING_LOCK_REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+                )
                 # Test connection to ensure Redis is reachable
                 self._redis_client.ping()
                 logger.info("Redis connection established for processing lock")
             except (ConnectionError, RedisError) as e:
-                logger.warning(f"Failed to connect to Redis, processing lock disabled: {e}")
+                logger.warning("Failed to connect to Redis, processing lock disabled: %s", e)
                 self._redis_client = None
+                self._breaker.record_failure()
 
         return self._redis_client
 
+    def warm_up(self) -> None:
+        """Connect to Redis ahead of the first lock."""
+        self._get_redis_client()
+
+    def close(self) -> None:
+        """Disconnect every pooled connection; a later lock reconnects."""
+        redis_client, self._redis_client = self._redis_client, None
+        if redis_client is not None:
+            redis_client.close()
+
     def try_acquire_lock(self, key: str) -> bool:
         """
         Try to acquire a processing lock with configurable TTL.
@@ -72,6 +154,18 @@ class ProcessingLockService:
         if not settings.PROCESSING_LOCK_ENABLED:
             return True
 
+        # Rapid repeats from one user usually reach the same worker: deny them locally
+        if self._local_locks.is_held(key):
+            core_metrics.record_local_lock_lookup("hit")
+            logger.debug("Processing lock held locally - another request is in progress")
+            return False
+        core_metrics.record_local_lock_lookup("miss")
+
+        # While the breaker is open, skip the connect attempt and its timeout entirely
+        if not self._breaker.allow_request():
+            logger.debug("Redis circuit open, allowing processing without lock")
+            return True
+
         redis_client = self._get_redis_client()
         if redis_client is None:
             # Fail-open strategy: prioritize service availability over duplicate prevention
@@ -79,22 +173,24 @@ class ProcessingLockService:
             logger.warning("Redis unavailable, allowing processing without lock")
             return True
 
+        started_at = time.perf_counter()
         try:
             # SET key 1 EX TTL NX - atomic operation with configurable TTL
             # Note: The value "1" is arbitrary - we only care about key existence
             ttl_seconds = settings.PROCESSING_LOCK_TTL_SECONDS
             is_lock_acquired = redis_client.set(key, "1", ex=ttl_seconds, nx=True)
-            if is_lock_acquired:
-                logger.debug(f"Processing lock acquired with {ttl_seconds}-second TTL")
-                return True
-            else:
-                logger.debug("Processing lock acquisition failed - another request is in progress")
-                return False
         except (ConnectionError, RedisError) as e:
-            logger.warning(f"Failed to acquire processing lock, allowing processing: {e}")
+            core_metrics.record_lock_duration("error", time.perf_counter() - started_at)
+            self._breaker.record_failure()
+            logger.warning("Failed to acquire processing lock, allowing processing: %s", e)
             # Fail-open strategy: continue processing despite Redis errors
             return True
 
+        self._breaker.record_success()
+        if is_lock_acquired:
+            self._local_locks.hold(key, ttl_seconds)
+        return _lock_result(bool(is_lock_acquired), ttl_seconds, started_at)
+
     def build_lock_key(self, source: "Source | None") -> str | None:
         """
         Build processing lock key from LINE event source.
@@ -124,6 +220,17 @@ class ProcessingLockService:
             return None
 
 
+def _lock_result(is_lock_acquired: bool, ttl_seconds: int, started_at: float) -> bool:
+    """Record the lock round trip and log its outcome."""
+    outcome = "acquired" if is_lock_acquired else "denied"
+    core_metrics.record_lock_duration(outcome, time.perf_counter() - started_at)
+    if is_lock_acquired:
+        logger.debug("Processing lock acquired with %s-second TTL", ttl_seconds)
+    else:
+        logger.debug("Processing lock acquisition failed - another request is in progress")
+    return is_lock_acquired
+
+
 # Global instance - module-level singleton pattern
 # This ensures consistent lock state across the application while
 # allowing Redis connection reuse and avoiding repeated initialization
@@ -0,0 +1,132 @@
+"""
+Per-user rate limiting for inbound LINE events.
+
+Each user gets an independent GCRA (generic cell rate algorithm) limit per
+event kind, evaluated by one Redis Lua script. GCRA stores a single
+theoretical arrival time per key, and admits a burst of the full limit
+followed by a steady rate of one request per ``period / limit``, so it
+behaves like a sliding window without keeping a log of timestamps.
+
+Like the processing lock, the limiter fails open: when Redis is not
+configured or fails, events are processed without a limit.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Literal, cast
+
+from redis.commands.core import Script
+from redis.exceptions import RedisError
+
+from app.core import metrics as core_metrics
+from app.core.config import settings
+from app.core.redis_client import shared_redis
+
+logger = logging.getLogger(__name__)
+
+type RateLimitKind = Literal["text", "location", "postback"]
+
+# KEYS[1]: theoretical arrival time of the user's next request
+# ARGV: emission interval in seconds, period in seconds
+# Returns {allowed, seconds until the next request is allowed}; floats as strings
+# because Redis truncates Lua numbers to integers.
+_GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local tat = math.max(tonumber(redis.call('GET', KEYS[1])) or now, now)
+local new_tat = tat + interval
+if new_tat - now > period then
+    return {0, tostring(new_tat - period - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, '0'}
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitDecision:
+    """Describe one rate limit check."""
+
+    allowed: bool
+    retry_after_seconds: float = 0.0
+
+
+def _limit_for(kind: RateLimitKind) -> tuple[int, float]:
+    """Return the configured request count and period of an event kind."""
+    match kind:
+        case "text":
+            return settings.RATE_LIMIT_TEXT_REQUESTS, settings.RATE_LIMIT_TEXT_PERIOD_SECONDS
+        case "location":
+            return (
+                settings.RATE_LIMIT_LOCATION_REQUESTS,
+                settings.RATE_LIMIT_LOCATION_PERIOD_SECONDS,
+            )
+        case "postback":
+            return (
+                settings.RATE_LIMIT_POSTBACK_REQUESTS,
+                settings.RATE_LIMIT_POSTBACK_PERIOD_SECONDS,
+            )
+
+
+class UserRateLimiter:
+    """Apply per-user, per-event-kind GCRA limits shared by all workers."""
+
+    def __init__(self) -> None:
+        """Initialize the limiter without touching Redis."""
+        self._script: Script | None = None
+        self._script_client: object | None = None
+        self._lock = threading.Lock()
+
+    def _get_script(self) -> Script | None:
+        """Register the GCRA script on the shared Redis client."""
+        redis_client = shared_redis.get_client()
+        if redis_client is None:
+            return None
+        with self._lock:
+            if self._script is None or self._script_client is not redis_client:
+                self._script = redis_client.register_script(_GCRA_SCRIPT)
+                self._script_client = redis_client
+            return self._script
+
+    def check(self, kind: RateLimitKind, user_id: str) -> RateLimitDecision:
+        """
+        Count one event against a user's limit.
+
+        Args:
+            kind: Event kind whose limit applies
+            user_id: LINE user ID
+
+        Returns:
+            RateLimitDecision: Whether to process the event
+        """
+        if not settings.RATE_LIMIT_ENABLED:
+            return RateLimitDecision(True)
+
+        script = self._get_script()
+        if script is None:
+            return RateLimitDecision(True)
+
+        requests, period = _limit_for(kind)
+        try:
+            allowed, retry_after = cast(
+                list[Any],
+                script(keys=[f"ratelimit:{kind}:{user_id}"], args=[period / requests, period]),
+            )
+        except RedisError as e:
+            shared_redis.record_failure()
+            logger.warning("Rate limit check failed, allowing processing: %s", e)
+            return RateLimitDecision(True)
+        shared_redis.record_success()
+
+        if allowed:
+            return RateLimitDecision(True)
+        core_metrics.record_rate_limit_denied(kind)
+        logger.info("Rate limited %s event from user", kind)
+        return RateLimitDecision(False, float(retry_after))
+
+
+# Global instance - module-level singleton pattern
+user_rate_limiter = UserRateLimiter()
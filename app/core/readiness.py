@@ -0,0 +1,118 @@
+"""
+Readiness reporting for load balancer and Kubernetes probes.
+
+``/health`` only says the process is alive. Readiness additionally requires the
+startup warm-up to have finished and the database to answer. Dependency checks
+are cached for ``READINESS_CHECK_CACHE_SECONDS`` so frequent probes from many
+sources cost at most one ``SELECT 1`` per interval per worker. Redis is
+reported but does not gate readiness, because every Redis feature fails open.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from redis.exceptions import RedisError
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.redis_client import shared_redis
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class ReadinessReport:
+    """Outcome of one readiness evaluation."""
+
+    ready: bool
+    checks: dict[str, str] = field(default_factory=dict)
+
+
+def _check_database() -> str:
+    """Run a trivial query on a pooled connection."""
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning("Readiness database check failed: %s", e)
+        return "error"
+    return "ok"
+
+
+def _check_redis() -> str:
+    """Ping the shared Redis client, if Redis is configured."""
+    if not settings.REDIS_URL:
+        return "disabled"
+    redis_client = shared_redis.get_client()
+    if redis_client is None:
+        return "unavailable"
+    try:
+        redis_client.ping()
+    except RedisError as e:
+        shared_redis.record_failure()
+        logger.warning("Readiness Redis check failed: %s", e)
+        return "unavailable"
+    shared_redis.record_success()
+    return "ok"
+
+
+class ReadinessProbe:
+    """Track warm-up completion and cache dependency checks."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Start in the not-warmed-up state.
+
+        Args:
+            clock: Monotonic clock, replaceable in tests
+        """
+        self._clock = clock
+        self._warm = False
+        self._cached: tuple[float, ReadinessReport] | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_warm(self) -> bool:
+        """Return whether the startup warm-up has finished."""
+        return self._warm
+
+    def mark_warm(self) -> None:
+        """Record that the startup warm-up has finished."""
+        self._warm = True
+
+    def reset(self) -> None:
+        """Return to the not-warmed-up state, e.g. on shutdown."""
+        with self._lock:
+            self._warm = False
+            self._cached = None
+
+    def check(self) -> ReadinessReport:
+        """
+        Evaluate readiness, reusing recent dependency checks.
+
+        Returns:
+            ReadinessReport: Not ready until warm-up finished and while the
+            database check fails
+        """
+        if not self._warm:
+            return ReadinessReport(False, {"warm_up": "pending"})
+
+        with self._lock:
+            now = self._clock()
+            if self._cached is not None:
+                checked_at, report = self._cached
+                if now - checked_at < settings.READINESS_CHECK_CACHE_SECONDS:
+                    return report
+
+            checks = {"warm_up": "done", "database": _check_database(), "redis": _check_redis()}
+            report = ReadinessReport(checks["database"] == "ok", checks)
+            self._cached = (now, report)
+            return report
+
+
+# Global instance - module-level singleton pattern
+readiness = ReadinessProbe()
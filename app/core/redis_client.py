@@ -0,0 +1,87 @@
+"""
+Shared Redis client for optional, fail-open features.
+
+Caches and other helpers that treat Redis as an optional accelerator share one
+lazily created client. Like the processing lock, every consumer must degrade
+gracefully: when Redis is not configured or unreachable the provider returns
+``None`` and callers fall back to their in-process behavior.
+
+Callers report each Redis command through ``record_success`` and
+``record_failure``. Consecutive failed connects and commands open a circuit
+breaker, and while it is open ``get_client`` returns ``None``, so during an
+outage requests skip Redis instead of each paying for a socket timeout.
+"""
+
+import logging
+
+import redis
+from redis.exceptions import ConnectionError, RedisError
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RedisClientProvider:
+    """Lazily create and reuse one Redis client for optional features."""
+
+    def __init__(self, breaker: CircuitBreaker | None = None) -> None:
+        """
+        Initialize the provider without connecting.
+
+        Args:
+            breaker: Circuit breaker guarding Redis, defaults to one built from settings
+        """
+        self._redis_client: redis.Redis | None = None
+        self._breaker = breaker or CircuitBreaker(
+            "shared_redis",
+            failure_threshold=settings.SHARED_REDIS_BREAKER_FAILURE_THRESHOLD,
+            cooldown_seconds=settings.SHARED_REDIS_BREAKER_COOLDOWN_SECONDS,
+        )
+
+    def get_client(self) -> redis.Redis | None:
+        """
+        Get the shared Redis client, connecting on first use.
+
+        Returns:
+            redis.Redis | None: Connected client, or None when Redis is not
+            configured, unreachable, or skipped by the open circuit breaker
+        """
+        if not settings.REDIS_URL:
+            return None
+
+        # While the breaker is open, skip Redis and its timeouts entirely
+        if not self._breaker.allow_request():
+            return None
+
+        if self._redis_client is None:
+            try:
+                client = redis.from_url(
+                    settings.REDIS_URL,
+                    decode_responses=True,
+                    socket_timeout=settings.SHARED_REDIS_SOCKET_TIMEOUT_SECONDS,
+                    socket_connect_timeout=settings.SHARED_REDIS_CONNECT_TIMEOUT_SECONDS,
+                )
+                client.ping()
+            except (ConnectionError, RedisError) as e:
+                logger.warning("Failed to connect to shared Redis: %s", e)
+                self._breaker.record_failure()
+                return None
+            self._breaker.record_success()
+            self._redis_client = client
+            logger.info("Shared Redis connection established")
+
+        return self._redis_client
+
+    def record_success(self) -> None:
+        """Report a Redis command that succeeded, closing the breaker after a probe."""
+        self._breaker.record_success()
+
+    def record_failure(self) -> None:
+        """Report a Redis command that failed, opening the breaker at the threshold."""
+        self._breaker.record_failure()
+
+
+# Global instance - module-level singleton pattern
+shared_redis = RedisClientProvider()
@@ -0,0 +1,235 @@
+"""
+In-memory, precompressed static asset serving.
+
+Every file under the static directory is read once, by the startup lifespan.
+Each asset keeps its identity bytes plus gzip and brotli variants, and a
+content-hash ETag. Requests are answered from memory with content negotiation
+and conditional GET (304), so hits cost no file I/O and no per-request
+compression.
+
+Caching policy:
+- A URL whose ``v`` query parameter equals the asset's content hash is a
+  versioned URL; its content can never change, so it is served with a
+  one-year ``immutable`` cache lifetime.
+- Any other URL is served with ``no-cache``: browsers revalidate with the ETag
+  and usually get an empty 304.
+- References to other assets are rewritten to versioned URLs at load time:
+  relative ``src``/``href`` attributes in HTML, and ``/static/...`` string
+  literals in JavaScript (such as the divisions data a page fetches). Pages
+  pick up new scripts, styles, and data without manual cache-busting.
+"""
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import posixpath
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import brotli
+from starlette.datastructures import Headers, QueryParams
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Relative src/href references (no scheme, no fragment); any existing query is replaced.
+_HTML_REFERENCE = re.compile(r'\b(?P<attr>src|href)="(?P<url>[^":?#]+)(?:\?[^"#]*)?"')
+# Quoted URLs below the static mount, optionally absolute; any existing query is replaced.
+_SCRIPT_REFERENCE = re.compile(
+    r"(?P<quote>['\"])(?P<prefix>(?:https?://[^/'\"]+)?/static/)(?P<path>[^'\"?#]+)"
+    r"(?:\?[^'\"#]*)?(?P=quote)"
+)
+_LOAD_ORDER = {".js": 1, ".html": 2}
+_MIN_COMPRESS_BYTES = 256
+
+
+@dataclass(frozen=True, slots=True)
+class StaticAsset:
+    """One static file held in memory with its precompressed variants."""
+
+    media_type: str
+    version: str
+    bodies: dict[str, bytes]
+
+    def etag(self, encoding: str) -> str:
+        """Return the strong ETag of one encoded representation."""
+        suffix = "" if encoding == "identity" else f"-{encoding}"
+        return f'"{self.version}{suffix}"'
+
+
+def _encode_variants(body: bytes) -> dict[str, bytes]:
+    """Precompress a body, keeping only variants smaller than the original."""
+    bodies = {"identity": body}
+    if len(body) < _MIN_COMPRESS_BYTES:
+        return bodies
+    candidates = {
+        "gzip": gzip.compress(body, compresslevel=9, mtime=0),
+        "br": brotli.compress(body, quality=11),
+    }
+    bodies.update(
+        (encoding, encoded) for encoding, encoded in candidates.items() if len(encoded) < len(body)
+    )
+    return bodies
+
+
+def _build_asset(path: str, body: bytes) -> StaticAsset:
+    """Build an in-memory asset from its final bytes."""
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    version = hashlib.sha256(body).hexdigest()[:16]
+    return StaticAsset(media_type=media_type, version=version, bodies=_encode_variants(body))
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    """Parse the encodings a client accepts, ignoring those with ``q=0``."""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        if coding and quality not in ("0", "0.0", "0.00", "0.000"):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticAssetStore:
+    """Hold every static asset in memory, keyed by its path below the static root."""
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self._assets: dict[str, StaticAsset] = {}
+
+    def load(self, directory: str | Path) -> None:
+        """
+        Read, version, and precompress every file below a directory.
+
+        Scripts are loaded after data files and HTML files last, so each file's
+        references can point at the versioned URLs of the assets it uses.
+
+        Args:
+            directory: Static root directory
+        """
+        root = Path(directory)
+        files = sorted(
+            (path for path in root.rglob("*") if path.is_file()),
+            key=lambda path: (_LOAD_ORDER.get(path.suffix, 0), path.as_posix()),
+        )
+        assets: dict[str, StaticAsset] = {}
+        for file_path in files:
+            relative_path = file_path.relative_to(root).as_posix()
+            body = file_path.read_bytes()
+            if file_path.suffix == ".html":
+                body = self._version_references(relative_path, body, assets)
+            elif file_path.suffix == ".js":
+                body = self._version_script_references(body, assets)
+            assets[relative_path] = _build_asset(relative_path, body)
+        self._assets = assets
+        logger.info("Loaded %s static assets into memory", len(assets))
+
+    @staticmethod
+    def _version_references(html_path: str, body: bytes, assets: dict[str, StaticAsset]) -> bytes:
+        """Point relative references in an HTML page at versioned URLs."""
+        base = posixpath.dirname(html_path)
+
+        def _replace(match: re.Match[str]) -> str:
+            url = match["url"]
+            asset = assets.get(posixpath.normpath(posixpath.join(base, url)))
+            if asset is None:
+                return match[0]
+            return f'{match["attr"]}="{url}?v={asset.version}"'
+
+        return _HTML_REFERENCE.sub(_replace, body.decode()).encode()
+
+    @staticmethod
+    def _version_script_references(body: bytes, assets: dict[str, StaticAsset]) -> bytes:
+        """Point ``/static/...`` string literals in a script at versioned URLs."""
+
+        def _replace(match: re.Match[str]) -> str:
+            asset = assets.get(match["path"])
+            if asset is None:
+                return match[0]
+            quote = match["quote"]
+            return f"{quote}{match['prefix']}{match['path']}?v={asset.version}{quote}"
+
+        return _SCRIPT_REFERENCE.sub(_replace, body.decode()).encode()
+
+    def get(self, path: str) -> StaticAsset | None:
+        """Return the asset at a path below the static root."""
+        return self._assets.get(path)
+
+
+def asset_response(asset: StaticAsset, scope: Scope) -> Response:
+    """
+    Build the response for one asset request.
+
+    Negotiates the smallest accepted encoding, answers matching
+    ``If-None-Match`` with 304, and picks the cache policy from the URL.
+
+    Args:
+        asset: Requested asset
+        scope: ASGI request scope
+
+    Returns:
+        Response: 200 with the encoded body, or 304 without one
+    """
+    request_headers = Headers(scope=scope)
+    accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+    encoding = min(
+        (name for name in asset.bodies if name == "identity" or name in accepted),
+        key=lambda name: len(asset.bodies[name]),
+    )
+    versioned = QueryParams(scope.get("query_string", b"")).get("v") == asset.version
+    headers = {
+        "ETag": asset.etag(encoding),
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if versioned else REVALIDATE_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags or tags & {asset.etag(name) for name in asset.bodies}:
+            return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(asset.bodies[encoding], media_type=asset.media_type, headers=headers)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """``StaticFiles`` that answers from a ``StaticAssetStore`` before touching disk."""
+
+    def __init__(self, *, directory: str | Path, store: StaticAssetStore, **kwargs: Any) -> None:  # noqa: ANN401
+        """
+        Mount a static directory served from a store.
+
+        The store is loaded separately, by the application lifespan; until then
+        every request falls back to disk.
+
+        Args:
+            directory: Static root directory
+            store: Store to serve from
+            **kwargs: Remaining ``StaticFiles`` options
+        """
+        super().__init__(directory=directory, **kwargs)
+        self._store = store
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        """Serve a loaded asset from memory, falling back to disk for anything else."""
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+        asset = self._store.get(Path(path).as_posix())
+        if asset is None:
+            return await super().get_response(path, scope)
+        return asset_response(asset, scope)
+
+
+# Global instance - module-level singleton pattern
+static_assets = StaticAssetStore()
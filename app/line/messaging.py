@@ -3,6 +3,9 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from enum import StrEnum
 from typing import Protocol
@@ -14,18 +17,27 @@ from linebot.v3.messaging import (
     LocationAction,
     MessageAction,
     MessagingApi,
+    MulticastRequest,
     QuickReply,
     QuickReplyItem,
-    ReplyMessageRequest,
     TextMessage,
     URIAction,
 )
 from linebot.v3.messaging.exceptions import ApiException
+from urllib3 import Timeout
 from urllib3.exceptions import HTTPError
 
+from app.line import metrics as line_metrics
+
 logger = logging.getLogger(__name__)
 
 _MAX_QUICK_REPLY_ITEMS = 13
+# LINE accepts at most this many user IDs per multicast request
+MULTICAST_MAX_RECIPIENTS = 500
+
+_LINE_API_HOST = "https://api.line.me"
+_REPLY_PATH = "/v2/bot/message/reply"
+_JSON_HEADERS = {"Accept": "application/json", "Content-Type": "application/json"}
 
 
 def _validate_text(value: str, field_name: str) -> None:
@@ -158,6 +170,49 @@ class SendResult:
         return cls(success=False, error_category=category)
 
 
+_RECIPE_TYPES: dict[type, str] = {
+    TextRecipe: "text",
+    MessageChoicesRecipe: "message_choices",
+    LocationRequestRecipe: "location_request",
+    UriChoicesRecipe: "uri_choices",
+}
+
+
+def record_reply_result(
+    recipe: ReplyRecipe, result: SendResult, started_at: float | None = None
+) -> SendResult:
+    """
+    Record a reply outcome in the LINE reply metrics and pass it through.
+
+    Args:
+        recipe: Recipe that was sent
+        result: Outcome of the reply attempt
+        started_at: ``time.perf_counter()`` value taken before the API call, or
+            None when the reply failed before reaching LINE
+
+    Returns:
+        SendResult: The given result, so adapters can ``return`` this call
+    """
+    outcome = "sent" if result.error_category is None else result.error_category.value
+    duration = None if started_at is None else time.perf_counter() - started_at
+    line_metrics.record_reply(_RECIPE_TYPES[type(recipe)], outcome, duration)
+    return result
+
+
+def record_reply_dropped(recipe: ReplyRecipe) -> SendResult:
+    """
+    Record a reply the outbound governor refused before calling LINE.
+
+    Args:
+        recipe: Recipe that was not sent
+
+    Returns:
+        SendResult: A rate-limited failure for the caller to return
+    """
+    line_metrics.record_reply(_RECIPE_TYPES[type(recipe)], "dropped", None)
+    return SendResult.failed(SendErrorCategory.RATE_LIMITED)
+
+
 class ReplyMessenger(Protocol):
     """Define the application seam for one LINE reply attempt."""
 
@@ -166,6 +221,24 @@ class ReplyMessenger(Protocol):
         raise NotImplementedError
 
 
+class MulticastMessenger(Protocol):
+    """Define the application seam for pushing one recipe to many users."""
+
+    def multicast(
+        self, user_ids: Sequence[str], recipe: ReplyRecipe, retry_key: str | None = None
+    ) -> SendResult:
+        """Push one recipe to at most ``MULTICAST_MAX_RECIPIENTS`` users."""
+        raise NotImplementedError
+
+
+class ClosableReplyMessenger(ReplyMessenger, Protocol):
+    """Define a reply seam that owns outbound connections released at shutdown."""
+
+    def close(self) -> None:
+        """Release pooled outbound connections."""
+        raise NotImplementedError
+
+
 @dataclass(frozen=True, slots=True)
 class SentReply:
     """Record one reply accepted by the in-memory adapter."""
@@ -174,12 +247,22 @@ class SentReply:
     recipe: ReplyRecipe
 
 
+@dataclass(frozen=True, slots=True)
+class SentMulticast:
+    """Record one multicast accepted by the in-memory adapter."""
+
+    user_ids: tuple[str, ...]
+    recipe: ReplyRecipe
+    retry_key: str | None
+
+
 @dataclass(slots=True)
 class InMemoryReplyMessenger:
     """Record recipes for tests without constructing LINE SDK object graphs."""
 
     failure_category: SendErrorCategory | None = None
     sent_replies: list[SentReply] = field(default_factory=list, init=False)
+    sent_multicasts: list[SentMulticast] = field(default_factory=list, init=False)
 
     def reply(self, reply_token: str | None, recipe: ReplyRecipe) -> SendResult:
         """Record a valid reply or return the configured failure."""
@@ -190,42 +273,166 @@ class InMemoryReplyMessenger:
         self.sent_replies.append(SentReply(reply_token=reply_token, recipe=recipe))
         return SendResult.sent()
 
+    def multicast(
+        self, user_ids: Sequence[str], recipe: ReplyRecipe, retry_key: str | None = None
+    ) -> SendResult:
+        """Record a valid multicast or return the configured failure."""
+        if not user_ids or len(user_ids) > MULTICAST_MAX_RECIPIENTS:
+            return SendResult.failed(SendErrorCategory.INVALID_REQUEST)
+        if self.failure_category is not None:
+            return SendResult.failed(self.failure_category)
+        self.sent_multicasts.append(
+            SentMulticast(user_ids=tuple(user_ids), recipe=recipe, retry_key=retry_key)
+        )
+        return SendResult.sent()
+
 
 class LineSdkReplyMessenger:
     """Translate recipes and contain the complete LINE SDK reply lifecycle."""
 
-    def __init__(self, access_token: str) -> None:
-        """Create an adapter configured with a LINE channel access token."""
+    def __init__(
+        self,
+        access_token: str,
+        *,
+        pool_maxsize: int = 10,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 10.0,
+        host: str | None = None,
+        ssl_ca_cert: str | None = None,
+    ) -> None:
+        """
+        Create an adapter configured with a LINE channel access token.
+
+        Args:
+            access_token: LINE channel access token
+            pool_maxsize: Maximum kept-alive connections to the Messaging API
+            connect_timeout: Seconds to wait for a connection to be established
+            read_timeout: Seconds to wait for the Messaging API response
+            host: Messaging API base URL override, e.g. for a local stand-in
+            ssl_ca_cert: CA bundle path used to verify an overridden host
+        """
         _validate_text(access_token, "access_token")
-        self._configuration = Configuration(access_token=access_token)
+        if pool_maxsize < 1:
+            raise ValueError("pool_maxsize must be at least 1")
+        self._configuration = Configuration(access_token=access_token, ssl_ca_cert=ssl_ca_cert)
+        self._host = host
+        self._configuration.connection_pool_maxsize = pool_maxsize
+        self._request_timeout = (connect_timeout, read_timeout)
+        self._reply_url = f"{host or _LINE_API_HOST}{_REPLY_PATH}"
+        self._reply_timeout = Timeout(connect=connect_timeout, read=read_timeout)
+        self._api_client: ApiClient | None = None
+        self._messaging_api: MessagingApi | None = None
+        self._client_lock = threading.Lock()
+
+    def _get_clients(self) -> tuple[ApiClient, MessagingApi]:
+        """Return the long-lived SDK clients, creating their connection pool on first use."""
+        with self._client_lock:
+            if self._api_client is None or self._messaging_api is None:
+                self._api_client = ApiClient(self._configuration)
+                self._messaging_api = MessagingApi(self._api_client)
+                if self._host:
+                    self._messaging_api.line_base_path = self._host
+            return self._api_client, self._messaging_api
+
+    def close(self) -> None:
+        """Close pooled connections; a later reply transparently opens a new pool."""
+        with self._client_lock:
+            api_client, self._api_client, self._messaging_api = self._api_client, None, None
+        if api_client is not None:
+            api_client.rest_client.pool_manager.clear()
+            api_client.close()
 
     def reply(self, reply_token: str | None, recipe: ReplyRecipe) -> SendResult:
         """Translate and send one recipe without leaking SDK exceptions."""
         if not reply_token:
             logger.warning("Cannot send LINE reply without a reply token")
+            return record_reply_result(recipe, SendResult.failed(SendErrorCategory.INVALID_REQUEST))
+
+        return self._send(reply_token, recipe)
+
+    def _send(self, reply_token: str, recipe: ReplyRecipe) -> SendResult:
+        """Post one serialized reply, classify the outcome, and record it."""
+        # reply_payload builds on the recipe types above, so it cannot be imported first.
+        from app.line.reply_payload import serialize_reply
+
+        # Only the API call is timed; serialization and pool setup are not latency.
+        started_at: float | None = None
+        try:
+            body = serialize_reply(reply_token, recipe)
+            api_client, _ = self._get_clients()
+            headers = {**api_client.default_headers, **_JSON_HEADERS}
+            started_at = time.perf_counter()
+            # The body skips SDK models: constant recipes are precompiled byte
+            # templates. The pooled urllib3 client is thread-safe and reuses
+            # kept-alive TLS connections. Reply tokens are single-use, so this
+            # adapter never retries a failed request.
+            response = api_client.rest_client.pool_manager.request(
+                "POST", self._reply_url, body=body, headers=headers, timeout=self._reply_timeout
+            )
+        except (HTTPError, OSError):
+            logger.exception("LINE reply failed during transport")
+            return record_reply_result(
+                recipe, SendResult.failed(SendErrorCategory.TRANSPORT), started_at
+            )
+        except Exception:
+            logger.exception("Unexpected failure while sending LINE reply")
+            return record_reply_result(
+                recipe, SendResult.failed(SendErrorCategory.INTERNAL), started_at
+            )
+
+        if not 200 <= response.status < 300:
+            category = self._classify_api_error(response.status)
+            logger.warning(
+                "LINE reply rejected by API",
+                extra={"category": category.value, "status_code": response.status},
+            )
+            return record_reply_result(recipe, SendResult.failed(category), started_at)
+
+        logger.info("LINE reply sent")
+        return record_reply_result(recipe, SendResult.sent(), started_at)
+
+    def multicast(
+        self, user_ids: Sequence[str], recipe: ReplyRecipe, retry_key: str | None = None
+    ) -> SendResult:
+        """
+        Push one recipe to up to ``MULTICAST_MAX_RECIPIENTS`` users in one request.
+
+        Unlike reply tokens, a multicast may be retried: LINE deduplicates
+        requests that carry the same retry key and answers 409 for a request it
+        already accepted, which is reported as sent.
+        """
+        if not user_ids or len(user_ids) > MULTICAST_MAX_RECIPIENTS:
+            logger.warning("Cannot send LINE multicast", extra={"recipients": len(user_ids)})
             return SendResult.failed(SendErrorCategory.INVALID_REQUEST)
 
         try:
-            request = self._build_request(reply_token, recipe)
-            # A fresh SDK client is intentionally scoped to each reply; reply tokens
-            # are single-use, so this adapter never retries a failed request.
-            with ApiClient(self._configuration) as api_client:
-                MessagingApi(api_client).reply_message(request)
+            request = MulticastRequest(
+                to=list(user_ids),
+                messages=[self._build_message(recipe)],
+                notificationDisabled=False,
+                customAggregationUnits=None,
+            )
+            _, messaging_api = self._get_clients()
+            messaging_api.multicast(
+                request, x_line_retry_key=retry_key, _request_timeout=self._request_timeout
+            )
         except ApiException as exc:
+            if exc.status == 409 and retry_key is not None:
+                logger.info("LINE multicast already accepted for retry key")
+                return SendResult.sent()
             category = self._classify_api_error(exc.status)
             logger.warning(
-                "LINE reply rejected by API",
+                "LINE multicast rejected by API",
                 extra={"category": category.value, "status_code": exc.status},
             )
             return SendResult.failed(category)
         except (HTTPError, OSError):
-            logger.exception("LINE reply failed during transport")
+            logger.exception("LINE multicast failed during transport")
             return SendResult.failed(SendErrorCategory.TRANSPORT)
         except Exception:
-            logger.exception("Unexpected failure while sending LINE reply")
+            logger.exception("Unexpected failure while sending LINE multicast")
             return SendResult.failed(SendErrorCategory.INTERNAL)
 
-        logger.info("LINE reply sent")
         return SendResult.sent()
 
     @staticmethod
@@ -240,7 +447,7 @@ class LineSdkReplyMessenger:
         return SendErrorCategory.LINE_API
 
     @staticmethod
-    def _build_request(reply_token: str, recipe: ReplyRecipe) -> ReplyMessageRequest:
+    def _build_message(recipe: ReplyRecipe) -> TextMessage:
         """Translate an application recipe into LINE SDK message models."""
         quick_reply: QuickReply | None = None
 
@@ -277,8 +484,4 @@ class LineSdkReplyMessenger:
                 ]
             )
 
-        return ReplyMessageRequest(
-            replyToken=reply_token,
-            messages=[TextMessage(text=recipe.text, quickReply=quick_reply, quoteToken=None)],
-            notificationDisabled=False,
-        )
+        return TextMessage(text=recipe.text, quickReply=quick_reply, quoteToken=None)
@@ -5,11 +5,12 @@ from collections.abc import Iterable
 from typing import Any
 
 from fastapi import Response
-from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram
 
-# This W7 MVP uses the default in-process registry to keep instrumentation minimal.
-# Cross-worker aggregation can be added later if the deployment moves to
-# Prometheus multiprocess mode.
+from app.core import metrics as core_metrics
+
+# Values are aggregated across uvicorn workers in Prometheus multiprocess mode;
+# see app.core.metrics.
 line_webhook_events_total = Counter(
     "line_webhook_events_total",
     "Total number of LINE webhook events received.",
@@ -35,15 +36,46 @@ line_webhook_event_duration_seconds = Histogram(
     buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
 )
 
+line_reply_total = Counter(
+    "line_reply_total",
+    "Total number of LINE reply attempts by recipe type and outcome.",
+    labelnames=("recipe_type", "outcome"),
+)
+
+line_reply_duration_seconds = Histogram(
+    "line_reply_duration_seconds",
+    "Duration of LINE Messaging API reply calls in seconds.",
+    labelnames=("recipe_type", "outcome"),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
+)
+
+line_outbound_in_flight = Gauge(
+    "line_outbound_in_flight",
+    "Number of LINE Messaging API calls currently in flight across live workers.",
+    multiprocess_mode="livesum",
+)
+
+line_outbound_tokens_remaining = Gauge(
+    "line_outbound_tokens_remaining",
+    "Tokens left in the outbound LINE Messaging API rate bucket after the last acquire.",
+    multiprocess_mode="mostrecent",
+)
+
+line_outbound_backoff_active = Gauge(
+    "line_outbound_backoff_active",
+    "Whether the outbound rate is reduced after a LINE 429 response (1) or not (0).",
+    multiprocess_mode="livemax",
+)
+
 
 def metrics_response() -> Response:
     """
-    Render the current Prometheus registry as an HTTP response.
+    Render the current Prometheus metrics, across workers, as an HTTP response.
 
     Returns:
         FastAPI response containing the Prometheus text exposition format.
     """
-    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    return Response(content=core_metrics.render_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
 def extract_event_types_from_body(body_text: str) -> list[str]:
@@ -187,3 +219,21 @@ def record_webhook_duration(event_types: Iterable[str], duration_seconds: float)
     """
     for event_type in event_types:
         line_webhook_event_duration_seconds.labels(event_type=event_type).observe(duration_seconds)
+
+
+def record_reply(recipe_type: str, outcome: str, duration_seconds: float | None) -> None:
+    """
+    Count one reply attempt and observe its Messaging API latency.
+
+    Args:
+        recipe_type: Reply recipe label such as ``text`` or ``message_choices``.
+        outcome: ``sent``, ``dropped`` when the outbound governor refused the
+            reply, or the SendErrorCategory value of the failure.
+        duration_seconds: Measured API call duration, or None when the reply was
+            rejected before any call was made.
+    """
+    line_reply_total.labels(recipe_type=recipe_type, outcome=outcome).inc()
+    if duration_seconds is not None:
+        line_reply_duration_seconds.labels(recipe_type=recipe_type, outcome=outcome).observe(
+            duration_seconds
+        )
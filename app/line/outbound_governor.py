@@ -0,0 +1,281 @@
+"""
+Shape outbound LINE Messaging API traffic across threads and workers.
+
+The governor combines two limits around every reply:
+- A per-process concurrency cap (bounded semaphore) on in-flight API calls
+- A token bucket shared by all workers through a Redis Lua script
+
+When LINE answers 429, the governor sets a shared backoff key in Redis. While
+the key exists, every worker refills the bucket at a reduced rate. Consecutive
+429s double the backoff window up to a maximum; a successful reply resets it.
+
+Like the processing lock, Redis is optional: when it is not configured or
+fails, each process falls back to an equivalent in-process bucket (fail-open).
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, cast
+
+from redis.commands.core import Script
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis_client import shared_redis
+from app.line import metrics as line_metrics
+from app.line.messaging import (
+    ClosableReplyMessenger,
+    ReplyRecipe,
+    SendErrorCategory,
+    SendResult,
+    record_reply_dropped,
+)
+
+logger = logging.getLogger(__name__)
+
+_BUCKET_KEY = "line:outbound:bucket"
+_BACKOFF_KEY = "line:outbound:backoff"
+
+# KEYS[1]: bucket hash, KEYS[2]: backoff marker
+# ARGV: capacity, refill rate per second, rate factor while backing off
+# Returns {allowed, tokens left, seconds until the next token, backing off};
+# floats as strings because Redis truncates Lua numbers to integers.
+_RATE_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local backoff = redis.call('EXISTS', KEYS[2])
+if backoff == 1 then
+    rate = rate * tonumber(ARGV[3])
+end
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens), tostring(wait), backoff}
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class TokenDecision:
+    """Describe one token bucket acquire attempt."""
+
+    allowed: bool
+    tokens_left: float
+    wait_seconds: float
+    backoff_active: bool = False
+
+
+class _LocalTokenBucket:
+    """In-process token bucket used when Redis is unavailable."""
+
+    def __init__(self) -> None:
+        """Initialize a bucket that starts full on first use."""
+        self._tokens: float | None = None
+        self._updated_at = time.monotonic()
+        self._backoff_until = 0.0
+        self._lock = threading.Lock()
+
+    def start_backoff(self, seconds: float) -> None:
+        """Reduce the refill rate for the given number of seconds."""
+        with self._lock:
+            self._backoff_until = time.monotonic() + seconds
+
+    def acquire(self, capacity: float, rate: float, backoff_factor: float) -> TokenDecision:
+        """Take one token if available, mirroring the Redis script."""
+        with self._lock:
+            now = time.monotonic()
+            backoff_active = now < self._backoff_until
+            if backoff_active:
+                rate *= backoff_factor
+            tokens = capacity if self._tokens is None else self._tokens
+            tokens = min(capacity, tokens + max(0.0, now - self._updated_at) * rate)
+            self._updated_at = now
+            if tokens >= 1:
+                self._tokens = tokens - 1
+                return TokenDecision(True, self._tokens, 0.0, backoff_active)
+            self._tokens = tokens
+            return TokenDecision(False, tokens, (1 - tokens) / rate, backoff_active)
+
+
+class OutboundGovernor:
+    """Apply the concurrency cap, shared token bucket, and adaptive 429 backoff."""
+
+    def __init__(self, max_concurrency: int | None = None) -> None:
+        """
+        Initialize the governor.
+
+        Args:
+            max_concurrency: In-flight call cap, defaults to LINE_OUTBOUND_MAX_CONCURRENCY
+        """
+        self._slots = threading.BoundedSemaphore(
+            max_concurrency or settings.LINE_OUTBOUND_MAX_CONCURRENCY
+        )
+        self._local_bucket = _LocalTokenBucket()
+        self._script: Script | None = None
+        self._script_client: object | None = None
+        self._backoff_seconds = settings.LINE_OUTBOUND_BACKOFF_SECONDS
+        self._lock = threading.Lock()
+
+    def _get_script(self) -> Script | None:
+        """Register the token bucket script on the shared Redis client."""
+        redis_client = shared_redis.get_client()
+        if redis_client is None:
+            return None
+        with self._lock:
+            if self._script is None or self._script_client is not redis_client:
+                self._script = redis_client.register_script(_RATE_BUCKET_SCRIPT)
+                self._script_client = redis_client
+            return self._script
+
+    def _try_acquire_token(self) -> TokenDecision:
+        """Take one token from the shared bucket, or the local one when Redis fails."""
+        capacity = settings.LINE_OUTBOUND_BURST
+        rate = settings.LINE_OUTBOUND_RATE_PER_SECOND
+        backoff_factor = settings.LINE_OUTBOUND_BACKOFF_RATE_FACTOR
+
+        script = self._get_script()
+        if script is None:
+            return self._local_bucket.acquire(capacity, rate, backoff_factor)
+        try:
+            allowed, tokens_left, wait_seconds, backoff_active = cast(
+                list[Any],
+                script(keys=[_BUCKET_KEY, _BACKOFF_KEY], args=[capacity, rate, backoff_factor]),
+            )
+        except RedisError as e:
+            shared_redis.record_failure()
+            logger.warning("Outbound token bucket unavailable in Redis, using local: %s", e)
+            return self._local_bucket.acquire(capacity, rate, backoff_factor)
+
+        shared_redis.record_success()
+        return TokenDecision(
+            bool(allowed), float(tokens_left), float(wait_seconds), bool(backoff_active)
+        )
+
+    def acquire_token(self) -> bool:
+        """
+        Wait for an outbound token, up to LINE_OUTBOUND_MAX_WAIT_SECONDS.
+
+        Returns:
+            bool: True when a token was taken, False when the wait budget ran out
+        """
+        deadline = time.monotonic() + settings.LINE_OUTBOUND_MAX_WAIT_SECONDS
+        while True:
+            decision = self._try_acquire_token()
+            line_metrics.line_outbound_tokens_remaining.set(decision.tokens_left)
+            # Clears the gauge once the backoff window has expired
+            line_metrics.line_outbound_backoff_active.set(int(decision.backoff_active))
+            if decision.allowed:
+                return True
+            if time.monotonic() + decision.wait_seconds > deadline:
+                return False
+            time.sleep(decision.wait_seconds)
+
+    def acquire_slot(self) -> bool:
+        """
+        Wait for an in-flight slot, up to LINE_OUTBOUND_MAX_WAIT_SECONDS.
+
+        Returns:
+            bool: True when a slot was taken and must be released
+        """
+        if not self._slots.acquire(timeout=settings.LINE_OUTBOUND_MAX_WAIT_SECONDS):
+            return False
+        line_metrics.line_outbound_in_flight.inc()
+        return True
+
+    def release_slot(self) -> None:
+        """Release an in-flight slot taken by ``acquire_slot``."""
+        line_metrics.line_outbound_in_flight.dec()
+        self._slots.release()
+
+    def record_result(self, result: SendResult) -> None:
+        """
+        Adapt the outbound rate to one reply outcome.
+
+        A 429 starts or extends the shared backoff window, doubling it for
+        consecutive rate-limited replies. Any other outcome resets the window
+        and clears the backoff gauge.
+
+        Args:
+            result: Outcome of one reply attempt
+        """
+        if result.error_category != SendErrorCategory.RATE_LIMITED:
+            with self._lock:
+                self._backoff_seconds = settings.LINE_OUTBOUND_BACKOFF_SECONDS
+            line_metrics.line_outbound_backoff_active.set(0)
+            return
+
+        with self._lock:
+            backoff_seconds = self._backoff_seconds
+            self._backoff_seconds = min(
+                backoff_seconds * 2, settings.LINE_OUTBOUND_BACKOFF_MAX_SECONDS
+            )
+        logger.warning("LINE API rate limited, reducing outbound rate for %ss", backoff_seconds)
+        line_metrics.line_outbound_backoff_active.set(1)
+        self._local_bucket.start_backoff(backoff_seconds)
+
+        redis_client = shared_redis.get_client()
+        if redis_client is None:
+            return
+        try:
+            redis_client.set(_BACKOFF_KEY, "1", px=int(backoff_seconds * 1000))
+        except RedisError as e:
+            shared_redis.record_failure()
+            logger.warning("Failed to share outbound backoff through Redis: %s", e)
+            return
+        shared_redis.record_success()
+
+
+class GovernedReplyMessenger:
+    """Wrap a reply messenger with the outbound governor."""
+
+    def __init__(self, inner: ClosableReplyMessenger, governor: OutboundGovernor) -> None:
+        """
+        Create a governed messenger.
+
+        Args:
+            inner: Messenger that performs the actual LINE API call
+            governor: Shared outbound governor
+        """
+        self._inner = inner
+        self._governor = governor
+
+    def reply(self, reply_token: str | None, recipe: ReplyRecipe) -> SendResult:
+        """Send one recipe once a concurrency slot and a rate token are available."""
+        if not settings.LINE_OUTBOUND_GOVERNOR_ENABLED or not reply_token:
+            return self._inner.reply(reply_token, recipe)
+
+        if not self._governor.acquire_slot():
+            logger.warning("LINE reply dropped: outbound concurrency limit reached")
+            return record_reply_dropped(recipe)
+        try:
+            if not self._governor.acquire_token():
+                logger.warning("LINE reply dropped: outbound rate limit reached")
+                return record_reply_dropped(recipe)
+            result = self._inner.reply(reply_token, recipe)
+        finally:
+            self._governor.release_slot()
+
+        self._governor.record_result(result)
+        return result
+
+    def close(self) -> None:
+        """Release the wrapped messenger's outbound connections."""
+        self._inner.close()
+
+
+# Global instance - module-level singleton pattern
+outbound_governor = OutboundGovernor()
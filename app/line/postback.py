@@ -17,13 +17,32 @@ from app.line.messaging import (
     UriChoice,
     UriChoicesRecipe,
 )
-from app.user.service import create_user_if_not_exists, get_recent_queries, get_user_by_line_id
+from app.line.reply_payload import precompile_reply
+from app.user.service import create_user_if_not_exists, get_recent_queries, get_user_profile
 from app.weather.workflow import query_preset
 
 from .weather_presentation import QueryKind, build_weather_reply
 
 logger = logging.getLogger(__name__)
-_LOCK_DENIED_RECIPE = TextRecipe("操作太過頻繁，請放慢腳步 ☕️")
+
+# Constant recipes are precompiled so transports only splice in the reply token
+_LOCK_DENIED_RECIPE = precompile_reply(TextRecipe("操作太過頻繁，請放慢腳步 ☕️"))
+_CURRENT_LOCATION_RECIPE = precompile_reply(
+    LocationRequestRecipe(text="請點擊地圖上任意位置，將為您查詢該地天氣", label="開啟地圖選擇")
+)
+_OTHER_MENU_RECIPE = precompile_reply(
+    UriChoicesRecipe(
+        text="請選擇想了解的資訊：",
+        choices=(
+            UriChoice("🔄 更新", "https://github.com/kyomind/WeaMind/blob/main/CHANGELOG.md"),
+            UriChoice("📖 使用說明", "https://github.com/kyomind/WeaMind/blob/main/README.md"),
+            UriChoice("ℹ️ 專案介紹", "https://api.kyomind.tw/static/about/index.html"),
+        ),
+    )
+)
+_NO_RECENT_QUERIES_RECIPE = precompile_reply(
+    TextRecipe("您還沒有查詢過其他地點的天氣\n\n試試看輸入地點名稱來查詢天氣吧！")
+)
 
 
 @dataclass(frozen=True)
@@ -123,9 +142,7 @@ def execute_postback(plan: PostbackPlan) -> ReplyRecipe:
             )
             return build_weather_reply(query_preset(action.user_id, action.location_type), kind)
         if isinstance(action, CurrentWeatherAction):
-            return LocationRequestRecipe(
-                text="請點擊地圖上任意位置，將為您查詢該地天氣", label="開啟地圖選擇"
-            )
+            return _CURRENT_LOCATION_RECIPE
         if isinstance(action, LocationSettingsAction):
             liff_url = f"{settings.BASE_URL}/static/liff/location/index.html"
             return TextRecipe(
@@ -135,18 +152,7 @@ def execute_postback(plan: PostbackPlan) -> ReplyRecipe:
         if isinstance(action, RecentQueriesAction):
             return _execute_recent_queries(action)
         if isinstance(action, OtherMenuAction):
-            return UriChoicesRecipe(
-                text="請選擇想了解的資訊：",
-                choices=(
-                    UriChoice(
-                        "🔄 更新", "https://github.com/kyomind/WeaMind/blob/main/CHANGELOG.md"
-                    ),
-                    UriChoice(
-                        "📖 使用說明", "https://github.com/kyomind/WeaMind/blob/main/README.md"
-                    ),
-                    UriChoice("ℹ️ 專案介紹", "https://api.kyomind.tw/static/about/index.html"),
-                ),
-            )
+            return _OTHER_MENU_RECIPE
         return action.recipe  # noqa: TRY300
     except Exception:
         logger.exception(
@@ -172,7 +178,7 @@ def _parse_data(raw_data: str) -> dict[str, str]:
 def _execute_recent_queries(action: RecentQueriesAction) -> ReplyRecipe:
     """Load query history and close its database session before returning a recipe."""
     with SessionLocal() as session:
-        user = get_user_by_line_id(session, action.user_id)
+        user = get_user_profile(session, action.user_id)
         if not user:
             user = create_user_if_not_exists(session, action.user_id)
         names = tuple(
@@ -180,7 +186,7 @@ def _execute_recent_queries(action: RecentQueriesAction) -> ReplyRecipe:
         )
 
     if not names:
-        return TextRecipe("您還沒有查詢過其他地點的天氣\n\n試試看輸入地點名稱來查詢天氣吧！")
+        return _NO_RECENT_QUERIES_RECIPE
     return MessageChoicesRecipe(
         text="最近查過的 5 個地點：",
         choices=tuple(MessageChoice(label=name, text=name) for name in names),
@@ -0,0 +1,105 @@
+"""
+Serialize reply recipes directly to Messaging API JSON without LINE SDK models.
+
+The output is byte-for-byte the body the LINE SDK sends for the same recipe
+(same key order, ``json.dumps`` defaults). ``LineSdkReplyMessenger`` posts it
+over the SDK's pooled connections instead of building SDK models for every
+reply. Constant recipes can be
+precompiled once into a byte template; serializing them then only splices in
+the JSON-encoded reply token.
+"""
+
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+from app.line.messaging import (
+    LocationRequestRecipe,
+    MessageChoicesRecipe,
+    ReplyRecipe,
+    UriChoicesRecipe,
+)
+
+_PLACEHOLDER = "\x00reply-token\x00"
+
+
+@dataclass(frozen=True, slots=True)
+class ReplyTemplate:
+    """Hold the JSON bytes surrounding the reply token of one constant recipe."""
+
+    prefix: bytes
+    suffix: bytes
+
+    def render(self, reply_token: str) -> bytes:
+        """Splice a JSON-encoded reply token into the template."""
+        return self.prefix + json.dumps(reply_token).encode() + self.suffix
+
+
+_templates: dict[ReplyRecipe, ReplyTemplate] = {}
+_templates_lock = threading.Lock()
+
+
+def _quick_reply_items(recipe: ReplyRecipe) -> list[dict[str, Any]] | None:
+    """Build Quick Reply items in the SDK's key order, or None for plain text."""
+    if isinstance(recipe, MessageChoicesRecipe):
+        actions = [
+            {"type": "message", "label": choice.label, "text": choice.text}
+            for choice in recipe.choices
+        ]
+    elif isinstance(recipe, LocationRequestRecipe):
+        actions = [{"type": "location", "label": recipe.label}]
+    elif isinstance(recipe, UriChoicesRecipe):
+        actions = [
+            {"type": "uri", "label": choice.label, "uri": choice.uri} for choice in recipe.choices
+        ]
+    else:
+        return None
+    return [{"action": action, "type": "action"} for action in actions]
+
+
+def _payload(reply_token: str, recipe: ReplyRecipe) -> dict[str, Any]:
+    """Build the reply request body as plain JSON-compatible data."""
+    message: dict[str, Any] = {"type": "text"}
+    items = _quick_reply_items(recipe)
+    if items is not None:
+        message["quickReply"] = {"items": items}
+    message["text"] = recipe.text
+    return {"replyToken": reply_token, "messages": [message], "notificationDisabled": False}
+
+
+def serialize_reply(reply_token: str, recipe: ReplyRecipe) -> bytes:
+    """
+    Serialize one reply request body, using a precompiled template when available.
+
+    Args:
+        reply_token: Single-use LINE reply token
+        recipe: Reply recipe to send
+
+    Returns:
+        bytes: JSON request body for the Messaging API reply endpoint
+    """
+    template = _templates.get(recipe)
+    if template is not None:
+        return template.render(reply_token)
+    return json.dumps(_payload(reply_token, recipe)).encode()
+
+
+def precompile_reply[RecipeT: ReplyRecipe](recipe: RecipeT) -> RecipeT:
+    """
+    Register a constant recipe so later serializations reuse its byte template.
+
+    Only recipes defined once at import time should be registered; dynamic
+    recipes would grow the template registry without bound.
+
+    Args:
+        recipe: Constant reply recipe
+
+    Returns:
+        The same recipe, so module constants can be declared in one expression
+    """
+    body = json.dumps(_payload(_PLACEHOLDER, recipe)).encode()
+    prefix, suffix = body.split(json.dumps(_PLACEHOLDER).encode(), 1)
+    with _templates_lock:
+        _templates[recipe] = ReplyTemplate(prefix=prefix, suffix=suffix)
+    return recipe
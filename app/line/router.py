@@ -76,7 +76,7 @@ async def line_webhook(
     body_as_text: str = body.decode("utf-8")
     event_types = line_metrics.extract_event_types_from_body(body_as_text)
     line_metrics.record_webhook_received(event_types)
-    logger.info(f"Received LINE webhook: length={len(body_as_text)} bytes")
+    logger.info("Received LINE webhook: length=%s bytes", len(body_as_text))
 
     # 5) Schedule actual handling; any exceptions are logged without impacting ACK
     def _process_webhook(body_text: str, signature: str, current_event_types: list[str]) -> None:
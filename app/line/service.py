@@ -2,6 +2,8 @@
 
 import logging
 import time
+from collections.abc import Iterable
+from contextvars import ContextVar
 
 from linebot.v3 import WebhookHandler
 from linebot.v3.exceptions import InvalidSignatureError
@@ -17,16 +19,23 @@ from linebot.v3.webhooks import (
 from app.core.config import settings
 from app.core.database import SessionLocal
 from app.core.processing_lock import processing_lock_service
+from app.core.rate_limiter import RateLimitKind, user_rate_limiter
 from app.line import metrics as line_metrics
-from app.user.service import create_user_if_not_exists, deactivate_user
+from app.user.service import (
+    create_user_if_not_exists,
+    create_users_if_not_exist,
+    deactivate_user,
+)
 from app.weather.workflow import query_shared_location, query_text
 
 from .messaging import (
+    ClosableReplyMessenger,
     LineSdkReplyMessenger,
     ReplyMessenger,
     ReplyRecipe,
     TextRecipe,
 )
+from .outbound_governor import GovernedReplyMessenger, outbound_governor
 from .postback import execute_postback, prepare_postback
 from .sdk_dispatch import LineSdkWebhookDispatcher
 from .weather_presentation import QueryKind, build_weather_reply
@@ -47,10 +56,69 @@ logger = logging.getLogger(__name__)
 
 # The SDK requires fixed decorated callbacks, while core handlers receive the
 # messenger explicitly. Production wrappers below close over this immutable root.
-production_reply_messenger = LineSdkReplyMessenger(settings.LINE_CHANNEL_ACCESS_TOKEN)
+# Every reply shares the process-wide outbound governor, which enforces the
+# concurrency cap and the Redis-coordinated token bucket across workers.
+production_reply_messenger: ClosableReplyMessenger = GovernedReplyMessenger(
+    LineSdkReplyMessenger(
+        settings.LINE_CHANNEL_ACCESS_TOKEN,
+        pool_maxsize=settings.LINE_API_POOL_MAXSIZE,
+        connect_timeout=settings.LINE_API_CONNECT_TIMEOUT_SECONDS,
+        read_timeout=settings.LINE_API_READ_TIMEOUT_SECONDS,
+    ),
+    outbound_governor,
+)
 webhook_handler = WebhookHandler(settings.LINE_CHANNEL_SECRET)
 webhook_dispatcher = LineSdkWebhookDispatcher(webhook_handler)
 
+# Users already created or reactivated by the batch upsert for the webhook being
+# dispatched; the follow handler skips its own write for them.
+_provisioned_follow_user_ids: ContextVar[frozenset[str]] = ContextVar(
+    "_provisioned_follow_user_ids", default=frozenset()
+)
+
+
+def _provision_follow_users(events: Iterable[object]) -> frozenset[str]:
+    """
+    Create or reactivate every followed user of a webhook batch in one upsert.
+
+    A single follow event is left to its handler, which costs the same one
+    statement. Users who also unfollow in the same webhook are left to their
+    handlers too, so follow and unfollow apply in event order. Failures are
+    logged and the handlers fall back to per-event upserts.
+
+    Args:
+        events: Parsed events of one webhook payload
+
+    Returns:
+        LINE user IDs that were provisioned by the batch upsert
+    """
+    events = list(events)
+    unfollowed_user_ids = {
+        user_id
+        for event in events
+        if isinstance(event, UnfollowEvent)
+        and (user_id := getattr(event.source, "user_id", None) if event.source else None)
+    }
+    user_ids = [
+        user_id
+        for event in events
+        if isinstance(event, FollowEvent)
+        and (user_id := getattr(event.source, "user_id", None) if event.source else None)
+        and user_id not in unfollowed_user_ids
+    ]
+    if len(set(user_ids)) < 2:
+        return frozenset()
+
+    try:
+        with SessionLocal() as session:
+            create_users_if_not_exist(session, user_ids)
+    except Exception:
+        logger.exception("Error provisioning follow event batch")
+        return frozenset()
+
+    logger.info("Provisioned %s followed users in one batch", len(set(user_ids)))
+    return frozenset(user_ids)
+
 
 def process_webhook_events(
     body_text: str,
@@ -90,22 +158,44 @@ def process_webhook_events(
         line_metrics.record_webhook_duration(event_types, time.perf_counter() - parse_start_time)
         raise
 
-    for event in payload.events:
-        event_type = line_metrics.normalize_runtime_event_type(event)
-        start_time = time.perf_counter()
-        try:
-            if webhook_dispatcher.dispatch(event, payload):
-                line_metrics.record_webhook_success([event_type])
-            else:
-                logger.info("No handler registered for LINE event")
-        except InvalidSignatureError:
-            line_metrics.record_webhook_error([event_type], "signature_error")
-            raise
-        except Exception:
-            line_metrics.record_webhook_error([event_type], "handler_error")
-            raise
-        finally:
-            line_metrics.record_webhook_duration([event_type], time.perf_counter() - start_time)
+    provisioned_token = _provisioned_follow_user_ids.set(_provision_follow_users(payload.events))
+    try:
+        for event in payload.events:
+            event_type = line_metrics.normalize_runtime_event_type(event)
+            start_time = time.perf_counter()
+            try:
+                if webhook_dispatcher.dispatch(event, payload):
+                    line_metrics.record_webhook_success([event_type])
+                else:
+                    logger.info("No handler registered for LINE event")
+            except InvalidSignatureError:
+                line_metrics.record_webhook_error([event_type], "signature_error")
+                raise
+            except Exception:
+                line_metrics.record_webhook_error([event_type], "handler_error")
+                raise
+            finally:
+                line_metrics.record_webhook_duration([event_type], time.perf_counter() - start_time)
+    finally:
+        _provisioned_follow_user_ids.reset(provisioned_token)
+
+
+_RATE_LIMITED_TEXT = "查詢太頻繁了，請稍等一下再試。"
+
+
+def _reply_if_rate_limited(
+    kind: RateLimitKind, user_id: str | None, reply_token: str, messenger: ReplyMessenger
+) -> bool:
+    """
+    Check a user's rate limit and reply with a notice when it is exceeded.
+
+    Returns:
+        bool: True if the event was rate limited and already answered
+    """
+    if not user_id or user_rate_limiter.check(kind, user_id).allowed:
+        return False
+    messenger.reply(reply_token, TextRecipe(_RATE_LIMITED_TEXT))
+    return True
 
 
 def handle_message_event(event: MessageEvent, messenger: ReplyMessenger) -> None:
@@ -127,15 +217,18 @@ def handle_message_event(event: MessageEvent, messenger: ReplyMessenger) -> None
     # Type assertion since webhook_handler decorator ensures this is TextMessageContent
     message = event.message
     if not isinstance(message, TextMessageContent):
-        logger.warning(f"Unexpected message type: {type(message)}")
+        logger.warning("Unexpected message type: %s", type(message))
+        return
+
+    user_id = getattr(event.source, "user_id", None) if event.source else None
+    if _reply_if_rate_limited("text", user_id, event.reply_token, messenger):
         return
 
     try:
-        user_id = getattr(event.source, "user_id", None) if event.source else None
         query_result = query_text(message.text, user_id)
         recipe: ReplyRecipe = build_weather_reply(query_result, QueryKind.TEXT)
     except Exception:
-        logger.exception(f"Unexpected error parsing location input: {message.text}")
+        logger.exception("Unexpected error parsing location input: %s", message.text)
         recipe = TextRecipe("系統暫時有點忙，請稍後再試一次。")
 
     messenger.reply(event.reply_token, recipe)
@@ -156,7 +249,7 @@ def handle_location_message_event(event: MessageEvent, messenger: ReplyMessenger
     # Type assertion since webhook_handler decorator ensures this is LocationMessageContent
     message = event.message
     if not isinstance(message, LocationMessageContent):
-        logger.warning(f"Unexpected message type: {type(message)}")
+        logger.warning("Unexpected message type: %s", type(message))
         return
 
     # Extract GPS coordinates and address information
@@ -168,8 +261,11 @@ def handle_location_message_event(event: MessageEvent, messenger: ReplyMessenger
     if address:
         logger.info("Location message includes address information")
 
+    user_id = getattr(event.source, "user_id", None) if event.source else None
+    if _reply_if_rate_limited("location", user_id, event.reply_token, messenger):
+        return
+
     try:
-        user_id = getattr(event.source, "user_id", None) if event.source else None
         query_result = query_shared_location(lat, lon, address, user_id)
         recipe: ReplyRecipe = build_weather_reply(query_result, QueryKind.SHARED_LOCATION)
         logger.info("Location query completed")
@@ -193,10 +289,11 @@ def handle_follow_event(event: FollowEvent, messenger: ReplyMessenger) -> None:
             logger.warning("Follow event without user_id")
             return
 
-        with SessionLocal() as session:
-            # Create user if not exists or reactivate if inactive
-            create_user_if_not_exists(session, user_id)
-            logger.info("User followed - user record created/activated")
+        if user_id not in _provisioned_follow_user_ids.get():
+            with SessionLocal() as session:
+                # Create user if not exists or reactivate if inactive
+                create_user_if_not_exists(session, user_id)
+        logger.info("User followed - user record created/activated")
 
         # Release the database connection before waiting on the LINE API.
         if event.reply_token:
@@ -263,6 +360,9 @@ def handle_postback_event(event: PostbackEvent, messenger: ReplyMessenger) -> No
             logger.warning("PostBack event without user_id")
             return
 
+        if _reply_if_rate_limited("postback", user_id, event.reply_token, messenger):
+            return
+
         plan = prepare_postback(event.postback.data, user_id)
         if plan.requires_lock and settings.PROCESSING_LOCK_ENABLED:
             lock_key = processing_lock_service.build_lock_key(event.source)
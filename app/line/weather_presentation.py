@@ -57,6 +57,20 @@ def build_weather_reply(result: WeatherQueryResult, kind: QueryKind) -> ReplyRec
     return TextRecipe(_reply_text(result, kind))
 
 
+def build_forecast_broadcast(
+    location: ResolvedLocation, forecast: tuple[ForecastData, ...]
+) -> ReplyRecipe | None:
+    """
+    Render the broadcast recipe for one Location, shared by all of its recipients.
+
+    Returns:
+        The forecast recipe, or None when there is no forecast worth pushing.
+    """
+    if not forecast:
+        return None
+    return TextRecipe(_format_forecast(location, forecast))
+
+
 def _multiple_locations_recipe(result: WeatherQueryResult) -> ReplyRecipe:
     """Offer Quick Reply choices when the candidate list is short enough."""
     locations = result.locations
@@ -1,33 +1,124 @@
 """FastAPI application entry point and router registration."""
 
+import asyncio
+import contextlib
 import logging
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
+from app.core import metrics as core_metrics
 from app.core.admin_divisions import initialize_admin_divisions
-from app.core.config import settings, setup_logging
+from app.core.auth import prefetch_jwks, refresh_jwks_periodically
+from app.core.config import settings, setup_logging, stop_logging
+from app.core.database import warm_up_connections
+from app.core.http_client import line_platform_http
+from app.core.processing_lock import processing_lock_service
+from app.core.readiness import readiness
+from app.core.redis_client import shared_redis
+from app.core.startup import StartupReport
+from app.core.static_assets import PrecompressedStaticFiles, static_assets
 from app.line import metrics as line_metrics
 from app.line.router import router as line_router
+from app.line.service import production_reply_messenger
 from app.user.router import router as user_router
-
-# Setup logging
-setup_logging()
-
-# Initialize administrative divisions data
-initialize_admin_divisions()
+from app.weather.workflow import preload_hot_forecasts
 
 # Get logger for this module
 logger = logging.getLogger(__name__)
 
+STATIC_DIR = "static"
+
+
+def _connect_redis() -> None:
+    """Connect the shared and processing lock Redis clients."""
+    shared_redis.get_client()
+    processing_lock_service.warm_up()
+
+
+async def _run_warm_up_step(startup: StartupReport, name: str, step: Callable[[], object]) -> None:
+    """Run one blocking warm-up step in a thread; a failure only costs its warmth."""
+    try:
+        with startup.phase(name):
+            await asyncio.to_thread(step)
+    except Exception:
+        logger.exception("Warm-up step %s failed, continuing", name)
+
+
+async def warm_up(startup: StartupReport) -> None:
+    """
+    Pay first-request costs ahead of traffic, then report the worker ready.
+
+    Runs after the lifespan has started serving, so ``/health`` answers while
+    ``/ready`` stays unavailable until every step has run.
+    """
+    if settings.WARMUP_ENABLED:
+        await _run_warm_up_step(
+            startup,
+            "warm_database",
+            lambda: warm_up_connections(settings.WARMUP_DATABASE_CONNECTIONS),
+        )
+        await _run_warm_up_step(startup, "warm_redis", _connect_redis)
+        if settings.ENABLE_ID_TOKEN_SIGNATURE_VERIFICATION:
+            await _run_warm_up_step(startup, "warm_jwks", prefetch_jwks)
+        await _run_warm_up_step(
+            startup,
+            "warm_forecasts",
+            lambda: preload_hot_forecasts(settings.WARMUP_HOT_FORECAST_LOCATIONS),
+        )
+    startup.finish()
+    readiness.mark_warm()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Run timed startup phases, then own process-wide connections until shutdown."""
+    startup = StartupReport()
+    with startup.phase("logging"):
+        setup_logging()
+    logger.info("Starting %s in %s mode", settings.APP_NAME, settings.ENV)
+    with startup.phase("metrics"):
+        core_metrics.cleanup_dead_workers()
+    with startup.phase("admin_divisions"):
+        initialize_admin_divisions()
+    with startup.phase("static_assets"):
+        static_assets.load(STATIC_DIR)
+    with startup.phase("http_clients"):
+        line_platform_http.start()
+    jwks_refresher = (
+        asyncio.create_task(refresh_jwks_periodically())
+        if settings.ENABLE_ID_TOKEN_SIGNATURE_VERIFICATION
+        else None
+    )
+    warm_up_task = asyncio.create_task(warm_up(startup))
+
+    yield
+
+    readiness.reset()
+    for task in (warm_up_task, jwks_refresher):
+        if task is None:
+            continue
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    production_reply_messenger.close()
+    logger.info("LINE Messaging API connections closed")
+    processing_lock_service.close()
+    await line_platform_http.aclose()
+    logger.info("LINE Platform HTTP connections closed")
+    core_metrics.mark_worker_stopped()
+    stop_logging()
+
+
 # Create FastAPI app based on environment
 if settings.is_development:
     app = FastAPI(
         title=settings.APP_NAME,
         description="API for WeaMind Weather LINE BOT",
+        lifespan=lifespan,
     )
-    logger.info("FastAPI app created in development mode")
 else:
     # Hide API docs in production
     app = FastAPI(
@@ -36,8 +127,8 @@ else:
         docs_url=None,
         redoc_url=None,
         openapi_url=None,
+        lifespan=lifespan,
     )
-    logger.info("FastAPI app created in production mode")
 
 # 🔒 安全配置：CORS 設定
 app.add_middleware(
@@ -63,7 +154,7 @@ async def root() -> dict:
 @app.get("/health")
 async def health() -> dict:
     """
-    Health check endpoint for Kubernetes liveness and readiness probes.
+    Liveness check endpoint for Kubernetes liveness probes.
 
     Returns:
         dict: Service health status
@@ -71,6 +162,23 @@ async def health() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/ready")
+def ready(response: Response) -> dict:
+    """
+    Readiness check for load balancers and Kubernetes readiness probes.
+
+    Reports ready only after the startup warm-up finished and while the
+    database answers; dependency checks are cached between probes.
+
+    Returns:
+        dict: Readiness status and the individual checks
+    """
+    report = readiness.check()
+    if not report.ready:
+        response.status_code = 503
+    return {"status": "ready" if report.ready else "not_ready", "checks": report.checks}
+
+
 @app.get("/metrics")
 async def metrics() -> Response:
     """Expose Prometheus metrics for scraping."""
@@ -81,7 +189,9 @@ async def metrics() -> Response:
 app.include_router(user_router, tags=["user"])  # no prefix because the domain is api.kyomind.tw
 app.include_router(line_router, tags=["line"])
 
-# Mount static files for LIFF
-app.mount("/static", StaticFiles(directory="static"), name="static")
-
-logger.info("All routers registered successfully")
+# Mount static files for LIFF, loaded into memory and precompressed at startup
+app.mount(
+    "/static",
+    PrecompressedStaticFiles(directory=STATIC_DIR, store=static_assets),
+    name="static",
+)
@@ -3,7 +3,7 @@
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -51,7 +51,7 @@ class UserQuery(Base):
     __tablename__ = "user_query"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
     location_id: Mapped[int] = mapped_column(ForeignKey("location.id"), nullable=False)
     query_time: Mapped[datetime] = mapped_column(
         DateTime, default=lambda: datetime.now(UTC), index=True
@@ -60,3 +60,23 @@ class UserQuery(Base):
     # Relationships
     user: Mapped["User"] = relationship("User", lazy="select")
     location: Mapped["Location"] = relationship("Location", lazy="select")
+
+
+# Serves the DISTINCT ON recent-locations lookup in index order: equality on
+# user_id, grouping on location_id, newest query_time first within each group.
+# It also covers the plain user_id lookups, so no separate user_id index is kept.
+Index(
+    "ix_user_query_user_location_time",
+    UserQuery.user_id,
+    UserQuery.location_id,
+    UserQuery.query_time.desc(),
+)
+
+# Serves the forecast broadcast stream, which walks active users with a home
+# Location in (home_location_id, id) keyset order.
+Index(
+    "ix_user_active_home_location",
+    User.home_location_id,
+    User.id,
+    postgresql_where=User.is_active.is_(True) & User.home_location_id.is_not(None),
+)
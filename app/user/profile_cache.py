@@ -0,0 +1,179 @@
+"""
+User profile cache keyed by LINE user ID.
+
+Nearly every LINE event starts by resolving ``line_user_id`` to the internal
+user ID and preset Location IDs. This module keeps a small immutable profile
+per user in a bounded in-process LRU, optionally backed by Redis so workers
+share warm entries.
+
+Consistency model:
+- Writers (``create_user_if_not_exists``, ``deactivate_user``,
+  ``set_user_location``) invalidate the entry after committing.
+- Invalidation clears the local tier and Redis, but other workers' local tiers
+  are only bounded by ``USER_PROFILE_CACHE_TTL_SECONDS``; keep it short.
+- Unknown users are never cached, so a freshly followed user is always found.
+- Redis failures are logged and ignored (fail-open), like the processing lock.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import cast
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis_client import shared_redis
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class UserProfile:
+    """Represent the immutable user data needed by LINE event handling."""
+
+    line_user_id: str
+    id: int
+    is_active: bool
+    home_location_id: int | None
+    work_location_id: int | None
+
+
+class UserProfileCache:
+    """Two-tier cache of user profiles: in-process LRU with optional Redis backing."""
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._entries: OrderedDict[str, tuple[UserProfile, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _redis_key(line_user_id: str) -> str:
+        """Build the Redis key for a cached profile."""
+        return f"user:profile:{line_user_id}"
+
+    def get(self, line_user_id: str) -> UserProfile | None:
+        """
+        Get a cached profile, consulting Redis on a local miss.
+
+        Args:
+            line_user_id: LINE user ID
+
+        Returns:
+            UserProfile | None: Cached profile, or None when not cached
+        """
+        if not settings.USER_PROFILE_CACHE_ENABLED:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(line_user_id)
+            if entry is not None:
+                profile, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(line_user_id)
+                    return profile
+                del self._entries[line_user_id]
+
+        profile = self._get_from_redis(line_user_id)
+        if profile is not None:
+            self._store_locally(profile)
+        return profile
+
+    def set(self, profile: UserProfile) -> None:
+        """
+        Cache a profile loaded from the database.
+
+        Args:
+            profile: Profile reflecting committed database state
+        """
+        if not settings.USER_PROFILE_CACHE_ENABLED:
+            return
+        self._store_locally(profile)
+        self._set_in_redis(profile)
+
+    def invalidate(self, line_user_id: str) -> None:
+        """
+        Drop a profile after its user row changed.
+
+        Args:
+            line_user_id: LINE user ID
+        """
+        with self._lock:
+            self._entries.pop(line_user_id, None)
+
+        redis_client = self._get_redis_client()
+        if redis_client is None:
+            return
+        try:
+            redis_client.delete(self._redis_key(line_user_id))
+        except RedisError as e:
+            shared_redis.record_failure()
+            logger.warning("Failed to invalidate user profile in Redis: %s", e)
+            return
+        shared_redis.record_success()
+
+    def clear(self) -> None:
+        """Drop every locally cached profile."""
+        with self._lock:
+            self._entries.clear()
+
+    def _store_locally(self, profile: UserProfile) -> None:
+        """Store a profile in the bounded in-process tier."""
+        expires_at = time.monotonic() + settings.USER_PROFILE_CACHE_TTL_SECONDS
+        with self._lock:
+            self._entries[profile.line_user_id] = (profile, expires_at)
+            self._entries.move_to_end(profile.line_user_id)
+            while len(self._entries) > settings.USER_PROFILE_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _get_redis_client():  # noqa: ANN205 - optional redis.Redis client
+        """Get the shared Redis client when the Redis tier is enabled."""
+        if not settings.USER_PROFILE_CACHE_REDIS_ENABLED:
+            return None
+        return shared_redis.get_client()
+
+    def _get_from_redis(self, line_user_id: str) -> UserProfile | None:
+        """Load a profile from the shared Redis tier."""
+        redis_client = self._get_redis_client()
+        if redis_client is None:
+            return None
+        try:
+            raw_profile = cast(str | None, redis_client.get(self._redis_key(line_user_id)))
+        except RedisError as e:
+            shared_redis.record_failure()
+            logger.warning("Failed to read user profile from Redis: %s", e)
+            return None
+        shared_redis.record_success()
+        if not raw_profile:
+            return None
+        try:
+            return UserProfile(**json.loads(raw_profile))
+        except (TypeError, ValueError):
+            logger.warning("Ignoring malformed user profile cached in Redis")
+            return None
+
+    def _set_in_redis(self, profile: UserProfile) -> None:
+        """Store a profile in the shared Redis tier."""
+        redis_client = self._get_redis_client()
+        if redis_client is None:
+            return
+        try:
+            redis_client.set(
+                self._redis_key(profile.line_user_id),
+                json.dumps(asdict(profile)),
+                ex=settings.USER_PROFILE_CACHE_REDIS_TTL_SECONDS,
+            )
+        except RedisError as e:
+            shared_redis.record_failure()
+            logger.warning("Failed to write user profile to Redis: %s", e)
+            return
+        shared_redis.record_success()
+
+
+# Global instance - module-level singleton pattern
+user_profile_cache = UserProfileCache()
@@ -5,10 +5,13 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from app.broadcast import subscriptions
 from app.core.auth import get_current_line_user_id_from_access_token
 from app.core.database import get_session
 from app.user import service
 from app.user.schemas import (
+    ForecastSubscriptionRequest,
+    ForecastSubscriptionResponse,
     LocationSettingRequest,
     LocationSettingResponse,
 )
@@ -49,3 +52,44 @@ async def set_user_location(
         location_type=location_type_text,
         location=full_location,
     )
+
+
+@router.put("/subscriptions/{preset}")
+async def subscribe_forecast(
+    preset: str,
+    payload: ForecastSubscriptionRequest,
+    line_user_id: Annotated[str, Depends(get_current_line_user_id_from_access_token)],
+    session: Annotated[Session, Depends(get_session)],
+) -> ForecastSubscriptionResponse:
+    """
+    Subscribe to the daily forecast of the home or office location via LIFF.
+
+    Subscribing again for the same preset only changes its push time.
+    """
+    try:
+        saved = subscriptions.subscribe_forecast(session, line_user_id, preset, payload.send_minute)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    if not saved:
+        raise HTTPException(status_code=404, detail="用戶不存在")
+
+    return ForecastSubscriptionResponse(
+        success=True,
+        message="每日天氣推播設定成功",
+        preset=preset,
+        send_minute=payload.send_minute,
+    )
+
+
+@router.delete("/subscriptions/{preset}")
+async def unsubscribe_forecast(
+    preset: str,
+    line_user_id: Annotated[str, Depends(get_current_line_user_id_from_access_token)],
+    session: Annotated[Session, Depends(get_session)],
+) -> ForecastSubscriptionResponse:
+    """Cancel the daily forecast of the home or office location via LIFF."""
+    if not subscriptions.unsubscribe_forecast(session, line_user_id, preset):
+        raise HTTPException(status_code=404, detail="沒有每日天氣推播訂閱")
+
+    return ForecastSubscriptionResponse(success=True, message="已取消每日天氣推播", preset=preset)
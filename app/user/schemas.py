@@ -26,3 +26,26 @@ class LocationSettingResponse(BaseModel):
     message: str
     location_type: str
     location: str
+
+
+class ForecastSubscriptionRequest(BaseModel):
+    """
+    Schema for daily forecast subscription request from LIFF.
+
+    Used to validate the chosen push time
+    """
+
+    send_minute: int  # minute of the day in Taiwan time, 0 to 1439
+
+
+class ForecastSubscriptionResponse(BaseModel):
+    """
+    Schema for daily forecast subscription response.
+
+    Returned after subscribing or unsubscribing
+    """
+
+    success: bool
+    message: str
+    preset: str
+    send_minute: int | None = None
@@ -1,49 +1,141 @@
 """User service logic."""
 
+from collections.abc import Callable, Iterable
 from datetime import UTC, datetime
 
-from sqlalchemy import desc
+from sqlalchemy import Row, Select, case, desc, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 from app.user.models import User, UserQuery
+from app.user.profile_cache import UserProfile, user_profile_cache
 from app.weather.models import Location
 
+_PROFILE_COLUMNS = (
+    User.line_user_id,
+    User.id,
+    User.is_active,
+    User.home_location_id,
+    User.work_location_id,
+)
+
+
+def _insert_for(session: Session) -> Callable[[type[User]], postgresql.Insert | sqlite.Insert]:
+    """Return the dialect-specific INSERT construct that supports ON CONFLICT."""
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+
+def _profile_from_row(row: Row) -> UserProfile:
+    """Build a user profile from a row of ``_PROFILE_COLUMNS``."""
+    return UserProfile(
+        line_user_id=row.line_user_id,
+        id=row.id,
+        is_active=row.is_active,
+        home_location_id=row.home_location_id,
+        work_location_id=row.work_location_id,
+    )
+
 
 def get_user_by_line_id(session: Session, line_user_id: str) -> User | None:
     """Get a user by LINE user ID."""
     return session.query(User).filter(User.line_user_id == line_user_id).first()
 
 
-def create_user_if_not_exists(session: Session, line_user_id: str) -> User:
+def get_user_profile(session: Session, line_user_id: str) -> UserProfile | None:
+    """
+    Get a user's cached profile, loading it from the database on a miss.
+
+    Read paths that only need the internal ID or preset Location IDs should use
+    this instead of ``get_user_by_line_id``. Unknown users are not cached.
+
+    Args:
+        session: database Session object
+        line_user_id: LINE user ID
+
+    Returns:
+        The user profile or None if the user does not exist
+    """
+    profile = user_profile_cache.get(line_user_id)
+    if profile is not None:
+        return profile
+
+    user = get_user_by_line_id(session, line_user_id)
+    if user is None:
+        return None
+
+    profile = UserProfile(
+        line_user_id=user.line_user_id,
+        id=user.id,
+        is_active=user.is_active,
+        home_location_id=user.home_location_id,
+        work_location_id=user.work_location_id,
+    )
+    user_profile_cache.set(profile)
+    return profile
+
+
+def create_user_if_not_exists(session: Session, line_user_id: str) -> UserProfile:
     """
     Create a user if not exists, or reactivate if exists but inactive.
 
+    Runs as a single ``INSERT … ON CONFLICT (line_user_id) DO UPDATE … RETURNING``
+    statement, so concurrent follow events cannot race into a unique violation.
+
     Args:
         session: database Session object
         line_user_id: LINE user ID
 
     Returns:
-        The user model (either created or reactivated)
+        The profile of the created or reactivated user
     """
-    existing_user = get_user_by_line_id(session, line_user_id)
+    return create_users_if_not_exist(session, [line_user_id])[0]
 
-    if existing_user:
-        # Reactivate if the user exists but is inactive
-        if not existing_user.is_active:
-            existing_user.is_active = True
-            session.commit()
-            session.refresh(existing_user)
-        return existing_user
-    else:
-        # Create new user
-        user = User(line_user_id=line_user_id, is_active=True)
-        session.add(user)
-        session.commit()
-        session.refresh(user)
-        return user
 
+def create_users_if_not_exist(session: Session, line_user_ids: Iterable[str]) -> list[UserProfile]:
+    """
+    Create or reactivate many users with one upsert statement.
+
+    Duplicate IDs are collapsed, because PostgreSQL rejects an upsert that
+    touches the same row twice, and rows are written in sorted order so
+    concurrent batches lock them consistently.
+
+    Args:
+        session: database Session object
+        line_user_ids: LINE user IDs, e.g. from the follow events of one webhook
+
+    Returns:
+        Profiles of the created or reactivated users, sorted by LINE user ID
+    """
+    unique_ids = sorted(set(line_user_ids))
+    if not unique_ids:
+        return []
+
+    now = datetime.now(UTC)
+    statement = _insert_for(session)(User).values(
+        [
+            {"line_user_id": line_user_id, "is_active": True, "created_at": now, "updated_at": now}
+            for line_user_id in unique_ids
+        ]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[User.line_user_id],
+        set_={
+            "is_active": True,
+            # Only reactivation counts as an update; re-following keeps the timestamp
+            "updated_at": case((User.is_active, User.updated_at), else_=now),
+        },
+    ).returning(*_PROFILE_COLUMNS)
+    profiles = [_profile_from_row(row) for row in session.execute(statement)]
+    session.commit()
 
-def deactivate_user(session: Session, line_user_id: str) -> User | None:
+    for line_user_id in unique_ids:
+        user_profile_cache.invalidate(line_user_id)
+    return sorted(profiles, key=lambda profile: profile.line_user_id)
+
+
+def deactivate_user(session: Session, line_user_id: str) -> UserProfile | None:
     """
     Soft delete (deactivate) a user by LINE user ID.
 
@@ -52,15 +144,21 @@ def deactivate_user(session: Session, line_user_id: str) -> User | None:
         line_user_id: LINE user ID
 
     Returns:
-        The deactivated user model or None if not found
+        The deactivated user's profile or None if not found
     """
-    user = get_user_by_line_id(session, line_user_id)
-    if user:
-        user.is_active = False
-        session.commit()
-        session.refresh(user)
-        return user
-    return None
+    statement = (
+        update(User)
+        .where(User.line_user_id == line_user_id)
+        .values(is_active=False)
+        .returning(*_PROFILE_COLUMNS)
+    )
+    row = session.execute(statement).one_or_none()
+    session.commit()
+    if row is None:
+        return None
+
+    user_profile_cache.invalidate(line_user_id)
+    return _profile_from_row(row)
 
 
 def get_location_by_county_district(
@@ -104,25 +202,32 @@ def set_user_location(
     if location_type not in ["home", "work"]:
         return False, "無效的地點類型", None
 
-    # Get or create user
-    user = get_user_by_line_id(session, line_user_id)
-    if not user:
-        # Auto-create user for LIFF users (they must be authenticated by LINE)
-        user = create_user_if_not_exists(session, line_user_id)
-
     # Get location
     location = get_location_by_county_district(session, county, district)
     if not location:
         return False, "地點不存在", None
 
-    # Update user location
-    if location_type == "home":
-        user.home_location_id = location.id
-    else:  # work
-        user.work_location_id = location.id
-
+    # Create the user on first use (LIFF users are authenticated by LINE) and
+    # set the location in the same upsert
+    location_column = "home_location_id" if location_type == "home" else "work_location_id"
+    now = datetime.now(UTC)
+    statement = (
+        _insert_for(session)(User)
+        .values(
+            line_user_id=line_user_id,
+            is_active=True,
+            created_at=now,
+            updated_at=now,
+            **{location_column: location.id},
+        )
+        .on_conflict_do_update(
+            index_elements=[User.line_user_id],
+            set_={location_column: location.id, "updated_at": now},
+        )
+    )
+    session.execute(statement)
     session.commit()
-    session.refresh(user)
+    user_profile_cache.invalidate(line_user_id)
 
     return True, "地點設定成功", location
 
@@ -145,6 +250,63 @@ def get_recent_queries(session: Session, user_id: int, limit: int = 5) -> list[L
     """
     Get user's recent query locations, excluding home/work locations.
 
+    PostgreSQL resolves the latest distinct locations in a single statement with
+    DISTINCT ON; other databases (the SQLite test adapter) use the portable
+    Python de-duplication loop.
+
+    Args:
+        session: database Session object
+        user_id: internal user ID
+        limit: maximum number of recent queries to return
+
+    Returns:
+        List of Location objects for recent queries
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        return list(session.scalars(_recent_locations_statement(user_id, limit)))
+    return _get_recent_queries_in_python(session, user_id, limit)
+
+
+def _recent_locations_statement(user_id: int, limit: int) -> Select[tuple[Location]]:
+    """
+    Build the PostgreSQL query for a user's latest distinct locations.
+
+    DISTINCT ON keeps the newest history row per location, which the
+    ``ix_user_query_user_location_time`` index serves in index order. Home and
+    work locations are excluded through the join to ``user`` and the Location
+    rows are joined in the same statement, ordered by most recent query first.
+
+    Args:
+        user_id: internal user ID
+        limit: maximum number of locations to return
+
+    Returns:
+        A select statement yielding Location entities
+    """
+    latest_queries = (
+        select(UserQuery.location_id, UserQuery.query_time)
+        .join(User, User.id == UserQuery.user_id)
+        .where(
+            UserQuery.user_id == user_id,
+            UserQuery.location_id.is_distinct_from(User.home_location_id),
+            UserQuery.location_id.is_distinct_from(User.work_location_id),
+        )
+        .distinct(UserQuery.location_id)
+        .order_by(UserQuery.location_id, desc(UserQuery.query_time))
+        .subquery("latest_queries")
+    )
+    return (
+        select(Location)
+        .join(latest_queries, latest_queries.c.location_id == Location.id)
+        .order_by(desc(latest_queries.c.query_time))
+        .limit(limit)
+    )
+
+
+def _get_recent_queries_in_python(session: Session, user_id: int, limit: int) -> list[Location]:
+    """
+    Get recent query locations with database-agnostic de-duplication.
+
     Args:
         session: database Session object
         user_id: internal user ID
@@ -176,8 +338,6 @@ def get_recent_queries(session: Session, user_id: int, limit: int = 5) -> list[L
         query = query.filter(~UserQuery.location_id.in_(excluded_location_ids))
 
     # Get most recent query for each distinct location
-    # Use a more complex approach for cross-database compatibility
-    # TODO: Optimize with PostgreSQL DISTINCT ON when test environment uses PostgreSQL
     # Limit initial query to avoid loading too much data
     recent_queries = []
     seen_locations = set()
@@ -10,6 +10,11 @@ from app.weather.models import Weather
 
 logger = logging.getLogger(__name__)
 
+# Forecast batches fetched longer ago than this are treated as missing data
+FORECAST_FRESHNESS_WINDOW = timedelta(hours=6.5)
+# Eight 3-hour periods make up the 24-hour sliding window
+FORECAST_PERIOD_LIMIT = 8
+
 
 class WeatherService:
     """Service for handling weather queries with different location sources."""
@@ -34,7 +39,7 @@ class WeatherService:
             # Get the latest fetched_at timestamp for this location (within freshness window)
             # Use explicit UTC time to ensure consistency with stored data
             utc_now = datetime.now(UTC)
-            freshness_threshold = utc_now - timedelta(hours=6.5)
+            freshness_threshold = utc_now - FORECAST_FRESHNESS_WINDOW
 
             latest_fetched_subquery = (
                 session.query(func.max(Weather.fetched_at))
@@ -56,16 +61,16 @@ class WeatherService:
                     Weather.fetched_at == latest_fetched_subquery,
                 )
                 .order_by(Weather.start_time)
-                .limit(8)
+                .limit(FORECAST_PERIOD_LIMIT)
                 .all()
             )
 
             logger.info(
-                f"Retrieved {len(weather_data)} weather records for location_id={location_id}"
+                "Retrieved %s weather records for location_id=%s", len(weather_data), location_id
             )
 
         except Exception:
-            logger.exception(f"Error retrieving weather forecast for location_id={location_id}")
+            logger.exception("Error retrieving weather forecast for location_id=%s", location_id)
             return []
         else:
             return weather_data
@@ -1,14 +1,17 @@
 """Own database lifecycles for complete Weather Query workflows."""
 
 import logging
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import UTC, datetime, timedelta
 
+from sqlalchemy import CTE, Select, and_, func, literal, select
 from sqlalchemy.orm import Session
 
 from app.core.database import SessionLocal
 from app.user.models import User, UserQuery
+from app.user.profile_cache import UserProfile, user_profile_cache
+from app.user.service import get_user_profile
 from app.weather.location_resolution import (
     InvalidInputReason,
     QueryOutcome,
@@ -18,10 +21,12 @@ from app.weather.location_resolution import (
     resolve_text,
 )
 from app.weather.models import Location, Weather
-from app.weather.service import WeatherService
+from app.weather.service import FORECAST_FRESHNESS_WINDOW, FORECAST_PERIOD_LIMIT, WeatherService
 
 logger = logging.getLogger(__name__)
 SessionFactory = Callable[[], Session]
+# Query History window that defines the hot Locations preloaded at startup
+HOT_FORECAST_WINDOW = timedelta(days=1)
 
 
 @dataclass(frozen=True)
@@ -64,33 +69,118 @@ def _forecast_data(weather: Weather) -> ForecastData:
     )
 
 
-def _record_history(session: Session, user: User | None, location_id: int) -> None:
+def _record_history(session: Session, user_id: int | None, location_id: int) -> None:
     """
     Record secondary Query History inside a savepoint.
 
     A savepoint keeps a failed history flush from poisoning the workflow's
     surrounding transaction. Unknown users are intentionally ignored.
     """
-    if user is None:
+    if user_id is None:
         return
     try:
         with session.begin_nested():
-            session.add(UserQuery(user_id=user.id, location_id=location_id))
+            session.add(UserQuery(user_id=user_id, location_id=location_id))
             session.flush()
     except Exception:
         logger.exception("Failed to record Query History", extra={"location_id": location_id})
 
 
+def _user_id(session: Session, line_user_id: str | None) -> int | None:
+    """Resolve the internal user ID through the profile cache, if the user is known."""
+    if not line_user_id:
+        return None
+    profile = get_user_profile(session, line_user_id)
+    return profile.id if profile else None
+
+
+def _forecast_result(location: ResolvedLocation, weather: Iterable[Weather]) -> WeatherQueryResult:
+    """Build the forecast or no-weather result for one resolved Location."""
+    forecast = tuple(_forecast_data(item) for item in weather)
+    return WeatherQueryResult(
+        outcome=QueryOutcome.FORECAST if forecast else QueryOutcome.NO_WEATHER,
+        locations=(location,),
+        forecast=forecast,
+    )
+
+
 def _result_for_location(
-    session: Session, location: ResolvedLocation, user: User | None
+    session: Session, location: ResolvedLocation, user_id: int | None
 ) -> WeatherQueryResult:
     """Query weather and record history for an already resolved Location."""
     weather = WeatherService.get_weather_forecast_by_location(session, location.id)
-    _record_history(session, user, location.id)
-    return WeatherQueryResult(
-        outcome=QueryOutcome.FORECAST if weather else QueryOutcome.NO_WEATHER,
-        locations=(location,),
-        forecast=tuple(_forecast_data(item) for item in weather),
+    _record_history(session, user_id, location.id)
+    return _forecast_result(location, weather)
+
+
+def load_location_forecast(session: Session, location_id: int) -> WeatherQueryResult | None:
+    """
+    Load one Location's current forecast without recording Query History.
+
+    Returns:
+        The forecast or no-weather result, or None when the Location is unknown.
+    """
+    location = session.get(Location, location_id)
+    if location is None:
+        return None
+    weather = WeatherService.get_weather_forecast_by_location(session, location_id)
+    return _forecast_result(immutable_location(location), weather)
+
+
+def _preset_user_cte(line_user_id: str, preset: str) -> CTE:
+    """Build the ``preset_user`` CTE that resolves the user from the database."""
+    location_column = User.home_location_id if preset == "home" else User.work_location_id
+    return (
+        select(User.id.label("user_id"), location_column.label("location_id"))
+        .where(User.line_user_id == line_user_id)
+        .cte("preset_user")
+    )
+
+
+def _cached_preset_user_cte(profile: UserProfile, location_id: int) -> CTE:
+    """Build the ``preset_user`` CTE from a cached profile, skipping the user lookup."""
+    return select(
+        literal(profile.id).label("user_id"), literal(location_id).label("location_id")
+    ).cte("preset_user")
+
+
+def _preset_forecast_statement(preset_user: CTE, utc_now: datetime) -> Select:
+    """
+    Build one statement returning a preset Location and its latest forecast batch.
+
+    The ``preset_user`` CTE yields the user and the configured Location ID and
+    ``latest_batch`` finds the newest fresh ``fetched_at`` for that Location.
+    Outer joins keep one row even when the Location or forecast is missing, so
+    every preset outcome is decided from this single round trip. Forecast rows
+    follow the same sliding window as ``WeatherService``.
+    """
+    latest_batch = (
+        select(Weather.location_id, func.max(Weather.fetched_at).label("fetched_at"))
+        .join(preset_user, preset_user.c.location_id == Weather.location_id)
+        .where(Weather.fetched_at >= utc_now - FORECAST_FRESHNESS_WINDOW)
+        .group_by(Weather.location_id)
+        .cte("latest_batch")
+    )
+    return (
+        select(
+            preset_user.c.user_id,
+            Location.id.label("location_id"),
+            Location.full_name,
+            Weather,
+        )
+        .select_from(preset_user)
+        .outerjoin(Location, Location.id == preset_user.c.location_id)
+        .outerjoin(latest_batch, latest_batch.c.location_id == Location.id)
+        .outerjoin(
+            Weather,
+            and_(
+                Weather.location_id == latest_batch.c.location_id,
+                Weather.fetched_at == latest_batch.c.fetched_at,
+                Weather.end_time > utc_now,
+            ),
+        )
+        .order_by(Weather.start_time)
+        .limit(FORECAST_PERIOD_LIMIT)
     )
 
 
@@ -100,18 +190,14 @@ def query_text(
     """Run a text Weather Query with an internally owned Session."""
     factory = session_factory or SessionLocal
     with factory() as session, session.begin():
-        user = (
-            session.query(User).filter(User.line_user_id == line_user_id).first()
-            if line_user_id
-            else None
-        )
+        user_id = _user_id(session, line_user_id)
         resolution = resolve_text(session, text)
         if resolution.outcome == QueryOutcome.INVALID_INPUT:
             return WeatherQueryResult(
                 QueryOutcome.INVALID_INPUT, invalid_reason=resolution.invalid_reason
             )
         if resolution.outcome == QueryOutcome.FORECAST:
-            return _result_for_location(session, resolution.locations[0], user)
+            return _result_for_location(session, resolution.locations[0], user_id)
         return WeatherQueryResult(
             outcome=resolution.outcome,
             locations=resolution.locations,
@@ -130,15 +216,11 @@ def query_shared_location(
     """Run a shared-location Weather Query with address-first resolution."""
     factory = session_factory or SessionLocal
     with factory() as session, session.begin():
-        user = (
-            session.query(User).filter(User.line_user_id == line_user_id).first()
-            if line_user_id
-            else None
-        )
+        user_id = _user_id(session, line_user_id)
         resolution = resolve_shared_location(session, latitude, longitude, address)
         if resolution.outcome != QueryOutcome.FORECAST:
             return WeatherQueryResult(resolution.outcome)
-        return _result_for_location(session, resolution.locations[0], user)
+        return _result_for_location(session, resolution.locations[0], user_id)
 
 
 def query_preset(
@@ -147,13 +229,56 @@ def query_preset(
     """Run home or office Weather Query directly from its configured Location ID."""
     if preset not in {"home", "office"}:
         raise ValueError("preset must be 'home' or 'office'")
+    profile = user_profile_cache.get(line_user_id)
+    if profile is None:
+        preset_user = _preset_user_cte(line_user_id, preset)
+    else:
+        location_id = profile.home_location_id if preset == "home" else profile.work_location_id
+        if location_id is None:
+            return WeatherQueryResult(QueryOutcome.PRESET_NOT_SET)
+        preset_user = _cached_preset_user_cte(profile, location_id)
+
     factory = session_factory or SessionLocal
     with factory() as session, session.begin():
-        user = session.query(User).filter(User.line_user_id == line_user_id).first()
-        if user is None:
+        statement = _preset_forecast_statement(preset_user, datetime.now(UTC))
+        rows = session.execute(statement).all()
+        if not rows or rows[0].location_id is None or rows[0].full_name is None:
             return WeatherQueryResult(QueryOutcome.PRESET_NOT_SET)
-        location_id = user.home_location_id if preset == "home" else user.work_location_id
-        location = session.get(Location, location_id) if location_id is not None else None
-        if location is None:
-            return WeatherQueryResult(QueryOutcome.PRESET_NOT_SET)
-        return _result_for_location(session, immutable_location(location), user)
+        location = ResolvedLocation(id=rows[0].location_id, full_name=rows[0].full_name)
+        weather = [row.Weather for row in rows if row.Weather is not None]
+        _record_history(session, rows[0].user_id, location.id)
+        return _forecast_result(location, weather)
+
+
+def preload_hot_forecasts(
+    limit: int,
+    *,
+    since: timedelta = HOT_FORECAST_WINDOW,
+    session_factory: SessionFactory | None = None,
+) -> int:
+    """
+    Run the forecast query for the most queried Locations, recording no history.
+
+    Used by the startup warm-up so the first real queries find the forecast
+    rows, indexes and compiled statements already warm.
+
+    Args:
+        limit: Maximum number of Locations to preload
+        since: How far back Query History counts towards popularity
+        session_factory: Session factory, defaults to the application's
+
+    Returns:
+        Number of Locations whose forecast was loaded
+    """
+    factory = session_factory or SessionLocal
+    with factory() as session:
+        location_ids = session.scalars(
+            select(UserQuery.location_id)
+            .where(UserQuery.query_time >= datetime.now(UTC) - since)
+            .group_by(UserQuery.location_id)
+            .order_by(func.count().desc())
+            .limit(limit)
+        ).all()
+        return sum(
+            load_location_forecast(session, location_id) is not None for location_id in location_ids
+        )
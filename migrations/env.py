@@ -6,6 +6,11 @@ from app.core.config import settings
 from app.core.database import Base
 
 # Import all models so Alembic can detect them
+from app.broadcast.models import (  # noqa: F401
+    BroadcastRecipient,
+    BroadcastRun,
+    ForecastSubscription,
+)
 from app.user.models import User, UserQuery  # noqa: F401
 from app.weather.models import Location, Weather, Task  # noqa: F401
 
@@ -0,0 +1,49 @@
+"""add broadcast_run table
+
+Revision ID: a296f41e3efe
+Revises: c77e9e6416e2
+Create Date: 2026-10-19 11:04:37.118264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a296f41e3efe'
+down_revision: Union[str, None] = 'c77e9e6416e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add forecast broadcast checkpoints and the recipient stream index."""
+    op.create_table('broadcast_run',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('run_key', sa.String(length=64), nullable=False),
+    sa.Column('last_location_id', sa.Integer(), nullable=True),
+    sa.Column('last_user_id', sa.Integer(), nullable=True),
+    sa.Column('recipients_sent', sa.Integer(), nullable=False),
+    sa.Column('recipients_failed', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('run_key')
+    )
+
+    # Partial index matches the broadcast stream's keyset order over active users
+    op.create_index(
+        'ix_user_active_home_location',
+        'user',
+        ['home_location_id', 'id'],
+        unique=False,
+        postgresql_where=sa.text('is_active IS true AND home_location_id IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    """Remove forecast broadcast checkpoints and the recipient stream index."""
+    op.drop_index('ix_user_active_home_location', table_name='user')
+    op.drop_table('broadcast_run')
@@ -0,0 +1,51 @@
+"""add forecast_subscription table
+
+Revision ID: a303499207a1
+Revises: a296f41e3efe
+Create Date: 2026-10-19 13:27:51.640182
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a303499207a1'
+down_revision: Union[str, None] = 'a296f41e3efe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add scheduled daily forecast subscriptions."""
+    op.create_table('forecast_subscription',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('preset', sa.String(length=10), nullable=False),
+    sa.Column('send_minute', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.CheckConstraint("preset IN ('home', 'office')", name='check_subscription_preset'),
+    sa.CheckConstraint('send_minute >= 0 AND send_minute < 1440', name='check_subscription_send_minute'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'preset', name='unique_subscription_user_preset')
+    )
+
+    # Partial index serves the scheduler's per-minute bucket lookup
+    op.create_index(
+        'ix_forecast_subscription_active_minute',
+        'forecast_subscription',
+        ['send_minute'],
+        unique=False,
+        postgresql_where=sa.text('is_active IS true')
+    )
+
+
+def downgrade() -> None:
+    """Remove scheduled daily forecast subscriptions."""
+    op.drop_index('ix_forecast_subscription_active_minute', table_name='forecast_subscription')
+    op.drop_table('forecast_subscription')
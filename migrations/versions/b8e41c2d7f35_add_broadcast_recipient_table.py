@@ -0,0 +1,36 @@
+"""add broadcast_recipient table
+
+Revision ID: b8e41c2d7f35
+Revises: a303499207a1
+Create Date: 2026-10-19 18:42:10.527316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e41c2d7f35'
+down_revision: Union[str, None] = 'a303499207a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the per-run recipient snapshot of forecast broadcasts."""
+    op.create_table('broadcast_recipient',
+    sa.Column('run_id', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('line_user_id', sa.String(), nullable=False),
+    sa.Column('chunk_index', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['run_id'], ['broadcast_run.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('run_id', 'location_id', 'user_id')
+    )
+
+
+def downgrade() -> None:
+    """Remove the per-run recipient snapshot of forecast broadcasts."""
+    op.drop_table('broadcast_recipient')
@@ -0,0 +1,41 @@
+"""add user_query recent locations index
+
+Revision ID: c77e9e6416e2
+Revises: bcec2f9b0ea0
+Create Date: 2026-10-19 09:12:44.502317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c77e9e6416e2'
+down_revision: Union[str, None] = 'bcec2f9b0ea0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add composite index serving the DISTINCT ON recent locations query."""
+    # Composite index matches DISTINCT ON (location_id) ORDER BY location_id, query_time DESC
+    op.create_index(
+        'ix_user_query_user_location_time',
+        'user_query',
+        ['user_id', 'location_id', sa.text('query_time DESC')],
+        unique=False
+    )
+
+    # Remove single-column index (covered by composite index)
+    op.drop_index(op.f('ix_user_query_user_id'), table_name='user_query')
+
+
+def downgrade() -> None:
+    """Restore original user_query indexes."""
+    # Restore the original single-column index
+    op.create_index(op.f('ix_user_query_user_id'), 'user_query', ['user_id'], unique=False)
+
+    # Remove the added composite index
+    op.drop_index('ix_user_query_user_location_time', table_name='user_query')
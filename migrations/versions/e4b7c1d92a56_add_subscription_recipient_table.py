@@ -0,0 +1,37 @@
+"""add subscription_recipient table
+
+Revision ID: e4b7c1d92a56
+Revises: b8e41c2d7f35
+Create Date: 2026-10-19 21:05:37.184209
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7c1d92a56'
+down_revision: Union[str, None] = 'b8e41c2d7f35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the recipient snapshot of scheduled forecast bucket shards."""
+    op.create_table('subscription_recipient',
+    sa.Column('bucket_date', sa.String(length=10), nullable=False),
+    sa.Column('send_minute', sa.Integer(), nullable=False),
+    sa.Column('shard', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('line_user_id', sa.String(), nullable=False),
+    sa.Column('chunk_index', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('bucket_date', 'send_minute', 'shard', 'location_id', 'user_id')
+    )
+
+
+def downgrade() -> None:
+    """Remove the recipient snapshot of scheduled forecast bucket shards."""
+    op.drop_table('subscription_recipient')
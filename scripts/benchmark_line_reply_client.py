@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark LINE reply latency with and without a pooled Messaging API client.
+
+Starts a local HTTPS stand-in for ``api.line.me`` with a throwaway self-signed
+certificate and sends replies through ``LineSdkReplyMessenger``. The "fresh
+pool" strategy closes the messenger after every reply, which reproduces the
+previous per-reply client (new connection pool and TLS handshake each time);
+the "pooled" strategy keeps the long-lived client and its kept-alive connection.
+
+Usage:
+    uv run python scripts/benchmark_line_reply_client.py --replies 500
+"""
+
+import argparse
+import ipaddress
+import ssl
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from app.line.messaging import LineSdkReplyMessenger, SendResult, TextRecipe
+
+
+def write_self_signed_certificate(directory: Path) -> tuple[Path, Path]:
+    """Write a short-lived certificate for 127.0.0.1 and return (cert, key) paths."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.now(UTC)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(minutes=1))
+        .not_valid_after(now + timedelta(hours=1))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = directory / "cert.pem"
+    key_path = directory / "key.pem"
+    cert_path.write_bytes(certificate.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    return cert_path, key_path
+
+
+class ReplyStandInHandler(BaseHTTPRequestHandler):
+    """Accept reply requests like the Messaging API, keeping connections alive."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        """Consume the reply body and answer with one sent message."""
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b'{"sentMessages": [{"id": "1", "quoteToken": "benchmark"}]}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        """Silence per-request access logs."""
+
+
+def start_stand_in(cert_path: Path, key_path: Path) -> ThreadingHTTPServer:
+    """Start the HTTPS stand-in on an ephemeral local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ReplyStandInHandler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def time_replies(name: str, send: Callable[[int], SendResult], replies: int) -> float:
+    """Time one reply strategy and return its mean latency in milliseconds."""
+    send(-1)  # Warm imports and code paths before measuring
+    durations = []
+    for index in range(replies):
+        start_time = time.perf_counter()
+        result = send(index)
+        durations.append((time.perf_counter() - start_time) * 1000)
+        if not result.success:
+            print(f"❌ {name} reply failed: {result.error_category}")
+            sys.exit(1)
+
+    print(
+        f"{name:<22} avg {statistics.mean(durations):7.3f}ms  "
+        f"median {statistics.median(durations):7.3f}ms  "
+        f"p95 {sorted(durations)[int(len(durations) * 0.95) - 1]:7.3f}ms"
+    )
+    return statistics.mean(durations)
+
+
+def main() -> None:
+    """Run the reply client benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--replies", type=int, default=300, help="timed replies per strategy")
+    args = parser.parse_args()
+
+    print("🔬 WeaMind LINE Reply Client Benchmark")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = write_self_signed_certificate(Path(directory))
+        server = start_stand_in(cert_path, key_path)
+        host = f"https://127.0.0.1:{server.server_address[1]}"
+        messenger = LineSdkReplyMessenger("benchmark-token", host=host, ssl_ca_cert=str(cert_path))
+        recipe = TextRecipe("晴時多雲")
+        print(f"📍 Local HTTPS stand-in at {host}\n")
+
+        def send_with_fresh_pool(index: int) -> SendResult:
+            """Reproduce the per-reply client by dropping the pool after each reply."""
+            result = messenger.reply(f"token-{index}", recipe)
+            messenger.close()
+            return result
+
+        try:
+            fresh = time_replies("Fresh pool per reply", send_with_fresh_pool, args.replies)
+            pooled = time_replies(
+                "Pooled keep-alive",
+                lambda index: messenger.reply(f"token-{index}", recipe),
+                args.replies,
+            )
+        finally:
+            messenger.close()
+            server.shutdown()
+
+    print(f"\n⚡ Saved {fresh - pooled:.3f}ms per reply ({fresh / pooled:.1f}x faster)")
+    print("   Real api.line.me round trips add network RTTs to every new TLS handshake.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark recent query lookups against a PostgreSQL database.
+
+Compares the PostgreSQL DISTINCT ON statement used by ``get_recent_queries``
+with the portable Python de-duplication loop for a user with a large Query
+History. All benchmark rows are written inside one transaction that is rolled
+back at the end, so the target database is left untouched.
+
+Usage:
+    DATABASE_URL=postgresql+psycopg://... uv run python scripts/benchmark_recent_queries.py
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.core.database import engine
+from app.user.models import User, UserQuery
+from app.user.service import _get_recent_queries_in_python, _recent_locations_statement
+from app.weather.models import Location
+
+
+def seed_history(session: Session, history_rows: int, location_count: int) -> int:
+    """Create one user with a skewed Query History and return the user ID."""
+    locations = [
+        Location(
+            geocode=f"bench{index:05d}",
+            county="測試縣",
+            district=f"測試{index}區",
+            full_name=f"測試縣測試{index}區",
+        )
+        for index in range(location_count)
+    ]
+    session.add_all(locations)
+    session.flush()
+
+    user = User(
+        line_user_id=f"benchmark-{time.time_ns()}",
+        home_location_id=locations[0].id,
+        work_location_id=locations[1].id,
+    )
+    session.add(user)
+    session.flush()
+
+    # Users mostly re-query a few favourite places, so weight early locations heavily
+    rng = random.Random(42)  # noqa: S311 - deterministic benchmark data
+    weights = [1 / (index + 1) for index in range(location_count)]
+    start = datetime.now(UTC) - timedelta(days=365)
+    rows = [
+        {
+            "user_id": user.id,
+            "location_id": rng.choices(locations, weights=weights)[0].id,
+            "query_time": start + timedelta(minutes=index),
+        }
+        for index in range(history_rows)
+    ]
+    session.execute(insert(UserQuery), rows)
+    session.execute(text("ANALYZE user_query"))
+    return user.id
+
+
+def time_lookup(
+    name: str, lookup: Callable[[], list[Location]], runs: int
+) -> tuple[list[float], list[int]]:
+    """Time one lookup strategy and return its durations and resulting location IDs."""
+    lookup()  # Warm the plan cache and buffers before measuring
+    durations = []
+    location_ids: list[int] = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        locations = lookup()
+        durations.append((time.perf_counter() - start_time) * 1000)
+        location_ids = [location.id for location in locations]
+
+    print(
+        f"{name:<22} avg {statistics.mean(durations):7.3f}ms  "
+        f"median {statistics.median(durations):7.3f}ms  "
+        f"p95 {sorted(durations)[int(len(durations) * 0.95) - 1]:7.3f}ms"
+    )
+    return durations, location_ids
+
+
+def main() -> None:
+    """Run the recent query benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000, help="history rows for the user")
+    parser.add_argument("--locations", type=int, default=200, help="distinct locations")
+    parser.add_argument("--runs", type=int, default=200, help="timed runs per strategy")
+    parser.add_argument("--limit", type=int, default=5, help="recent locations to return")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print("❌ This benchmark requires a PostgreSQL DATABASE_URL")
+        sys.exit(1)
+
+    print("🔬 WeaMind Recent Queries Benchmark")
+    print("=" * 50)
+
+    with Session(engine) as session:
+        transaction = session.begin()
+        try:
+            user_id = seed_history(session, args.rows, args.locations)
+            print(f"📍 {args.rows} history rows across {args.locations} locations\n")
+
+            _, sql_ids = time_lookup(
+                "DISTINCT ON",
+                lambda: list(session.scalars(_recent_locations_statement(user_id, args.limit))),
+                args.runs,
+            )
+            _, python_ids = time_lookup(
+                "Python de-duplication",
+                lambda: _get_recent_queries_in_python(session, user_id, args.limit),
+                args.runs,
+            )
+        finally:
+            transaction.rollback()
+
+    print(f"\nDISTINCT ON result:   {sql_ids}")
+    print(f"Python loop result:   {python_ids}")
+    if sql_ids != python_ids:
+        print("⚠️  Results differ: the Python loop only scans the newest 100 history rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark reply body serialization with and without LINE SDK models.
+
+Compares three ways of producing the same Messaging API reply body: building
+the SDK pydantic models and dumping them (the ``LineSdkReplyMessenger`` path),
+the direct recipe-to-JSON serializer, and a precompiled byte template that
+only splices in the reply token.
+
+Usage:
+    uv run python scripts/benchmark_reply_payload.py --iterations 50000
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.line.messaging import LineSdkReplyMessenger, ReplyRecipe, UriChoice, UriChoicesRecipe
+from app.line.reply_payload import _templates, precompile_reply, serialize_reply
+
+REPLY_TOKEN = "benchmark-reply-token"  # noqa: S105 - not a credential
+
+
+def sdk_body(recipe: ReplyRecipe) -> bytes:
+    """Build SDK models and dump them like the SDK REST client."""
+    message = LineSdkReplyMessenger._build_message(recipe)
+    request = {"replyToken": REPLY_TOKEN, "messages": [message.to_dict()]}
+    return json.dumps({**request, "notificationDisabled": False}).encode()
+
+
+def time_strategy(name: str, serialize: Callable[[], bytes], iterations: int) -> float:
+    """Time one serialization strategy and return microseconds per reply."""
+    per_call_us = min(timeit.repeat(serialize, number=iterations, repeat=3)) / iterations * 1e6
+    print(f"{name:<24} {per_call_us:8.2f}µs per reply")
+    return per_call_us
+
+
+def main() -> None:
+    """Run the reply payload benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000, help="serializations per run")
+    args = parser.parse_args()
+
+    recipe = UriChoicesRecipe(
+        text="請選擇想了解的資訊：",
+        choices=(
+            UriChoice("🔄 更新", "https://github.com/kyomind/WeaMind/blob/main/CHANGELOG.md"),
+            UriChoice("📖 使用說明", "https://github.com/kyomind/WeaMind/blob/main/README.md"),
+            UriChoice("ℹ️ 專案介紹", "https://api.kyomind.tw/static/about/index.html"),
+        ),
+    )
+    _templates.pop(recipe, None)
+
+    print("🔬 WeaMind Reply Payload Benchmark")
+    print("=" * 50)
+
+    expected = sdk_body(recipe)
+    sdk = time_strategy("SDK models", lambda: sdk_body(recipe), args.iterations)
+    direct = time_strategy(
+        "Direct serializer", lambda: serialize_reply(REPLY_TOKEN, recipe), args.iterations
+    )
+    direct_body = serialize_reply(REPLY_TOKEN, recipe)
+    precompile_reply(recipe)
+    template = time_strategy(
+        "Precompiled template", lambda: serialize_reply(REPLY_TOKEN, recipe), args.iterations
+    )
+
+    if not expected == direct_body == serialize_reply(REPLY_TOKEN, recipe):
+        print("❌ Serialized bodies differ from the SDK body")
+        sys.exit(1)
+    print(f"\n⚡ Direct serializer {sdk / direct:.1f}x, template {sdk / template:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Push the current forecast to every active user with a home Location.
+
+Runs the forecast broadcast engine with the production multicast adapter.
+Re-running with the same run key resumes an interrupted broadcast, retries
+failed chunks, and skips a completed one. ``--line-api-host`` points the adapter at a local LINE API
+stand-in for rehearsals.
+
+Usage:
+    uv run python scripts/broadcast_forecast.py
+    uv run python scripts/broadcast_forecast.py --run-key morning-2026-10-19
+    uv run python scripts/broadcast_forecast.py \\
+        --line-api-host https://127.0.0.1:8443 --ssl-ca-cert stand-in.pem
+"""
+
+import argparse
+import logging
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.broadcast.service import run_forecast_broadcast
+from app.core.config import settings
+from app.line.messaging import LineSdkReplyMessenger
+
+
+def default_run_key() -> str:
+    """Name the run after today's date in Taiwan time."""
+    taiwan_now = datetime.now(timezone(timedelta(hours=8)))
+    return f"morning-{taiwan_now:%Y-%m-%d}"
+
+
+def main() -> None:
+    """Run one forecast broadcast."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--run-key", default=default_run_key(), help="checkpoint name")
+    parser.add_argument("--max-concurrency", type=int, help="multicast requests in flight")
+    parser.add_argument("--line-api-host", help="Messaging API base URL override")
+    parser.add_argument("--ssl-ca-cert", help="CA bundle for an overridden host")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    messenger = LineSdkReplyMessenger(
+        settings.LINE_CHANNEL_ACCESS_TOKEN,
+        pool_maxsize=args.max_concurrency or settings.BROADCAST_MAX_CONCURRENCY,
+        connect_timeout=settings.LINE_API_CONNECT_TIMEOUT_SECONDS,
+        read_timeout=settings.LINE_API_READ_TIMEOUT_SECONDS,
+        host=args.line_api_host,
+        ssl_ca_cert=args.ssl_ca_cert,
+    )
+    try:
+        summary = run_forecast_broadcast(
+            messenger, args.run_key, max_concurrency=args.max_concurrency
+        )
+    finally:
+        messenger.close()
+
+    if summary.already_completed:
+        print(f"✅ {args.run_key} already completed")
+        return
+    print(
+        f"📣 {args.run_key}: {summary.recipients_sent} sent, {summary.recipients_failed} failed, "
+        f"{summary.recipients_skipped} skipped{' (resumed)' if summary.resumed else ''}"
+    )
+    if summary.chunks_failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Run the scheduled forecast subscription worker.
+
+Every minute the worker claims unsent shards of the due subscription buckets
+through Redis leases and pushes each Location's forecast to its subscribers.
+Run one worker per pod; they share busy minutes shard by shard.
+
+Usage:
+    uv run python scripts/run_forecast_scheduler.py
+    uv run python scripts/run_forecast_scheduler.py --once
+"""
+
+import argparse
+import logging
+import signal
+import sys
+import threading
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.broadcast.scheduler import ForecastScheduler
+from app.core.config import settings
+from app.line.messaging import LineSdkReplyMessenger
+
+
+def main() -> None:
+    """Run the scheduler until interrupted, or for a single tick."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--once", action="store_true", help="run one tick and exit")
+    parser.add_argument("--line-api-host", help="Messaging API base URL override")
+    parser.add_argument("--ssl-ca-cert", help="CA bundle for an overridden host")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    messenger = LineSdkReplyMessenger(
+        settings.LINE_CHANNEL_ACCESS_TOKEN,
+        connect_timeout=settings.LINE_API_CONNECT_TIMEOUT_SECONDS,
+        read_timeout=settings.LINE_API_READ_TIMEOUT_SECONDS,
+        host=args.line_api_host,
+        ssl_ca_cert=args.ssl_ca_cert,
+    )
+    scheduler = ForecastScheduler(messenger)
+    try:
+        if args.once:
+            print(f"📣 Scheduled forecasts sent to {scheduler.run_once()} subscribers")
+            return
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+        scheduler.run_forever(stop)
+    finally:
+        messenger.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""Tests for scheduled forecast subscriptions and the bucket scheduler."""
+
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+from unittest.mock import Mock, patch
+
+import pytest
+from redis.exceptions import RedisError
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.broadcast.models import ForecastSubscription, SubscriptionRecipient
+from app.broadcast.scheduler import (
+    BucketLeaseService,
+    ForecastScheduler,
+    ShardResult,
+    SubscriptionBucket,
+    due_buckets,
+)
+from app.broadcast.subscriptions import subscribe_forecast, unsubscribe_forecast
+from app.core.database import Base
+from app.line.messaging import (
+    InMemoryReplyMessenger,
+    SendErrorCategory,
+    SendResult,
+    TextRecipe,
+)
+from app.user.models import User
+from app.weather.models import Location
+
+# 07:00 in Taiwan on 2026-10-19
+SEND_MINUTE = 7 * 60
+NOW = datetime(2026, 10, 18, 23, 0, 30, tzinfo=UTC)
+
+
+@pytest.fixture
+def scheduler_db() -> Iterator[sessionmaker[Session]]:
+    """Provide an isolated database with subscribers at two Locations."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(engine, autoflush=False)
+    with factory.begin() as session:
+        session.add_all(
+            Location(
+                geocode=f"6300{i}", county="臺北市", district=f"區{i}", full_name=f"臺北市區{i}"
+            )
+            for i in (1, 2)
+        )
+        session.add_all(
+            [
+                User(line_user_id="home-1", home_location_id=1),
+                User(line_user_id="office-1", work_location_id=1),
+                User(line_user_id="home-2", home_location_id=2),
+                User(line_user_id="late", home_location_id=1),
+                User(line_user_id="unset"),
+            ]
+        )
+        session.flush()
+        session.add_all(
+            [
+                ForecastSubscription(user_id=1, preset="home", send_minute=SEND_MINUTE),
+                ForecastSubscription(user_id=2, preset="office", send_minute=SEND_MINUTE),
+                ForecastSubscription(user_id=3, preset="home", send_minute=SEND_MINUTE),
+                ForecastSubscription(user_id=4, preset="home", send_minute=SEND_MINUTE + 1),
+                ForecastSubscription(user_id=5, preset="home", send_minute=SEND_MINUTE),
+            ]
+        )
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def scheduler_settings() -> Iterator[Mock]:
+    """Run the scheduler without catch-up and with configurable shards."""
+    with patch("app.broadcast.scheduler.settings") as mock_settings:
+        mock_settings.FORECAST_SCHEDULER_SHARDS = 1
+        mock_settings.FORECAST_SCHEDULER_CATCH_UP_MINUTES = 0
+        mock_settings.FORECAST_SCHEDULER_LEASE_SECONDS = 300
+        yield mock_settings
+
+
+@pytest.fixture
+def render() -> Iterator[Mock]:
+    """Render a recognizable recipe per Location."""
+    with patch(
+        "app.broadcast.scheduler.render_location_forecast",
+        side_effect=lambda _session, location_id: TextRecipe(f"forecast {location_id}"),
+    ) as mock_render:
+        yield mock_render
+
+
+@pytest.fixture
+def no_redis() -> Iterator[None]:
+    """Run leases without a shared Redis client."""
+    with patch("app.broadcast.scheduler.shared_redis") as mock_shared:
+        mock_shared.get_client.return_value = None
+        yield
+
+
+def test_due_buckets_use_taiwan_minutes_with_catch_up() -> None:
+    """Bucket by Taiwan date and minute, listing missed minutes first."""
+    assert due_buckets(NOW, 2) == [
+        SubscriptionBucket("2026-10-19", SEND_MINUTE - 2),
+        SubscriptionBucket("2026-10-19", SEND_MINUTE - 1),
+        SubscriptionBucket("2026-10-19", SEND_MINUTE),
+    ]
+
+
+@pytest.mark.usefixtures("scheduler_settings", "no_redis")
+def test_bucket_groups_subscribers_by_preset_location(
+    scheduler_db: sessionmaker[Session], render: Mock
+) -> None:
+    """Render each Location once per bucket and multicast to its subscribers."""
+    messenger = InMemoryReplyMessenger()
+
+    sent = ForecastScheduler(messenger, session_factory=scheduler_db).run_once(NOW)
+
+    assert sent == 3
+    assert [call.args[1] for call in render.call_args_list] == [1, 2]
+    assert [(item.user_ids, item.recipe.text) for item in messenger.sent_multicasts] == [
+        (("home-1", "office-1"), "forecast 1"),
+        (("home-2",), "forecast 2"),
+    ]
+
+
+@pytest.mark.usefixtures("render")
+def test_shards_partition_locations(scheduler_db: sessionmaker[Session]) -> None:
+    """Split a bucket into shards that each own whole Locations."""
+    messenger = InMemoryReplyMessenger()
+    scheduler = ForecastScheduler(messenger, session_factory=scheduler_db)
+    bucket = SubscriptionBucket.at(NOW)
+
+    assert scheduler.send_shard(bucket, 0, 2) == ShardResult(sent=1)
+    assert scheduler.send_shard(bucket, 1, 2) == ShardResult(sent=2)
+    assert [item.recipe.text for item in messenger.sent_multicasts] == [
+        "forecast 2",
+        "forecast 1",
+    ]
+
+
+@pytest.mark.usefixtures("scheduler_settings", "render", "no_redis")
+def test_sent_shards_are_not_resent_by_catch_up(
+    scheduler_db: sessionmaker[Session], scheduler_settings: Mock
+) -> None:
+    """Skip shards this worker already sent, even without Redis."""
+    messenger = InMemoryReplyMessenger()
+    scheduler = ForecastScheduler(messenger, session_factory=scheduler_db)
+    scheduler.run_once(NOW)
+    scheduler_settings.FORECAST_SCHEDULER_CATCH_UP_MINUTES = 1
+
+    assert scheduler.run_once(NOW + timedelta(minutes=1)) == 1
+    assert messenger.sent_multicasts[-1].user_ids == ("late",)
+
+
+@pytest.mark.usefixtures("scheduler_settings", "render")
+def test_shard_claimed_by_another_worker_is_skipped(scheduler_db: sessionmaker[Session]) -> None:
+    """Send nothing for a shard whose Redis lease is already held."""
+    redis_client = Mock()
+    redis_client.set.return_value = None
+    messenger = InMemoryReplyMessenger()
+
+    with patch("app.broadcast.scheduler.shared_redis") as mock_shared:
+        mock_shared.get_client.return_value = redis_client
+        sent = ForecastScheduler(messenger, session_factory=scheduler_db).run_once(NOW)
+
+    assert sent == 0
+    assert messenger.sent_multicasts == []
+    assert redis_client.set.call_args.kwargs == {"nx": True, "ex": 300}
+
+
+@pytest.mark.usefixtures("scheduler_settings", "render")
+def test_failed_shard_releases_its_lease(scheduler_db: sessionmaker[Session]) -> None:
+    """Release the lease of a shard that raised so another worker retries it."""
+    redis_client = Mock()
+    redis_client.set.return_value = True
+    messenger = Mock()
+    messenger.multicast.side_effect = RuntimeError("boom")
+
+    with patch("app.broadcast.scheduler.shared_redis") as mock_shared:
+        mock_shared.get_client.return_value = redis_client
+        sent = ForecastScheduler(messenger, session_factory=scheduler_db).run_once(NOW)
+
+    assert sent == 0
+    redis_client.delete.assert_called_once_with(SubscriptionBucket.at(NOW).lease_key(0))
+
+
+@pytest.mark.usefixtures("scheduler_settings", "render")
+def test_shard_with_failed_multicast_is_released_for_retry(
+    scheduler_db: sessionmaker[Session],
+) -> None:
+    """Release a shard whose chunk failed, still sending its other chunks."""
+    redis_client = Mock()
+    redis_client.set.return_value = True
+    messenger = Mock()
+    messenger.multicast.side_effect = lambda user_ids, _recipe, _retry_key: (
+        SendResult.failed(SendErrorCategory.INVALID_REQUEST)
+        if "home-2" in user_ids
+        else SendResult.sent()
+    )
+    scheduler = ForecastScheduler(messenger, session_factory=scheduler_db)
+
+    with patch("app.broadcast.scheduler.shared_redis") as mock_shared:
+        mock_shared.get_client.return_value = redis_client
+        sent = scheduler.run_once(NOW)
+
+    key = SubscriptionBucket.at(NOW).lease_key(0)
+    assert sent == 2
+    assert messenger.multicast.call_count == 2
+    redis_client.delete.assert_called_once_with(key)
+    assert all(call.args[1] != "done" for call in redis_client.set.call_args_list)
+    assert key not in scheduler._leases._done
+
+
+@pytest.mark.usefixtures("render")
+def test_retried_shard_sends_its_snapshot_chunks(scheduler_db: sessionmaker[Session]) -> None:
+    """Retry a failed chunk with its first recipients and retry key, then drop the snapshot."""
+    messenger = Mock()
+    messenger.multicast.return_value = SendResult.failed(SendErrorCategory.LINE_API)
+    bucket = SubscriptionBucket.at(NOW)
+    with patch("app.broadcast.service.settings") as mock_settings:
+        mock_settings.BROADCAST_MAX_ATTEMPTS = 1
+        result = ForecastScheduler(messenger, session_factory=scheduler_db).send_shard(bucket, 0, 2)
+    assert result == ShardResult(failed=1)
+    first_attempt = messenger.multicast.call_args.args
+
+    with scheduler_db.begin() as session:
+        session.add(User(line_user_id="joined", home_location_id=2))
+        session.flush()
+        session.add(ForecastSubscription(user_id=6, preset="home", send_minute=SEND_MINUTE))
+    messenger.multicast.return_value = SendResult.sent()
+    result = ForecastScheduler(messenger, session_factory=scheduler_db).send_shard(bucket, 0, 2)
+
+    assert result == ShardResult(sent=1)
+    assert messenger.multicast.call_args.args == first_attempt
+    assert first_attempt[0] == ("home-2",)
+    with scheduler_db() as session:
+        assert session.scalars(select(SubscriptionRecipient)).all() == []
+
+
+@pytest.mark.usefixtures("render")
+def test_subscriber_of_both_presets_at_one_location_gets_one_copy(
+    scheduler_db: sessionmaker[Session],
+) -> None:
+    """Send a single forecast when home and office point at the same Location."""
+    with scheduler_db.begin() as session:
+        session.get_one(User, 1).work_location_id = 1
+        session.add(ForecastSubscription(user_id=1, preset="office", send_minute=SEND_MINUTE))
+    messenger = InMemoryReplyMessenger()
+
+    ForecastScheduler(messenger, session_factory=scheduler_db).send_shard(
+        SubscriptionBucket.at(NOW), 1, 2
+    )
+
+    assert [item.user_ids for item in messenger.sent_multicasts] == [("home-1", "office-1")]
+
+
+def test_lease_done_marker_outlives_the_short_lease() -> None:
+    """Keep the lease of a sent shard for a day."""
+    redis_client = Mock()
+    with patch("app.broadcast.scheduler.shared_redis") as mock_shared:
+        mock_shared.get_client.return_value = redis_client
+        BucketLeaseService().mark_done("key")
+
+    redis_client.set.assert_called_once_with("key", "done", ex=24 * 60 * 60)
+
+
+def test_lease_redis_errors_are_reported_to_the_shared_breaker() -> None:
+    """Claim the shard anyway and report the failure so an outage opens the breaker."""
+    redis_client = Mock()
+    redis_client.set.side_effect = RedisError("down")
+    with patch("app.broadcast.scheduler.shared_redis") as mock_shared:
+        mock_shared.get_client.return_value = redis_client
+        assert BucketLeaseService().try_claim("key") is True
+
+    mock_shared.record_failure.assert_called_once_with()
+    mock_shared.record_success.assert_not_called()
+
+
+class TestSubscriptions:
+    """Test creating, updating, and cancelling subscriptions."""
+
+    def test_subscribe_creates_then_updates(self, scheduler_db: sessionmaker[Session]) -> None:
+        """Keep one subscription per user and preset."""
+        with scheduler_db() as session:
+            assert subscribe_forecast(session, "unset", "office", 480)
+            assert subscribe_forecast(session, "unset", "office", 510)
+            subscriptions = session.scalars(
+                select(ForecastSubscription).where(ForecastSubscription.preset == "office")
+            ).all()
+
+        assert [(item.user_id, item.send_minute) for item in subscriptions] == [(2, 420), (5, 510)]
+
+    def test_unsubscribe_deactivates(self, scheduler_db: sessionmaker[Session]) -> None:
+        """Deactivate an active subscription once."""
+        with scheduler_db() as session:
+            assert unsubscribe_forecast(session, "home-1", "home")
+            assert not unsubscribe_forecast(session, "home-1", "home")
+            assert subscribe_forecast(session, "home-1", "home", 0)
+
+    def test_unknown_user_is_not_subscribed(self, scheduler_db: sessionmaker[Session]) -> None:
+        """Return False for users that do not exist."""
+        with scheduler_db() as session:
+            assert not subscribe_forecast(session, "missing", "home", 0)
+
+    @pytest.mark.parametrize(("preset", "minute"), [("gym", 0), ("home", -1), ("home", 1440)])
+    def test_invalid_subscription_is_rejected(
+        self, scheduler_db: sessionmaker[Session], preset: str, minute: int
+    ) -> None:
+        """Reject unknown presets and minutes outside the day."""
+        with scheduler_db() as session, pytest.raises(ValueError):
+            subscribe_forecast(session, "home-1", preset, minute)
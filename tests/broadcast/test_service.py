@@ -0,0 +1,312 @@
+"""Integration tests for the forecast broadcast engine."""
+
+from collections.abc import Iterator, Sequence
+from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.broadcast.models import BroadcastRecipient, BroadcastRun
+from app.broadcast.service import (
+    BroadcastChunk,
+    BroadcastCursor,
+    _retry_key,
+    iter_broadcast_chunks,
+    run_forecast_broadcast,
+    snapshot_recipients,
+)
+from app.core.database import Base
+from app.line.messaging import (
+    InMemoryReplyMessenger,
+    ReplyRecipe,
+    SendErrorCategory,
+    SendResult,
+    TextRecipe,
+)
+from app.user.models import User
+from app.weather.models import Location, Weather
+
+
+@pytest.fixture
+def broadcast_db() -> Iterator[sessionmaker[Session]]:
+    """Provide an isolated database with two forecast Locations and one without."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(engine, autoflush=False)
+    now = datetime.now(UTC)
+    with factory.begin() as session:
+        locations = [
+            Location(geocode=f"6300{i}", county="臺北市", district=name, full_name=f"臺北市{name}")
+            for i, name in enumerate(["松山區", "信義區", "大安區"], start=1)
+        ]
+        session.add_all(locations)
+        session.flush()
+        for location in locations[:2]:
+            session.add(
+                Weather(
+                    location_id=location.id,
+                    start_time=now,
+                    end_time=now + timedelta(hours=3),
+                    fetched_at=now,
+                    weather_condition="晴",
+                    weather_emoji="☀️",
+                    precipitation_probability=10,
+                    max_temperature=30,
+                    raw_description="晴",
+                )
+            )
+        # Location 1 gets five users, location 2 two, location 3 (no forecast) one.
+        for index, location in enumerate([1, 1, 2, 1, 3, 1, 2, 1], start=1):
+            session.add(User(line_user_id=f"U{index}", home_location_id=location))
+        session.add(User(line_user_id="inactive", home_location_id=1, is_active=False))
+        session.add(User(line_user_id="no-home"))
+    yield factory
+    engine.dispose()
+
+
+class _InterruptingMessenger(InMemoryReplyMessenger):
+    """Stop the run by raising after a number of successful multicasts."""
+
+    def __init__(self, fail_after: int) -> None:
+        """Allow ``fail_after`` multicasts before interrupting."""
+        super().__init__()
+        self.fail_after = fail_after
+
+    def multicast(
+        self, user_ids: Sequence[str], recipe: ReplyRecipe, retry_key: str | None = None
+    ) -> SendResult:
+        """Record multicasts until the interruption point."""
+        if len(self.sent_multicasts) >= self.fail_after:
+            raise RuntimeError("worker killed")
+        return super().multicast(user_ids, recipe, retry_key)
+
+
+class _FailingChunkMessenger(InMemoryReplyMessenger):
+    """Reject the multicast to one recipient list with a permanent failure."""
+
+    def __init__(self, failing_user_ids: tuple[str, ...]) -> None:
+        """Fail every multicast to ``failing_user_ids``."""
+        super().__init__()
+        self.failing_user_ids = failing_user_ids
+
+    def multicast(
+        self, user_ids: Sequence[str], recipe: ReplyRecipe, retry_key: str | None = None
+    ) -> SendResult:
+        """Send everything except the failing chunk."""
+        if tuple(user_ids) == self.failing_user_ids:
+            return SendResult.failed(SendErrorCategory.INVALID_REQUEST)
+        return super().multicast(user_ids, recipe, retry_key)
+
+
+class _FlakyMessenger(InMemoryReplyMessenger):
+    """Fail the first multicast with a transport error."""
+
+    def __init__(self) -> None:
+        """Start with a failing transport."""
+        super().__init__(failure_category=SendErrorCategory.TRANSPORT)
+        self.retry_keys: list[str | None] = []
+
+    def multicast(
+        self, user_ids: Sequence[str], recipe: ReplyRecipe, retry_key: str | None = None
+    ) -> SendResult:
+        """Recover after the first attempt."""
+        self.retry_keys.append(retry_key)
+        result = super().multicast(user_ids, recipe, retry_key)
+        self.failure_category = None
+        return result
+
+
+def test_chunks_stream_active_users_grouped_by_location(
+    broadcast_db: sessionmaker[Session],
+) -> None:
+    """Group active users with a home Location into bounded per-Location chunks."""
+    with broadcast_db() as session, patch("app.broadcast.service.MULTICAST_MAX_RECIPIENTS", 2):
+        run = BroadcastRun(run_key="morning", recipients_sent=0, recipients_failed=0)
+        session.add(run)
+        session.flush()
+        snapshot_recipients(session, run.id)
+        chunks = list(iter_broadcast_chunks(session, run.id))
+        resumed = list(iter_broadcast_chunks(session, run.id, chunks[1].cursor))
+
+    assert [(chunk.location_id, chunk.index, chunk.line_user_ids) for chunk in chunks] == [
+        (1, 0, ("U1", "U2")),
+        (1, 1, ("U4", "U6")),
+        (1, 2, ("U8",)),
+        (2, 0, ("U3", "U7")),
+        (3, 0, ("U5",)),
+    ]
+    assert chunks[1].cursor.location_id == 1
+    assert chunks[1].cursor.user_id == 6
+    assert resumed == chunks[2:]
+
+
+def test_broadcast_renders_each_location_once_and_multicasts(
+    broadcast_db: sessionmaker[Session],
+) -> None:
+    """Send one rendered forecast per Location and skip Locations without one."""
+    messenger = InMemoryReplyMessenger()
+
+    with (
+        patch("app.broadcast.service.MULTICAST_MAX_RECIPIENTS", 2),
+        patch(
+            "app.broadcast.service.render_location_forecast",
+            side_effect=lambda _session, location_id: (
+                None if location_id == 3 else TextRecipe(f"forecast {location_id}")
+            ),
+        ) as render,
+    ):
+        summary = run_forecast_broadcast(
+            messenger, "morning", session_factory=broadcast_db, max_concurrency=3
+        )
+
+    assert [call.args[1] for call in render.call_args_list] == [1, 2, 3]
+    assert [(sent.user_ids, sent.recipe.text) for sent in messenger.sent_multicasts] == [
+        (("U1", "U2"), "forecast 1"),
+        (("U4", "U6"), "forecast 1"),
+        (("U8",), "forecast 1"),
+        (("U3", "U7"), "forecast 2"),
+    ]
+    assert (summary.recipients_sent, summary.recipients_skipped) == (7, 1)
+    with broadcast_db() as session:
+        run = session.scalars(select(BroadcastRun)).one()
+        assert run.completed_at is not None
+        assert run.recipients_sent == 7
+
+
+def test_broadcast_uses_real_forecast_text(broadcast_db: sessionmaker[Session]) -> None:
+    """Render the Location forecast with the shared presentation formatter."""
+    messenger = InMemoryReplyMessenger()
+
+    run_forecast_broadcast(messenger, "morning", session_factory=broadcast_db)
+
+    texts = {sent.recipe.text.splitlines()[0] for sent in messenger.sent_multicasts}
+    assert texts == {"🗺️ 臺北市松山區", "🗺️ 臺北市信義區"}
+
+
+def test_interrupted_broadcast_resumes_after_checkpoint(
+    broadcast_db: sessionmaker[Session],
+) -> None:
+    """Resume after the last settled chunk and skip a completed run."""
+    interrupted = _InterruptingMessenger(fail_after=2)
+    with patch("app.broadcast.service.MULTICAST_MAX_RECIPIENTS", 2):
+        with pytest.raises(RuntimeError):
+            run_forecast_broadcast(
+                interrupted, "morning", session_factory=broadcast_db, max_concurrency=1
+            )
+
+        resumed = InMemoryReplyMessenger()
+        summary = run_forecast_broadcast(
+            resumed, "morning", session_factory=broadcast_db, max_concurrency=1
+        )
+        rerun = run_forecast_broadcast(
+            InMemoryReplyMessenger(), "morning", session_factory=broadcast_db
+        )
+
+    assert summary.resumed
+    assert [sent.user_ids for sent in resumed.sent_multicasts] == [("U8",), ("U3", "U7")]
+    assert rerun.already_completed
+    with broadcast_db() as session:
+        assert session.scalars(select(BroadcastRun)).one().recipients_sent == 7
+
+
+def test_retry_keys_are_stable_per_run_and_chunk() -> None:
+    """Derive the same retry key for a chunk position only within the same run."""
+    chunk = BroadcastChunk(1, 0, ("U1", "U2"), BroadcastCursor(1, 2))
+    same_position = BroadcastChunk(1, 0, ("U2", "U9"), BroadcastCursor(1, 9))
+
+    assert _retry_key("morning", chunk) == _retry_key("morning", same_position)
+    assert _retry_key("morning", chunk) != _retry_key("evening", chunk)
+    assert _retry_key("morning", chunk) != _retry_key(
+        "morning", BroadcastChunk(1, 1, ("U1", "U2"), BroadcastCursor(1, 2))
+    )
+
+
+def test_resumed_run_keeps_its_recipient_snapshot(broadcast_db: sessionmaker[Session]) -> None:
+    """Resume over the recipients captured at the start, ignoring later user changes."""
+    interrupted = _InterruptingMessenger(fail_after=1)
+    with patch("app.broadcast.service.MULTICAST_MAX_RECIPIENTS", 2):
+        with pytest.raises(RuntimeError):
+            run_forecast_broadcast(
+                interrupted, "morning", session_factory=broadcast_db, max_concurrency=1
+            )
+        with broadcast_db.begin() as session:
+            session.scalars(select(User).where(User.line_user_id == "U4")).one().is_active = False
+            session.add(User(line_user_id="U-late", home_location_id=1))
+
+        resumed = InMemoryReplyMessenger()
+        run_forecast_broadcast(resumed, "morning", session_factory=broadcast_db, max_concurrency=1)
+
+    assert [sent.user_ids for sent in resumed.sent_multicasts] == [
+        ("U4", "U6"),
+        ("U8",),
+        ("U3", "U7"),
+    ]
+    with broadcast_db() as session:
+        assert session.scalars(select(BroadcastRecipient)).all() == []
+
+
+def test_failed_chunk_is_retried_by_the_next_attempt(
+    broadcast_db: sessionmaker[Session],
+) -> None:
+    """Keep the run open after a failed chunk and retry it with the same retry key."""
+    failing = _FailingChunkMessenger(("U4", "U6"))
+    with patch("app.broadcast.service.MULTICAST_MAX_RECIPIENTS", 2):
+        first = run_forecast_broadcast(
+            failing, "morning", session_factory=broadcast_db, max_concurrency=1
+        )
+        with broadcast_db() as session:
+            run = session.scalars(select(BroadcastRun)).one()
+            assert run.completed_at is None
+            assert (run.last_location_id, run.last_user_id) == (1, 2)
+            assert (run.recipients_sent, run.recipients_failed) == (2, 2)
+
+        retried = InMemoryReplyMessenger()
+        second = run_forecast_broadcast(
+            retried, "morning", session_factory=broadcast_db, max_concurrency=1
+        )
+
+    assert (first.chunks_failed, first.recipients_sent) == (1, 5)
+    assert second.resumed
+    assert retried.sent_multicasts[0].user_ids == ("U4", "U6")
+    assert retried.sent_multicasts[0].retry_key == _retry_key(
+        "morning", BroadcastChunk(1, 1, ("U4", "U6"), BroadcastCursor(1, 6))
+    )
+    first_keys = {sent.user_ids: sent.retry_key for sent in failing.sent_multicasts}
+    assert all(
+        sent.retry_key == first_keys[sent.user_ids]
+        for sent in retried.sent_multicasts
+        if sent.user_ids in first_keys
+    )
+    with broadcast_db() as session:
+        run = session.scalars(select(BroadcastRun)).one()
+        assert run.completed_at is not None
+        assert (run.recipients_sent, run.recipients_failed) == (7, 0)
+
+
+def test_broadcast_retries_transient_failures(broadcast_db: sessionmaker[Session]) -> None:
+    """Retry transport failures with the same retry key and count final failures."""
+    messenger = _FlakyMessenger()
+
+    with patch("app.broadcast.service.time.sleep") as sleep:
+        summary = run_forecast_broadcast(
+            messenger, "morning", session_factory=broadcast_db, max_concurrency=1
+        )
+
+    calls = messenger.retry_keys
+    assert calls[0] == calls[1]
+    sleep.assert_called_once()
+    assert summary.chunks_failed == 0
+    assert summary.recipients_sent == 7
+
+
+def test_broadcast_counts_permanent_failures(broadcast_db: sessionmaker[Session]) -> None:
+    """Give up on non-retryable failures and keep going with the next chunk."""
+    messenger = InMemoryReplyMessenger(failure_category=SendErrorCategory.AUTHENTICATION)
+
+    with patch("app.broadcast.service.time.sleep") as sleep:
+        summary = run_forecast_broadcast(messenger, "morning", session_factory=broadcast_db)
+
+    sleep.assert_not_called()
+    assert (summary.chunks_failed, summary.recipients_failed) == (2, 7)
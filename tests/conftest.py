@@ -12,6 +12,8 @@ os.environ["DATABASE_URL"] = "sqlite+pysqlite:///:memory:"
 os.environ["LINE_CHANNEL_SECRET"] = "TEST_SECRET"
 os.environ["LINE_CHANNEL_ACCESS_TOKEN"] = "TEST_ACCESS_TOKEN"
 os.environ["ENABLE_ID_TOKEN_SIGNATURE_VERIFICATION"] = "false"
+# Warm-up threads would share the in-memory database with running tests
+os.environ["WARMUP_ENABLED"] = "false"
 os.environ["POSTGRES_USER"] = "test_user"
 os.environ["POSTGRES_PASSWORD"] = "test_password"
 os.environ["POSTGRES_HOST"] = "localhost"
@@ -19,8 +21,11 @@ os.environ["POSTGRES_DB"] = "test_db"
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
+from app.core.access_token_cache import access_token_cache
 from app.core.database import Base, engine
+from app.core.id_token_cache import id_token_cache
 from app.main import app
+from app.user.profile_cache import user_profile_cache
 
 Base.metadata.create_all(bind=engine)
 # Use a module-level singleton instead of creating a new client per fixture
@@ -31,3 +36,16 @@ _client = TestClient(app)
 def client() -> TestClient:
     """Provide a FastAPI test client."""
     return _client
+
+
+@pytest.fixture(autouse=True)
+def clear_user_profile_cache() -> None:
+    """Keep cached user profiles from leaking between isolated test databases."""
+    user_profile_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_token_caches() -> None:
+    """Keep verified access and ID tokens from leaking between tests."""
+    access_token_cache.clear()
+    id_token_cache.clear()
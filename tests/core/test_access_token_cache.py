@@ -0,0 +1,117 @@
+"""Tests for the verified access token cache."""
+
+import hashlib
+import threading
+from collections.abc import Iterator
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+from redis.exceptions import RedisError
+
+from app.core.access_token_cache import AccessTokenCache
+
+
+@pytest.fixture
+def cache_settings() -> Iterator[Mock]:
+    """Provide a small cache with the Redis tier enabled."""
+    with patch("app.core.access_token_cache.settings") as mock_settings:
+        mock_settings.ACCESS_TOKEN_CACHE_ENABLED = True
+        mock_settings.ACCESS_TOKEN_CACHE_MAX_TTL_SECONDS = 300
+        mock_settings.ACCESS_TOKEN_CACHE_MAX_ENTRIES = 2
+        mock_settings.ACCESS_TOKEN_CACHE_REDIS_ENABLED = True
+        yield mock_settings
+
+
+@pytest.fixture
+def redis_client() -> Iterator[Mock]:
+    """Provide a shared Redis client."""
+    client = MagicMock()
+    with patch("app.core.access_token_cache.shared_redis") as mock_shared:
+        mock_shared.get_client.return_value = client
+        yield client
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("cache_settings")
+class TestAccessTokenCache:
+    """Test the in-process and Redis tiers of AccessTokenCache."""
+
+    async def test_set_stores_hash_with_capped_ttl(self, redis_client: Mock) -> None:
+        """Key Redis by the token hash and cap the TTL at the configured maximum."""
+        cache = AccessTokenCache()
+
+        await cache.set("token", "U1", 3600)
+
+        digest = hashlib.sha256(b"token").hexdigest()
+        redis_client.set.assert_called_once_with(f"auth:access:{digest}", "U1", ex=300)
+        assert await cache.get("token") == "U1"
+
+    async def test_entry_expires_with_the_token(self, redis_client: Mock) -> None:
+        """Expire entries after expires_in when it is below the maximum."""
+        redis_client.pipeline.return_value.__enter__.return_value.execute.return_value = [
+            None,
+            -2,
+        ]
+        cache = AccessTokenCache()
+        with patch("app.core.access_token_cache.time.monotonic", return_value=0.0):
+            await cache.set("token", "U1", 60)
+        with patch("app.core.access_token_cache.time.monotonic", return_value=61.0):
+            assert await cache.get("token") is None
+
+    async def test_redis_hit_is_kept_locally(self, redis_client: Mock) -> None:
+        """Serve a token verified by another worker, then skip Redis."""
+        pipe = redis_client.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = ["U1", 120]
+        cache = AccessTokenCache()
+
+        assert await cache.get("token") == "U1"
+        assert await cache.get("token") == "U1"
+        pipe.execute.assert_called_once()
+
+    async def test_evicts_least_recently_used(self, redis_client: Mock) -> None:
+        """Keep the local tier within its configured size."""
+        redis_client.pipeline.side_effect = RedisError("down")
+        cache = AccessTokenCache()
+        await cache.set("a", "U1", 60)
+        await cache.set("b", "U2", 60)
+        await cache.get("a")
+        await cache.set("c", "U3", 60)
+
+        assert [await cache.get(token) for token in ("a", "b", "c")] == ["U1", None, "U3"]
+
+    async def test_redis_errors_fail_open(self, redis_client: Mock) -> None:
+        """Keep working locally when Redis fails."""
+        redis_client.set.side_effect = RedisError("down")
+        cache = AccessTokenCache()
+
+        await cache.set("token", "U1", 60)
+
+        assert await cache.get("token") == "U1"
+
+    async def test_redis_tier_runs_off_the_event_loop(self, redis_client: Mock) -> None:
+        """Call the blocking Redis client from a worker thread, not the loop thread."""
+        loop_thread = threading.get_ident()
+        calling_threads = []
+        redis_client.set.side_effect = lambda *_args, **_kwargs: calling_threads.append(
+            threading.get_ident()
+        )
+        pipe = redis_client.pipeline.return_value.__enter__.return_value
+        pipe.execute.side_effect = lambda: calling_threads.append(threading.get_ident()) or [
+            None,
+            -2,
+        ]
+
+        await AccessTokenCache().set("token", "U1", 60)
+        await AccessTokenCache().get("other")
+
+        assert len(calling_threads) == 2
+        assert loop_thread not in calling_threads
+
+    async def test_disabled_cache_stores_nothing(self, cache_settings: Mock) -> None:
+        """Bypass both tiers when the cache is disabled."""
+        cache_settings.ACCESS_TOKEN_CACHE_ENABLED = False
+        cache = AccessTokenCache()
+
+        await cache.set("token", "U1", 60)
+
+        assert await cache.get("token") is None
@@ -0,0 +1,102 @@
+"""Tests for the compiled admin divisions snapshot."""
+
+import json
+import logging
+import marshal
+import struct
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.core.admin_divisions import AdminDivisionsManager
+from app.core.admin_divisions_snapshot import (
+    AdminDivisionsData,
+    build_snapshot,
+    load_snapshot,
+)
+
+JSON_BYTES = json.dumps(
+    {"臺北市": ["信義區", "中正區"], "臺南市": ["中西區", "東區"], "臺中市": ["東區"]}
+).encode()
+
+
+def test_from_mapping_builds_full_names() -> None:
+    """Build the validation set from the JSON mapping."""
+    data = AdminDivisionsData.from_mapping(json.loads(JSON_BYTES))
+
+    assert "臺北市信義區" in data.full_names
+    assert len(data.full_names) == 5
+
+
+def test_snapshot_round_trip(tmp_path: Path) -> None:
+    """Load exactly the data the snapshot was built from."""
+    snapshot_path = tmp_path / "nested" / "divisions.snapshot"
+
+    built = build_snapshot(JSON_BYTES, snapshot_path)
+
+    assert load_snapshot(JSON_BYTES, snapshot_path) == built
+    assert not snapshot_path.with_name("divisions.snapshot.tmp").exists()
+
+
+def test_stale_snapshot_is_ignored(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """Fall back when the JSON changed after the snapshot was built."""
+    snapshot_path = tmp_path / "divisions.snapshot"
+    build_snapshot(JSON_BYTES, snapshot_path)
+
+    with caplog.at_level(logging.INFO):
+        assert load_snapshot(JSON_BYTES + b" ", snapshot_path) is None
+
+    assert "stale" in caplog.text
+
+
+def test_missing_foreign_and_corrupt_snapshots_are_ignored(tmp_path: Path) -> None:
+    """Fall back for any snapshot this build cannot trust."""
+    snapshot_path = tmp_path / "divisions.snapshot"
+    assert load_snapshot(JSON_BYTES, snapshot_path) is None
+
+    snapshot_path.write_bytes(b"not a snapshot")
+    assert load_snapshot(JSON_BYTES, snapshot_path) is None
+
+    build_snapshot(JSON_BYTES, snapshot_path)
+    snapshot = snapshot_path.read_bytes()
+    header_at = len(b"WMADSNAP")
+    snapshot_path.write_bytes(
+        snapshot[:header_at] + struct.pack(">HH", 99, marshal.version) + snapshot[header_at + 4 :]
+    )
+    assert load_snapshot(JSON_BYTES, snapshot_path) is None
+
+    snapshot_path.write_bytes(snapshot[:-3])
+    assert load_snapshot(JSON_BYTES, snapshot_path) is None
+
+
+def test_manager_prefers_a_matching_snapshot(tmp_path: Path) -> None:
+    """Load the manager from the snapshot and fall back to JSON when it is stale."""
+    json_path = tmp_path / "divisions.json"
+    json_path.write_bytes(JSON_BYTES)
+    snapshot_path = tmp_path / "divisions.snapshot"
+    build_snapshot(JSON_BYTES, snapshot_path)
+    manager = AdminDivisionsManager()
+
+    try:
+        with (
+            patch("app.core.admin_divisions.ADMIN_DIVISIONS_JSON_PATH", json_path),
+            patch("app.core.admin_divisions.ADMIN_DIVISIONS_SNAPSHOT_PATH", snapshot_path),
+            patch(
+                "app.core.admin_divisions.AdminDivisionsData.from_mapping",
+                side_effect=AssertionError("JSON parsed despite a matching snapshot"),
+            ),
+        ):
+            manager._load_admin_divisions()
+        assert manager.get_valid_divisions_count() == 5
+        assert manager.is_valid_division("臺南市東區")
+
+        json_path.write_bytes(json.dumps({"臺北市": ["信義區"]}).encode())
+        with (
+            patch("app.core.admin_divisions.ADMIN_DIVISIONS_JSON_PATH", json_path),
+            patch("app.core.admin_divisions.ADMIN_DIVISIONS_SNAPSHOT_PATH", snapshot_path),
+        ):
+            manager._load_admin_divisions()
+        assert manager.get_valid_divisions_count() == 1
+    finally:
+        manager._load_admin_divisions()
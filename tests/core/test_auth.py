@@ -1,5 +1,6 @@
 """Test authentication utilities."""
 
+import asyncio
 import time
 from collections.abc import Callable
 from unittest.mock import AsyncMock, Mock, patch
@@ -16,6 +17,7 @@ from app.core.auth import (
     verify_line_access_token,
     verify_line_id_token,
 )
+from app.core.http_client import line_platform_http
 
 
 class TestVerifyLineAccessToken:
@@ -40,9 +42,9 @@ class TestVerifyLineAccessToken:
         profile_response_mock.status_code = 200
         profile_response_mock.json.return_value = {"userId": line_user_id}
 
-        with patch("httpx.AsyncClient") as mock_client:
+        with patch.object(line_platform_http, "get_async_client") as mock_get_client:
             mock_client_instance = AsyncMock()
-            mock_client.return_value.__aenter__.return_value = mock_client_instance
+            mock_get_client.return_value = mock_client_instance
             mock_client_instance.get.side_effect = [verify_response_mock, profile_response_mock]
 
             result = await verify_line_access_token(access_token)
@@ -59,9 +61,9 @@ class TestVerifyLineAccessToken:
         verify_response_mock = Mock()
         verify_response_mock.status_code = 401
 
-        with patch("httpx.AsyncClient") as mock_client:
+        with patch.object(line_platform_http, "get_async_client") as mock_get_client:
             mock_client_instance = AsyncMock()
-            mock_client.return_value.__aenter__.return_value = mock_client_instance
+            mock_get_client.return_value = mock_client_instance
             mock_client_instance.get.return_value = verify_response_mock
 
             with pytest.raises(HTTPException) as exc_info:
@@ -79,9 +81,9 @@ class TestVerifyLineAccessToken:
         verify_response_mock.status_code = 200
         verify_response_mock.json.return_value = {"expires_in": 3600}  # No client_id
 
-        with patch("httpx.AsyncClient") as mock_client:
+        with patch.object(line_platform_http, "get_async_client") as mock_get_client:
             mock_client_instance = AsyncMock()
-            mock_client.return_value.__aenter__.return_value = mock_client_instance
+            mock_get_client.return_value = mock_client_instance
             mock_client_instance.get.return_value = verify_response_mock
 
             with pytest.raises(HTTPException) as exc_info:
@@ -101,9 +103,9 @@ class TestVerifyLineAccessToken:
             "expires_in": 0,  # Expired
         }
 
-        with patch("httpx.AsyncClient") as mock_client:
+        with patch.object(line_platform_http, "get_async_client") as mock_get_client:
             mock_client_instance = AsyncMock()
-            mock_client.return_value.__aenter__.return_value = mock_client_instance
+            mock_get_client.return_value = mock_client_instance
             mock_client_instance.get.return_value = verify_response_mock
 
             with pytest.raises(HTTPException) as exc_info:
@@ -126,9 +128,9 @@ class TestVerifyLineAccessToken:
         profile_response_mock = Mock()
         profile_response_mock.status_code = 401
 
-        with patch("httpx.AsyncClient") as mock_client:
+        with patch.object(line_platform_http, "get_async_client") as mock_get_client:
             mock_client_instance = AsyncMock()
-            mock_client.return_value.__aenter__.return_value = mock_client_instance
+            mock_get_client.return_value = mock_client_instance
             mock_client_instance.get.side_effect = [verify_response_mock, profile_response_mock]
 
             with pytest.raises(HTTPException) as exc_info:
@@ -152,9 +154,9 @@ class TestVerifyLineAccessToken:
         profile_response_mock.status_code = 200
         profile_response_mock.json.return_value = {}  # No userId
 
-        with patch("httpx.AsyncClient") as mock_client:
+        with patch.object(line_platform_http, "get_async_client") as mock_get_client:
             mock_client_instance = AsyncMock()
-            mock_client.return_value.__aenter__.return_value = mock_client_instance
+            mock_get_client.return_value = mock_client_instance
             mock_client_instance.get.side_effect = [verify_response_mock, profile_response_mock]
 
             with pytest.raises(HTTPException) as exc_info:
@@ -167,9 +169,9 @@ class TestVerifyLineAccessToken:
         """Test LINE Access Token verification with network error."""
         access_token = "test_access_token"
 
-        with patch("httpx.AsyncClient") as mock_client:
+        with patch.object(line_platform_http, "get_async_client") as mock_get_client:
             mock_client_instance = AsyncMock()
-            mock_client.return_value.__aenter__.return_value = mock_client_instance
+            mock_get_client.return_value = mock_client_instance
             mock_client_instance.get.side_effect = httpx.RequestError("Network error")
 
             with pytest.raises(HTTPException) as exc_info:
@@ -178,6 +180,84 @@ class TestVerifyLineAccessToken:
             assert exc_info.value.status_code == 503
             assert "network error" in exc_info.value.detail
 
+    @pytest.mark.asyncio
+    async def test_verified_access_token_is_cached(self) -> None:
+        """Skip both LINE calls for a token verified before."""
+        verify_response_mock = Mock(status_code=200)
+        verify_response_mock.json.return_value = {"client_id": "client", "expires_in": 3600}
+        profile_response_mock = Mock(status_code=200)
+        profile_response_mock.json.return_value = {"userId": "U123"}
+
+        with patch.object(line_platform_http, "get_async_client") as mock_get_client:
+            mock_client_instance = AsyncMock()
+            mock_get_client.return_value = mock_client_instance
+            mock_client_instance.get.side_effect = [verify_response_mock, profile_response_mock]
+
+            assert await verify_line_access_token("cached_token") == "U123"
+            assert await verify_line_access_token("cached_token") == "U123"
+
+        assert mock_client_instance.get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_access_token_is_not_cached(self) -> None:
+        """Verify a token again after its profile lookup failed."""
+        verify_response_mock = Mock(status_code=200)
+        verify_response_mock.json.return_value = {"client_id": "client", "expires_in": 3600}
+        profile_response_mock = Mock(status_code=500)
+
+        with patch.object(line_platform_http, "get_async_client") as mock_get_client:
+            mock_client_instance = AsyncMock()
+            mock_get_client.return_value = mock_client_instance
+            mock_client_instance.get.side_effect = [verify_response_mock, profile_response_mock] * 2
+
+            for _ in range(2):
+                with pytest.raises(HTTPException):
+                    await verify_line_access_token("failing_token")
+
+        assert mock_client_instance.get.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_verify_and_profile_run_concurrently(self) -> None:
+        """Start the profile fetch before verification completes."""
+        started: list[str] = []
+        release = asyncio.Event()
+
+        async def fake_get(url: str, **_kwargs: object) -> Mock:
+            started.append(url)
+            if len(started) == 2:
+                release.set()
+            await release.wait()
+            if url.endswith("/verify"):
+                response = Mock(status_code=200)
+                response.json.return_value = {"client_id": "client", "expires_in": 60}
+                return response
+            response = Mock(status_code=200)
+            response.json.return_value = {"userId": "U123"}
+            return response
+
+        with patch.object(line_platform_http, "get_async_client") as mock_get_client:
+            mock_get_client.return_value.get = fake_get
+            result = await asyncio.wait_for(verify_line_access_token("concurrent"), 1)
+
+        assert result == "U123"
+        assert len(started) == 2
+
+    @pytest.mark.asyncio
+    async def test_verify_failure_takes_precedence_over_profile_error(self) -> None:
+        """Report a rejected token as 401 even when the profile call failed."""
+        with patch.object(line_platform_http, "get_async_client") as mock_get_client:
+            mock_client_instance = AsyncMock()
+            mock_get_client.return_value = mock_client_instance
+            mock_client_instance.get.side_effect = [
+                Mock(status_code=401),
+                httpx.RequestError("Network error"),
+            ]
+
+            with pytest.raises(HTTPException) as exc_info:
+                await verify_line_access_token("rejected")
+
+        assert exc_info.value.status_code == 401
+
 
 class TestVerifyLineIdToken:
     """Test LINE ID Token verification."""
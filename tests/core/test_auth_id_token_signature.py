@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import json
 import time
 from typing import Any
@@ -39,8 +41,8 @@ def _set_channel_id(channel_id: str | None) -> None:
 
 
 def _install_jwks(jwks_by_kid: dict[str, dict[str, Any]]) -> None:
-    # Install in cache with fresh timestamp
-    auth_module._JWKS_CACHE = (jwks_by_kid, time.time())  # type: ignore[attr-defined]
+    # Install parsed keys in cache with fresh timestamp
+    auth_module._JWKS_CACHE = (auth_module._parse_jwks(jwks_by_kid), time.time())  # type: ignore[attr-defined]
 
 
 def _make_jwt(header: dict[str, Any], payload: dict[str, Any], key: Any) -> str:  # noqa: ANN401
@@ -352,3 +354,155 @@ def test_invalid_jwks_raises_503(monkeypatch: pytest.MonkeyPatch) -> None:
     with pytest.raises(HTTPException) as exc:
         auth_module.verify_line_id_token(token)
     assert exc.value.status_code == 503
+
+
+def test_jwks_keys_are_parsed_once_per_download(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Reuse the parsed public key across ID tokens."""
+    _reset_jwks_cache()
+    from cryptography.hazmat.primitives.asymmetric import rsa  # type: ignore[import-not-found]
+
+    priv_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk_a = json.loads(jwt_algorithms.RSAAlgorithm.to_jwk(priv_key.public_key()))
+    monkeypatch.setattr(auth_module, "_load_jwks_from_network", lambda: {"kid-a": jwk_a})
+    parse_calls: list[str] = []
+    original_parse = auth_module._public_key_from_jwk
+
+    def _counting_parse(jwk: dict) -> Any:  # noqa: ANN401
+        parse_calls.append(jwk["kty"])
+        return original_parse(jwk)
+
+    monkeypatch.setattr(auth_module, "_public_key_from_jwk", _counting_parse)
+
+    first = auth_module._get_signing_key_for_kid("kid-a")
+
+    assert auth_module._get_signing_key_for_kid("kid-a") is first
+    assert parse_calls == ["RSA"]
+
+
+def test_unusable_jwk_yields_503() -> None:
+    """Keep rejecting keys that cannot be parsed with 503."""
+    _install_jwks({"kid-x": {"kty": "oct", "kid": "kid-x"}})
+
+    with pytest.raises(HTTPException) as exc:
+        auth_module._get_signing_key_for_kid("kid-x")
+    assert exc.value.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_replaces_keys_before_expiry(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Refresh JWKS in the background once the refresh-ahead window starts."""
+    due_at = time.time() - auth_module.JWKS_TTL_SECONDS + auth_module.JWKS_REFRESH_AHEAD_SECONDS
+    auth_module._JWKS_CACHE = ({}, due_at - 1)  # type: ignore[attr-defined]
+    refreshed = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    def _fake_load() -> dict[str, dict[str, Any]]:
+        loop.call_soon_threadsafe(refreshed.set)
+        return {}
+
+    monkeypatch.setattr(auth_module, "_load_jwks_from_network", _fake_load)
+
+    task = asyncio.create_task(auth_module.refresh_jwks_periodically())
+    await asyncio.wait_for(refreshed.wait(), 5)
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+    assert auth_module._JWKS_CACHE is not None
+    assert auth_module._JWKS_CACHE[1] > due_at
+    assert auth_module._seconds_until_jwks_refresh() > 0
+
+
+@pytest.mark.asyncio
+async def test_failed_background_refresh_keeps_stale_keys(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Keep serving cached keys when the background refresh fails."""
+    stale = ({"kid-a": object()}, time.time() - auth_module.JWKS_TTL_SECONDS)
+    auth_module._JWKS_CACHE = stale  # type: ignore[attr-defined]
+    attempted = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    def _raise_request_error() -> dict[str, dict[str, Any]]:
+        loop.call_soon_threadsafe(attempted.set)
+        raise httpx.RequestError("boom")
+
+    monkeypatch.setattr(auth_module, "_load_jwks_from_network", _raise_request_error)
+
+    task = asyncio.create_task(auth_module.refresh_jwks_periodically())
+    await asyncio.wait_for(attempted.wait(), 5)
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+    assert auth_module._JWKS_CACHE is stale
+
+
+def _signed_token(aud: str, exp_in: int = 3600) -> str:
+    """Install a fresh RSA key and sign a token with it."""
+    from cryptography.hazmat.primitives.asymmetric import rsa  # type: ignore[import-not-found]
+
+    priv_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk_dict = json.loads(jwt_algorithms.RSAAlgorithm.to_jwk(priv_key.public_key()))
+    jwk_dict["kid"] = "kid-cache"
+    _install_jwks({"kid-cache": jwk_dict})
+    return jwt.encode(
+        {
+            "iss": "https://access.line.me",
+            "sub": "U" + "c" * 32,
+            "exp": int(time.time()) + exp_in,
+            "aud": aud,
+        },
+        key=priv_key,
+        algorithm="RS256",
+        headers={"kid": "kid-cache"},
+    )
+
+
+def test_verified_id_token_skips_signature_check(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Return a resent token's user ID without decoding it again."""
+    _reset_jwks_cache()
+    _set_sig_verify(True)
+    _set_channel_id("chan-cache")
+    token = _signed_token("chan-cache")
+    assert auth_module.verify_line_id_token(token) == "U" + "c" * 32
+
+    def _fail_decode(*_args: object, **_kwargs: object) -> dict:
+        raise AssertionError("token decoded again")
+
+    monkeypatch.setattr(auth_module.jwt, "decode", _fail_decode)
+
+    assert auth_module.verify_line_id_token(token) == "U" + "c" * 32
+
+
+def test_cached_id_token_is_not_reused_for_another_audience() -> None:
+    """Verify again when the configured channel changed."""
+    _reset_jwks_cache()
+    _set_sig_verify(True)
+    _set_channel_id("chan-cache")
+    token = _signed_token("chan-cache")
+    auth_module.verify_line_id_token(token)
+    _set_channel_id("chan-other")
+
+    with pytest.raises(HTTPException) as exc:
+        auth_module.verify_line_id_token(token)
+    assert exc.value.status_code == 401
+
+
+def test_production_safeguards_apply_to_cached_tokens(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Reject cached tokens when production configuration is unsafe."""
+    _reset_jwks_cache()
+    _set_sig_verify(True)
+    _set_channel_id("chan-cache")
+    token = _signed_token("chan-cache")
+    auth_module.verify_line_id_token(token)
+    monkeypatch.setattr(auth_module.settings, "ENV", "prod")
+    _set_channel_id(None)
+
+    with pytest.raises(HTTPException) as exc:
+        auth_module.verify_line_id_token(token)
+    assert exc.value.status_code == 500
@@ -0,0 +1,104 @@
+"""Tests for the circuit breaker."""
+
+from prometheus_client import REGISTRY
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitState
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        """Start at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+def _breaker(clock: FakeClock, name: str = "test") -> CircuitBreaker:
+    """Build a breaker that opens after two failures for ten seconds."""
+    return CircuitBreaker(name, failure_threshold=2, cooldown_seconds=10, clock=clock)
+
+
+def test_opens_after_consecutive_failures() -> None:
+    """Open at the threshold and reject calls during the cooldown."""
+    breaker = _breaker(FakeClock())
+
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.state is CircuitState.OPEN
+    assert not breaker.allow_request()
+
+
+def test_success_resets_the_failure_count() -> None:
+    """Only count consecutive failures."""
+    breaker = _breaker(FakeClock())
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_half_open_allows_one_probe() -> None:
+    """Let a single probe through once the cooldown elapses."""
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 10
+
+    assert breaker.allow_request()
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert not breaker.allow_request()
+
+
+def test_probe_result_closes_or_reopens() -> None:
+    """Close on a successful probe and reopen on a failed one."""
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 10
+    breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    assert not breaker.allow_request()
+
+    clock.now = 20
+    breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.allow_request()
+
+
+def test_lost_probe_is_replaced_after_cooldown() -> None:
+    """Allow a new probe when the previous one never reported back."""
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 10
+    breaker.allow_request()
+
+    clock.now = 20
+
+    assert breaker.allow_request()
+
+
+def test_transitions_are_recorded() -> None:
+    """Count transitions and expose the current state as a gauge."""
+    breaker = _breaker(FakeClock(), name="metrics-test")
+    labels = {"breaker": "metrics-test", "from_state": "closed", "to_state": "open"}
+
+    breaker.record_failure()
+    breaker.record_failure()
+
+    assert REGISTRY.get_sample_value("circuit_breaker_transitions_total", labels) == 1
+    assert REGISTRY.get_sample_value("circuit_breaker_state", {"breaker": "metrics-test"}) == 2
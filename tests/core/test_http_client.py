@@ -0,0 +1,57 @@
+"""Tests for the application-scoped LINE Platform HTTP clients."""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.core.http_client import LinePlatformHttpClients
+
+
+@pytest.mark.asyncio
+async def test_clients_are_reused_until_closed() -> None:
+    """Share one pooled client per calling style until shutdown."""
+    clients = LinePlatformHttpClients()
+    async_client = clients.get_async_client()
+    sync_client = clients.get_sync_client()
+
+    assert clients.get_async_client() is async_client
+    assert clients.get_sync_client() is sync_client
+
+    await clients.aclose()
+
+    assert async_client.is_closed
+    assert sync_client.is_closed
+    assert clients.get_async_client() is not async_client
+    await clients.aclose()
+
+
+@pytest.mark.asyncio
+async def test_clients_use_configured_limits() -> None:
+    """Apply the configured pool limits and timeouts."""
+    with patch("app.core.http_client.settings") as mock_settings:
+        mock_settings.LINE_AUTH_HTTP_MAX_CONNECTIONS = 7
+        mock_settings.LINE_AUTH_HTTP_MAX_KEEPALIVE_CONNECTIONS = 3
+        mock_settings.LINE_AUTH_HTTP_KEEPALIVE_EXPIRY_SECONDS = 15.0
+        mock_settings.LINE_AUTH_HTTP_TIMEOUT_SECONDS = 4.0
+        mock_settings.LINE_AUTH_HTTP_CONNECT_TIMEOUT_SECONDS = 1.0
+        with patch("app.core.http_client.httpx.AsyncClient") as async_client_class:
+            LinePlatformHttpClients().start()
+
+    limits = async_client_class.call_args.kwargs["limits"]
+    timeout = async_client_class.call_args.kwargs["timeout"]
+    assert (limits.max_connections, limits.max_keepalive_connections) == (7, 3)
+    assert limits.keepalive_expiry == 15.0
+    assert (timeout.read, timeout.connect) == (4.0, 1.0)
+
+
+def test_jwks_download_uses_the_shared_sync_client() -> None:
+    """Fetch JWKS through the pooled sync client."""
+    from app.core.auth import JWKS_URL, _load_jwks_from_network
+
+    response = Mock()
+    response.json.return_value = {"keys": [{"kid": "k1", "kty": "RSA"}]}
+    with patch("app.core.auth.line_platform_http.get_sync_client") as get_sync_client:
+        get_sync_client.return_value.get.return_value = response
+        assert _load_jwks_from_network() == {"k1": {"kid": "k1", "kty": "RSA"}}
+
+    assert get_sync_client.return_value.get.call_args.args == (JWKS_URL,)
@@ -0,0 +1,47 @@
+"""Tests for the verified ID token cache."""
+
+import time
+from unittest.mock import Mock, patch
+
+from app.core.id_token_cache import IdTokenCache
+
+
+def test_entry_is_valid_until_exp() -> None:
+    """Serve a verified token until its expiry."""
+    cache = IdTokenCache()
+    cache.set("token", "aud", "U1", time.time() + 60)
+
+    assert cache.get("token", "aud") == "U1"
+    with patch("app.core.id_token_cache.time.time", return_value=time.time() + 61):
+        assert cache.get("token", "aud") is None
+
+
+def test_expired_token_is_not_stored() -> None:
+    """Ignore tokens that are already past their expiry."""
+    cache = IdTokenCache()
+    cache.set("token", "aud", "U1", time.time() - 1)
+
+    assert cache.get("token", "aud") is None
+
+
+def test_audience_must_match() -> None:
+    """Miss when the caller verifies against another audience."""
+    cache = IdTokenCache()
+    cache.set("token", "aud", "U1", time.time() + 60)
+
+    assert cache.get("token", None) is None
+
+
+@patch("app.core.id_token_cache.settings")
+def test_evicts_least_recently_used(mock_settings: Mock) -> None:
+    """Keep the cache within its configured size."""
+    mock_settings.ID_TOKEN_CACHE_ENABLED = True
+    mock_settings.ID_TOKEN_CACHE_MAX_ENTRIES = 2
+    cache = IdTokenCache()
+    exp = time.time() + 60
+    cache.set("a", None, "U1", exp)
+    cache.set("b", None, "U2", exp)
+    cache.get("a", None)
+    cache.set("c", None, "U3", exp)
+
+    assert [cache.get(token, None) for token in ("a", "b", "c")] == ["U1", None, "U3"]
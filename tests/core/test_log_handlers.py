@@ -0,0 +1,103 @@
+"""Tests for the queue-fed logging handlers and filters."""
+
+import gzip
+import logging
+from pathlib import Path
+from unittest.mock import patch
+
+from app.core.config import settings, setup_logging, stop_logging
+from app.core.log_handlers import CompressedRotatingFileHandler, InfoRateLimitFilter
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        """Start at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+def _record(name: str, level: int, msg: str, *args: object) -> logging.LogRecord:
+    """Build a log record without going through a logger."""
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_rate_limit_filter_limits_info_per_logger() -> None:
+    """Drop INFO records over budget per logger, never warnings."""
+    clock = FakeClock()
+    rate_filter = InfoRateLimitFilter(rate_per_second=1.0, burst=2, clock=clock)
+
+    assert rate_filter.filter(_record("noisy", logging.INFO, "a"))
+    assert rate_filter.filter(_record("noisy", logging.DEBUG, "b"))
+    assert not rate_filter.filter(_record("noisy", logging.INFO, "c"))
+    assert rate_filter.filter(_record("quiet", logging.INFO, "d"))
+    assert rate_filter.filter(_record("noisy", logging.WARNING, "e"))
+
+    clock.now = 1.0
+    record = _record("noisy", logging.INFO, "event %s", 7)
+    assert rate_filter.filter(record)
+    assert record.getMessage() == "event 7 (1 similar records suppressed)"
+
+
+def test_rate_limit_filter_passes_exempt_loggers() -> None:
+    """Never drop records from exempt loggers such as the access log."""
+    rate_filter = InfoRateLimitFilter(
+        rate_per_second=1.0, burst=1, exempt_loggers=("uvicorn.access",), clock=FakeClock()
+    )
+
+    assert all(
+        rate_filter.filter(_record("uvicorn.access", logging.INFO, "GET /")) for _ in range(5)
+    )
+    assert rate_filter.filter(_record("app", logging.INFO, "a"))
+    assert not rate_filter.filter(_record("app", logging.INFO, "b"))
+
+
+def test_rotating_handler_compresses_rotated_files(tmp_path: Path) -> None:
+    """Keep the active file bounded and gzip its rotations."""
+    log_path = tmp_path / "app.log"
+    handler = CompressedRotatingFileHandler(log_path, maxBytes=100, backupCount=2)
+    try:
+        for index in range(10):
+            handler.emit(_record("app", logging.INFO, "line %s %s", index, "x" * 40))
+    finally:
+        handler.close()
+
+    assert log_path.stat().st_size <= 100
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "app.log",
+        "app.log.1.gz",
+        "app.log.2.gz",
+    ]
+    assert b"line" in gzip.decompress((tmp_path / "app.log.1.gz").read_bytes())
+
+
+def test_rotating_handler_follows_rotation_by_another_process(tmp_path: Path) -> None:
+    """Reopen the file another worker rotated instead of rotating again."""
+    log_path = tmp_path / "app.log"
+    handler = CompressedRotatingFileHandler(log_path, maxBytes=1000, backupCount=1)
+    try:
+        handler.emit(_record("app", logging.INFO, "before"))
+        log_path.rename(tmp_path / "rotated.log")
+        handler.emit(_record("app", logging.INFO, "after"))
+    finally:
+        handler.close()
+
+    assert log_path.read_text() == "after\n"
+    assert (tmp_path / "rotated.log").read_text() == "before\n"
+
+
+def test_setup_logging_writes_through_background_listener(tmp_path: Path) -> None:
+    """Write queued records to the log file once the listener is flushed."""
+    with patch.object(type(settings), "logs_dir", new=tmp_path):
+        setup_logging()
+        try:
+            logging.getLogger("uvicorn").warning("served %s", "request")
+        finally:
+            stop_logging()
+
+    assert "WARNING [uvicorn:" in (tmp_path / "app.log").read_text()
+    assert "served request" in (tmp_path / "app.log").read_text()
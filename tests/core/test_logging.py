@@ -21,6 +21,10 @@ class TestSetupLogging:
         mock_settings.DEBUG = debug
         mock_settings.is_production = is_production
         mock_settings.ENV = env
+        mock_settings.LOG_FILE_MAX_BYTES = 1024
+        mock_settings.LOG_FILE_BACKUP_COUNT = 3
+        mock_settings.LOG_INFO_RATE_PER_SECOND = 10.0
+        mock_settings.LOG_INFO_BURST = 20
 
         # Mock logs_dir
         mock_logs_dir = Mock()
@@ -32,15 +36,22 @@ class TestSetupLogging:
         mock_logging.DEBUG = 10
         mock_logging.INFO = 20
         mock_logging.WARNING = 30
-        mock_logging.FileHandler = Mock(return_value=Mock())
         mock_logging.StreamHandler = Mock(return_value=Mock())
         mock_logging.getLogger = Mock(return_value=Mock())
         mock_logging.basicConfig = Mock()
 
+    @patch("app.core.config._queue_handler", None)
+    @patch("app.core.config._log_listener", None)
+    @patch("app.core.config.InfoRateLimitFilter")
+    @patch("app.core.config.CompressedRotatingFileHandler")
     @patch("app.core.config.settings")
     @patch("app.core.config.logging")
     def test_setup_logging_function_executes_without_errors(
-        self, mock_logging: Mock, mock_settings: Mock
+        self,
+        mock_logging: Mock,
+        mock_settings: Mock,
+        mock_file_handler: Mock,
+        mock_rate_filter: Mock,
     ) -> None:
         """Test that setup_logging executes without errors."""
         self._setup_mocks(mock_logging, mock_settings)
@@ -54,13 +65,28 @@ class TestSetupLogging:
         # Verify basicConfig was called
         mock_logging.basicConfig.assert_called_once()
 
-        # Verify handlers were created
-        mock_logging.FileHandler.assert_called_once()
+        # Verify handlers were created and are written by the background listener
+        mock_file_handler.assert_called_once()
+        assert mock_file_handler.call_args.kwargs["maxBytes"] == 1024
         mock_logging.StreamHandler.assert_called_once()
+        mock_rate_filter.assert_called_once_with(10.0, 20, exempt_loggers=("uvicorn.access",))
+        mock_logging.handlers.QueueListener.return_value.start.assert_called_once_with()
+        call_args = mock_logging.basicConfig.call_args
+        assert call_args[1]["handlers"] == [mock_logging.handlers.QueueHandler.return_value]
 
+    @patch("app.core.config._queue_handler", None)
+    @patch("app.core.config._log_listener", None)
+    @patch("app.core.config.InfoRateLimitFilter")
+    @patch("app.core.config.CompressedRotatingFileHandler")
     @patch("app.core.config.settings")
     @patch("app.core.config.logging")
-    def test_setup_logging_development_mode(self, mock_logging: Mock, mock_settings: Mock) -> None:
+    def test_setup_logging_development_mode(
+        self,
+        mock_logging: Mock,
+        mock_settings: Mock,
+        mock_file_handler: Mock,
+        mock_rate_filter: Mock,
+    ) -> None:
         """Test that setup_logging handles development mode correctly."""
         self._setup_mocks(mock_logging, mock_settings, debug=True, env="development")
 
@@ -73,9 +99,19 @@ class TestSetupLogging:
         call_args = mock_logging.basicConfig.call_args
         assert call_args[1]["level"] == 10  # DEBUG level
 
+    @patch("app.core.config._queue_handler", None)
+    @patch("app.core.config._log_listener", None)
+    @patch("app.core.config.InfoRateLimitFilter")
+    @patch("app.core.config.CompressedRotatingFileHandler")
     @patch("app.core.config.settings")
     @patch("app.core.config.logging")
-    def test_setup_logging_production_mode(self, mock_logging: Mock, mock_settings: Mock) -> None:
+    def test_setup_logging_production_mode(
+        self,
+        mock_logging: Mock,
+        mock_settings: Mock,
+        mock_file_handler: Mock,
+        mock_rate_filter: Mock,
+    ) -> None:
         """Test that setup_logging handles production mode correctly."""
         self._setup_mocks(mock_logging, mock_settings, is_production=True, env="production")
 
@@ -84,6 +120,6 @@ class TestSetupLogging:
         # Verify basicConfig was called
         mock_logging.basicConfig.assert_called_once()
 
-        # Get the call args to verify DEBUG level was used (production also uses DEBUG)
+        # Get the call args to verify INFO level was used
         call_args = mock_logging.basicConfig.call_args
-        assert call_args[1]["level"] == 10  # DEBUG level
+        assert call_args[1]["level"] == 20  # INFO level
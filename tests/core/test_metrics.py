@@ -0,0 +1,57 @@
+"""Tests for Prometheus multiprocess metrics rendering and cleanup."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.core import metrics as core_metrics
+
+WORKER_SCRIPT = """
+from prometheus_client import Counter, Gauge
+Counter("test_worker_requests", "Requests.").inc(3)
+Gauge("test_worker_in_flight", "In flight.", multiprocess_mode="livesum").set(2)
+"""
+
+
+def _run_worker(directory: Path) -> int:
+    """Run a short-lived process that writes multiprocess metrics; return its PID."""
+    process = subprocess.run(  # noqa: S603 - fixed interpreter and script
+        [sys.executable, "-c", WORKER_SCRIPT + "import os; print(os.getpid())"],
+        env={**os.environ, core_metrics.MULTIPROCESS_DIR_ENV: str(directory)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return int(process.stdout)
+
+
+def test_single_process_mode_renders_default_registry(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Render this process's registry when no shared directory is configured."""
+    monkeypatch.delenv(core_metrics.MULTIPROCESS_DIR_ENV, raising=False)
+
+    assert core_metrics.multiprocess_dir() is None
+    assert b"processing_lock_duration_seconds" in core_metrics.render_latest()
+    assert core_metrics.cleanup_dead_workers() == []
+
+
+def test_multiprocess_mode_aggregates_workers_and_cleans_up_dead_ones(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Sum counters of every worker and drop live gauges of exited workers."""
+    first_pid = _run_worker(tmp_path)
+    second_pid = _run_worker(tmp_path)
+    monkeypatch.setenv(core_metrics.MULTIPROCESS_DIR_ENV, str(tmp_path))
+
+    rendered = core_metrics.render_latest().decode()
+    assert "test_worker_requests_total 6.0" in rendered
+    assert "test_worker_in_flight 4.0" in rendered
+
+    assert core_metrics.cleanup_dead_workers() == sorted([first_pid, second_pid])
+
+    rendered = core_metrics.render_latest().decode()
+    assert "test_worker_requests_total 6.0" in rendered
+    assert "test_worker_in_flight " not in rendered
+    assert not list(tmp_path.glob("gauge_live*"))
@@ -4,9 +4,17 @@ import logging
 from unittest.mock import Mock, patch
 
 import pytest
-from redis.exceptions import ConnectionError, RedisError
+from prometheus_client import REGISTRY
+from redis.exceptions import ConnectionError, RedisError, TimeoutError
 
-from app.core.processing_lock import ProcessingLockService
+from app.core.circuit_breaker import CircuitBreaker, CircuitState
+from app.core.processing_lock import ProcessingLockService, _LocalLockTable
+
+
+def _lock_observations(outcome: str) -> float:
+    """Return how many lock round trips the histogram has observed."""
+    labels = {"outcome": outcome}
+    return REGISTRY.get_sample_value("processing_lock_duration_seconds_count", labels) or 0.0
 
 
 class TestProcessingLockService:
@@ -30,8 +38,12 @@ class TestProcessingLockService:
     @patch("app.core.processing_lock.redis.from_url")
     @patch("app.core.processing_lock.settings")
     def test_get_redis_client_success(self, mock_settings: Mock, mock_from_url: Mock) -> None:
-        """Test successful Redis client creation."""
+        """Create one client on a bounded pool with socket and connect timeouts."""
         mock_settings.REDIS_URL = "redis://localhost:6379/0"
+        mock_settings.PROCESSING_LOCK_REDIS_MAX_CONNECTIONS = 8
+        mock_settings.PROCESSING_LOCK_REDIS_SOCKET_TIMEOUT_SECONDS = 0.1
+        mock_settings.PROCESSING_LOCK_REDIS_CONNECT_TIMEOUT_SECONDS = 0.2
+        mock_settings.PROCESSING_LOCK_REDIS_HEALTH_CHECK_INTERVAL_SECONDS = 30
         mock_redis = Mock()
         mock_redis.ping.return_value = True
         mock_from_url.return_value = mock_redis
@@ -40,9 +52,49 @@ class TestProcessingLockService:
         result = service._get_redis_client()
 
         assert result == mock_redis
-        mock_from_url.assert_called_once_with("redis://localhost:6379/0", decode_responses=True)
+        assert service._get_redis_client() is mock_redis
+        mock_from_url.assert_called_once_with(
+            "redis://localhost:6379/0",
+            decode_responses=True,
+            max_connections=8,
+            socket_timeout=0.1,
+            socket_connect_timeout=0.2,
+            health_check_interval=30,
+        )
         mock_redis.ping.assert_called_once()
 
+    def test_close_disconnects_the_pool(self) -> None:
+        """Close the client and reconnect lazily afterwards."""
+        service = ProcessingLockService()
+        redis_client = Mock()
+        service._redis_client = redis_client
+
+        service.close()
+        service.close()
+
+        redis_client.close.assert_called_once_with()
+        assert service._redis_client is None
+
+    @patch("app.core.processing_lock.settings")
+    def test_lock_round_trips_are_recorded(self, mock_settings: Mock) -> None:
+        """Observe acquired and failed lock round trips by outcome."""
+        mock_settings.PROCESSING_LOCK_ENABLED = True
+        mock_settings.PROCESSING_LOCK_TTL_SECONDS = 1
+        mock_settings.REDIS_URL = "redis://localhost:6379/0"
+        service = ProcessingLockService(
+            breaker=CircuitBreaker("test", failure_threshold=5, cooldown_seconds=30)
+        )
+        service._redis_client = Mock()
+        service._redis_client.set.side_effect = [True, TimeoutError("Timeout reading from socket")]
+        acquired_before = _lock_observations("acquired")
+        error_before = _lock_observations("error")
+
+        assert service.try_acquire_lock("first:key") is True
+        assert service.try_acquire_lock("second:key") is True
+
+        assert _lock_observations("acquired") == acquired_before + 1
+        assert _lock_observations("error") == error_before + 1
+
     @patch("app.core.processing_lock.redis.from_url")
     @patch("app.core.processing_lock.settings")
     def test_get_redis_client_connection_error(
@@ -50,6 +102,8 @@ class TestProcessingLockService:
     ) -> None:
         """Test Redis client creation with connection error."""
         mock_settings.REDIS_URL = "redis://localhost:6379/0"
+        mock_settings.PROCESSING_LOCK_BREAKER_FAILURE_THRESHOLD = 3
+        mock_settings.PROCESSING_LOCK_BREAKER_COOLDOWN_SECONDS = 30
         mock_from_url.side_effect = ConnectionError("Connection failed")
 
         service = ProcessingLockService()
@@ -144,6 +198,8 @@ class TestProcessingLockService:
         mock_settings.PROCESSING_LOCK_ENABLED = True
         mock_settings.PROCESSING_LOCK_TTL_SECONDS = 1
         mock_settings.REDIS_URL = "redis://localhost:6379/0"
+        mock_settings.PROCESSING_LOCK_BREAKER_FAILURE_THRESHOLD = 3
+        mock_settings.PROCESSING_LOCK_BREAKER_COOLDOWN_SECONDS = 30
 
         mock_redis = Mock()
         mock_redis.ping.return_value = True
@@ -159,6 +215,56 @@ class TestProcessingLockService:
         assert result is True  # Fail open
         assert "Failed to acquire processing lock, allowing processing" in caplog.text
 
+    @patch("app.core.processing_lock.redis.from_url")
+    @patch("app.core.processing_lock.settings")
+    def test_open_breaker_skips_redis(self, mock_settings: Mock, mock_from_url: Mock) -> None:
+        """Stop connecting to Redis once repeated failures open the breaker."""
+        mock_settings.PROCESSING_LOCK_ENABLED = True
+        mock_settings.REDIS_URL = "redis://localhost:6379/0"
+        mock_from_url.side_effect = ConnectionError("Connection failed")
+        breaker = CircuitBreaker("test", failure_threshold=2, cooldown_seconds=30)
+        service = ProcessingLockService(breaker)
+
+        results = [service.try_acquire_lock("test:key") for _ in range(5)]
+
+        assert results == [True] * 5
+        assert mock_from_url.call_count == 2
+        assert breaker.state is CircuitState.OPEN
+
+    @patch("app.core.processing_lock.settings")
+    def test_locally_held_lock_skips_redis(self, mock_settings: Mock) -> None:
+        """Deny a repeat of a lock this worker holds without a Redis round trip."""
+        mock_settings.PROCESSING_LOCK_ENABLED = True
+        mock_settings.PROCESSING_LOCK_TTL_SECONDS = 1
+        mock_redis = Mock()
+        mock_redis.set.return_value = True
+        service = ProcessingLockService()
+        service._redis_client = mock_redis
+        labels = {"result": "hit"}
+        before = REGISTRY.get_sample_value("processing_lock_local_lookups_total", labels) or 0
+
+        assert service.try_acquire_lock("test:key") is True
+        assert service.try_acquire_lock("test:key") is False
+
+        mock_redis.set.assert_called_once()
+        saved = REGISTRY.get_sample_value("processing_lock_local_lookups_total", labels)
+        assert saved == before + 1
+
+    @patch("app.core.processing_lock.settings")
+    def test_lock_denied_by_redis_is_not_held_locally(self, mock_settings: Mock) -> None:
+        """Keep asking Redis about locks held by other workers."""
+        mock_settings.PROCESSING_LOCK_ENABLED = True
+        mock_settings.PROCESSING_LOCK_TTL_SECONDS = 1
+        mock_redis = Mock()
+        mock_redis.set.return_value = None
+        service = ProcessingLockService()
+        service._redis_client = mock_redis
+
+        service.try_acquire_lock("test:key")
+        service.try_acquire_lock("test:key")
+
+        assert mock_redis.set.call_count == 2
+
     def test_build_lock_key_success(self) -> None:
         """Test successful lock key building."""
         mock_source = Mock()
@@ -209,3 +315,33 @@ class TestProcessingLockService:
 
             assert result is None
             assert "Invalid event source structure" in caplog.text
+
+
+class TestLocalLockTable:
+    """Test cases for the in-process lock tier."""
+
+    def test_expired_lock_is_released(self) -> None:
+        """Forget a lock once its TTL has passed."""
+        table = _LocalLockTable()
+        with patch("app.core.processing_lock.time.monotonic", return_value=100.0):
+            table.hold("key", 1)
+            assert table.is_held("key")
+        with patch("app.core.processing_lock.time.monotonic", return_value=101.0):
+            assert not table.is_held("key")
+
+    def test_full_table_drops_expired_then_oldest(self) -> None:
+        """Stay bounded by pruning expired entries, then the oldest live one."""
+        table = _LocalLockTable(max_entries=2)
+        with patch("app.core.processing_lock.time.monotonic", return_value=100.0):
+            table.hold("expired", 1)
+        with patch("app.core.processing_lock.time.monotonic", return_value=200.0):
+            table.hold("old", 60)
+            table.hold("new", 60)
+            table.hold("newest", 60)
+
+            assert [table.is_held(key) for key in ("expired", "old", "new", "newest")] == [
+                False,
+                False,
+                True,
+                True,
+            ]
@@ -0,0 +1,98 @@
+"""Tests for the per-user rate limiter."""
+
+from collections.abc import Iterator
+from unittest.mock import Mock, patch
+
+import pytest
+from prometheus_client import REGISTRY
+from redis.exceptions import RedisError
+
+from app.core.rate_limiter import RateLimitDecision, UserRateLimiter
+
+
+@pytest.fixture
+def limiter_settings() -> Iterator[Mock]:
+    """Provide small per-kind limits."""
+    with patch("app.core.rate_limiter.settings") as mock_settings:
+        mock_settings.RATE_LIMIT_ENABLED = True
+        mock_settings.RATE_LIMIT_TEXT_REQUESTS = 10
+        mock_settings.RATE_LIMIT_TEXT_PERIOD_SECONDS = 60.0
+        mock_settings.RATE_LIMIT_LOCATION_REQUESTS = 5
+        mock_settings.RATE_LIMIT_LOCATION_PERIOD_SECONDS = 60.0
+        mock_settings.RATE_LIMIT_POSTBACK_REQUESTS = 4
+        mock_settings.RATE_LIMIT_POSTBACK_PERIOD_SECONDS = 2.0
+        yield mock_settings
+
+
+@pytest.fixture
+def redis_client() -> Iterator[Mock]:
+    """Provide a shared Redis client whose script result tests control."""
+    client = Mock()
+    with patch("app.core.rate_limiter.shared_redis") as mock_shared:
+        mock_shared.get_client.return_value = client
+        yield client
+
+
+@pytest.mark.usefixtures("limiter_settings")
+class TestUserRateLimiter:
+    """Test the GCRA limiter around its Redis script."""
+
+    def test_allowed_event_uses_per_kind_limit(self, redis_client: Mock) -> None:
+        """Pass the kind's emission interval and period to the script."""
+        script = redis_client.register_script.return_value
+        script.return_value = [1, "0"]
+
+        assert UserRateLimiter().check("postback", "U1") == RateLimitDecision(True)
+        script.assert_called_once_with(keys=["ratelimit:postback:U1"], args=[0.5, 2.0])
+
+    def test_denied_event_reports_retry_after_and_counts(self, redis_client: Mock) -> None:
+        """Return the script's retry delay and count the denial."""
+        redis_client.register_script.return_value.return_value = [0, "6.5"]
+        before = REGISTRY.get_sample_value("rate_limit_denied_total", {"kind": "text"}) or 0
+
+        decision = UserRateLimiter().check("text", "U1")
+
+        assert decision == RateLimitDecision(False, 6.5)
+        assert REGISTRY.get_sample_value("rate_limit_denied_total", {"kind": "text"}) == before + 1
+
+    def test_script_is_registered_once(self, redis_client: Mock) -> None:
+        """Reuse the registered script across checks."""
+        redis_client.register_script.return_value.return_value = [1, "0"]
+        limiter = UserRateLimiter()
+
+        limiter.check("text", "U1")
+        limiter.check("location", "U1")
+
+        redis_client.register_script.assert_called_once()
+
+    def test_redis_error_fails_open(self, redis_client: Mock) -> None:
+        """Allow events when the script fails."""
+        redis_client.register_script.return_value.side_effect = RedisError("down")
+
+        assert UserRateLimiter().check("text", "U1").allowed
+
+    def test_script_outcomes_are_reported_to_the_shared_breaker(self) -> None:
+        """Report failed and successful checks so an outage opens the shared breaker."""
+        redis_client = Mock()
+        redis_client.register_script.return_value.side_effect = [RedisError("down"), [1, "0"]]
+        with patch("app.core.rate_limiter.shared_redis") as mock_shared:
+            mock_shared.get_client.return_value = redis_client
+            limiter = UserRateLimiter()
+
+            assert limiter.check("text", "U1").allowed
+            mock_shared.record_failure.assert_called_once_with()
+            assert limiter.check("text", "U1").allowed
+            mock_shared.record_success.assert_called_once_with()
+
+    def test_without_redis_fails_open(self) -> None:
+        """Allow events when Redis is unavailable."""
+        with patch("app.core.rate_limiter.shared_redis") as mock_shared:
+            mock_shared.get_client.return_value = None
+            assert UserRateLimiter().check("text", "U1").allowed
+
+    def test_disabled_skips_redis(self, limiter_settings: Mock, redis_client: Mock) -> None:
+        """Skip the check entirely when rate limiting is disabled."""
+        limiter_settings.RATE_LIMIT_ENABLED = False
+
+        assert UserRateLimiter().check("text", "U1").allowed
+        redis_client.register_script.assert_not_called()
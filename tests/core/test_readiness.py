@@ -0,0 +1,75 @@
+"""Tests for readiness reporting."""
+
+from unittest.mock import patch
+
+from app.core.readiness import ReadinessProbe
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        """Start at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+def test_not_ready_until_warm_up_finishes() -> None:
+    """Report pending warm-up without touching any dependency."""
+    probe = ReadinessProbe()
+
+    with patch("app.core.readiness._check_database") as check_database:
+        report = probe.check()
+
+    assert not report.ready
+    assert report.checks == {"warm_up": "pending"}
+    check_database.assert_not_called()
+
+
+def test_ready_with_database_and_reports_redis() -> None:
+    """Gate readiness on the database; Redis is reported but fails open."""
+    probe = ReadinessProbe()
+    probe.mark_warm()
+
+    with patch("app.core.readiness._check_redis", return_value="unavailable"):
+        report = probe.check()
+
+    assert report.ready
+    assert report.checks == {"warm_up": "done", "database": "ok", "redis": "unavailable"}
+
+
+def test_dependency_checks_are_cached() -> None:
+    """Reuse a check within the cache interval and re-run it afterwards."""
+    clock = FakeClock()
+    probe = ReadinessProbe(clock=clock)
+    probe.mark_warm()
+
+    with (
+        patch("app.core.readiness._check_database", return_value="error") as check_database,
+        patch("app.core.readiness._check_redis", return_value="disabled"),
+        patch("app.core.readiness.settings") as mock_settings,
+    ):
+        mock_settings.READINESS_CHECK_CACHE_SECONDS = 5.0
+        assert not probe.check().ready
+        clock.now = 4.9
+        assert not probe.check().ready
+        assert check_database.call_count == 1
+
+        clock.now = 5.0
+        check_database.return_value = "ok"
+        assert probe.check().ready
+        assert check_database.call_count == 2
+
+
+def test_reset_returns_to_pending() -> None:
+    """Stop reporting ready on shutdown."""
+    probe = ReadinessProbe()
+    probe.mark_warm()
+
+    probe.reset()
+
+    assert not probe.is_warm
+    assert not probe.check().ready
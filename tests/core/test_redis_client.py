@@ -0,0 +1,104 @@
+"""Tests for the shared Redis client provider."""
+
+from unittest.mock import Mock, patch
+
+from redis.exceptions import ConnectionError
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.redis_client import RedisClientProvider
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        """Start at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+def _provider(clock: FakeClock) -> RedisClientProvider:
+    """Build a provider whose breaker opens after one failure for ten seconds."""
+    breaker = CircuitBreaker("test_shared", failure_threshold=1, cooldown_seconds=10, clock=clock)
+    return RedisClientProvider(breaker=breaker)
+
+
+@patch("app.core.redis_client.redis.from_url")
+@patch("app.core.redis_client.settings")
+def test_connects_once_with_timeouts(mock_settings: Mock, mock_from_url: Mock) -> None:
+    """Create the client with bounded timeouts and reuse it."""
+    mock_settings.REDIS_URL = "redis://localhost:6379/0"
+    mock_settings.SHARED_REDIS_SOCKET_TIMEOUT_SECONDS = 0.5
+    mock_settings.SHARED_REDIS_CONNECT_TIMEOUT_SECONDS = 0.25
+    provider = _provider(FakeClock())
+
+    client = provider.get_client()
+
+    assert client is mock_from_url.return_value
+    assert provider.get_client() is client
+    mock_from_url.assert_called_once_with(
+        "redis://localhost:6379/0",
+        decode_responses=True,
+        socket_timeout=0.5,
+        socket_connect_timeout=0.25,
+    )
+
+
+@patch("app.core.redis_client.redis.from_url")
+@patch("app.core.redis_client.settings")
+def test_failed_connect_is_not_retried_during_cooldown(
+    mock_settings: Mock, mock_from_url: Mock
+) -> None:
+    """Return None without reconnecting until the breaker lets a probe through."""
+    mock_settings.REDIS_URL = "redis://localhost:6379/0"
+    mock_settings.SHARED_REDIS_SOCKET_TIMEOUT_SECONDS = 0.5
+    mock_settings.SHARED_REDIS_CONNECT_TIMEOUT_SECONDS = 0.5
+    mock_from_url.return_value.ping.side_effect = [ConnectionError("refused"), True]
+    clock = FakeClock()
+    provider = _provider(clock)
+
+    assert provider.get_client() is None
+    assert provider.get_client() is None
+    assert mock_from_url.call_count == 1
+
+    clock.now = 10.0
+    assert provider.get_client() is mock_from_url.return_value
+    assert mock_from_url.call_count == 2
+
+
+@patch("app.core.redis_client.redis.from_url")
+@patch("app.core.redis_client.settings")
+def test_redis_not_configured(mock_settings: Mock, mock_from_url: Mock) -> None:
+    """Never connect when no Redis URL is configured."""
+    mock_settings.REDIS_URL = None
+
+    assert _provider(FakeClock()).get_client() is None
+    mock_from_url.assert_not_called()
+
+
+@patch("app.core.redis_client.redis.from_url")
+@patch("app.core.redis_client.settings")
+def test_reported_command_failures_skip_an_existing_client(
+    mock_settings: Mock, mock_from_url: Mock
+) -> None:
+    """Hand out no client while reported command failures keep the breaker open."""
+    mock_settings.REDIS_URL = "redis://localhost:6379/0"
+    mock_settings.SHARED_REDIS_SOCKET_TIMEOUT_SECONDS = 0.5
+    mock_settings.SHARED_REDIS_CONNECT_TIMEOUT_SECONDS = 0.5
+    clock = FakeClock()
+    provider = _provider(clock)
+    client = provider.get_client()
+    assert client is mock_from_url.return_value
+
+    provider.record_failure()
+
+    assert provider.get_client() is None
+    clock.now = 10.0
+    assert provider.get_client() is client
+    assert provider.get_client() is None
+    provider.record_success()
+    assert provider.get_client() is client
+    mock_from_url.assert_called_once()
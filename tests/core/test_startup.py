@@ -0,0 +1,48 @@
+"""Tests for timed application startup phases."""
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.startup import StartupReport
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        """Start at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+def test_phases_are_timed_in_order_and_exported() -> None:
+    """Record each phase duration and the total time to ready."""
+    clock = FakeClock()
+    report = StartupReport(clock=clock)
+
+    with report.phase("test_first"):
+        clock.now += 0.5
+    clock.now += 0.1
+    with report.phase("test_second"):
+        clock.now += 0.25
+
+    assert list(report.phases) == ["test_first", "test_second"]
+    assert report.phases["test_first"] == pytest.approx(0.5)
+    assert report.finish() == pytest.approx(0.85)
+    assert REGISTRY.get_sample_value(
+        "startup_phase_duration_seconds", {"phase": "test_second"}
+    ) == pytest.approx(0.25)
+    assert REGISTRY.get_sample_value("startup_duration_seconds") == pytest.approx(0.85)
+
+
+def test_failed_phase_propagates_and_is_not_recorded() -> None:
+    """Abort startup on a failing phase without reporting it as completed."""
+    report = StartupReport(clock=FakeClock())
+
+    with pytest.raises(RuntimeError), report.phase("test_broken"):
+        raise RuntimeError("boom")
+
+    assert report.phases == {}
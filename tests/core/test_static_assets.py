@@ -0,0 +1,144 @@
+"""Tests for in-memory, precompressed static asset serving."""
+
+import gzip
+from pathlib import Path
+
+import brotli
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.static_assets import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    PrecompressedStaticFiles,
+    StaticAssetStore,
+)
+
+DATA = b'{"counties": ["' + "臺北市".encode() * 200 + b'"]}'
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> StaticAssetStore:
+    """Load a small static tree."""
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "divisions.json").write_bytes(DATA)
+    (tmp_path / "page").mkdir()
+    (tmp_path / "page" / "app.js").write_text(
+        "fetch('https://api.example/static/data/divisions.json');"
+        'fetch("/static/data/divisions.json?v=old");'
+        "fetch('/static/data/missing.json');"
+    )
+    (tmp_path / "page" / "index.html").write_text(
+        '<link href="style.css?v=1"><script src="app.js?v=manual"></script>'
+        '<script src="https://cdn.example/sdk.js"></script>'
+    )
+    store = StaticAssetStore()
+    store.load(tmp_path)
+    return store
+
+
+@pytest.fixture
+def client(tmp_path: Path, store: StaticAssetStore) -> TestClient:
+    """Serve the tree through the precompressed mount."""
+    app = FastAPI()
+    app.mount("/static", PrecompressedStaticFiles(directory=tmp_path, store=store))
+    return TestClient(app)
+
+
+def test_serves_gzip_with_content_hash_etag(client: TestClient, store: StaticAssetStore) -> None:
+    """Serve the precompressed gzip variant to clients that accept it."""
+    response = client.get("/static/data/divisions.json", headers={"Accept-Encoding": "gzip"})
+    asset = store.get("data/divisions.json")
+
+    assert asset is not None
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == f'"{asset.version}-gzip"'
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+    assert response.content == DATA
+    assert gzip.decompress(asset.bodies["gzip"]) == DATA
+
+
+def test_serves_brotli_when_accepted(client: TestClient, store: StaticAssetStore) -> None:
+    """Prefer the smaller brotli variant when the client accepts both encodings."""
+    response = client.get(
+        "/static/data/divisions.json", headers={"Accept-Encoding": "gzip, deflate, br"}
+    )
+    asset = store.get("data/divisions.json")
+
+    assert asset is not None
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["etag"] == f'"{asset.version}-br"'
+    assert brotli.decompress(asset.bodies["br"]) == DATA
+    assert len(asset.bodies["br"]) < len(asset.bodies["gzip"])
+
+
+def test_identity_when_compression_not_accepted(client: TestClient) -> None:
+    """Serve the original bytes when the client refuses compression."""
+    response = client.get(
+        "/static/data/divisions.json", headers={"Accept-Encoding": "gzip;q=0, identity"}
+    )
+
+    assert "content-encoding" not in response.headers
+    assert response.content == DATA
+
+
+def test_matching_etag_returns_304(client: TestClient) -> None:
+    """Answer a conditional GET for unchanged content without a body."""
+    first = client.get("/static/data/divisions.json")
+
+    response = client.get(
+        "/static/data/divisions.json", headers={"If-None-Match": first.headers["etag"]}
+    )
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == first.headers["etag"]
+
+
+def test_versioned_url_is_immutable(client: TestClient, store: StaticAssetStore) -> None:
+    """Cache URLs carrying the content hash for a year."""
+    asset = store.get("data/divisions.json")
+    assert asset is not None
+
+    versioned = client.get(f"/static/data/divisions.json?v={asset.version}")
+    stale = client.get("/static/data/divisions.json?v=old")
+
+    assert versioned.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert stale.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+
+
+def test_html_references_point_at_versioned_urls(
+    client: TestClient, store: StaticAssetStore
+) -> None:
+    """Rewrite relative references to known assets, leaving others alone."""
+    html = client.get("/static/page/index.html").text
+    script = store.get("page/app.js")
+
+    assert script is not None
+    assert f'src="app.js?v={script.version}"' in html
+    assert 'href="style.css?v=1"' in html
+    assert 'src="https://cdn.example/sdk.js"' in html
+
+
+def test_script_data_references_point_at_versioned_urls(
+    client: TestClient, store: StaticAssetStore
+) -> None:
+    """Rewrite ``/static/...`` literals in scripts so fetched data is cached immutably."""
+    data = store.get("data/divisions.json")
+    assert data is not None
+    versioned_url = f"/static/data/divisions.json?v={data.version}"
+
+    script = client.get("/static/page/app.js").text
+
+    assert f"'https://api.example{versioned_url}'" in script
+    assert f'"{versioned_url}"' in script
+    assert "'/static/data/missing.json'" in script
+    assert client.get(versioned_url).headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+
+def test_unknown_path_and_method(client: TestClient) -> None:
+    """Keep StaticFiles' 404 and 405 behavior."""
+    assert client.get("/static/missing.js").status_code == 404
+    assert client.post("/static/page/app.js").status_code == 405
@@ -1,15 +1,15 @@
 """Test recipe validation and the isolated LINE SDK messaging adapter."""
 
 import ast
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 from linebot.v3.messaging import (
     LocationAction,
     MessageAction,
-    ReplyMessageRequest,
     TextMessage,
     URIAction,
 )
@@ -29,6 +29,7 @@ from app.line.messaging import (
     UriChoice,
     UriChoicesRecipe,
 )
+from app.line.reply_payload import _templates, precompile_reply, serialize_reply
 
 
 class TestRecipeValidation:
@@ -135,17 +136,12 @@ class TestInMemoryReplyMessenger:
 
 
 class TestRecipeTranslation:
-    """Test translation from application recipes to LINE SDK requests."""
+    """Test translation from application recipes to LINE SDK messages."""
 
     def test_text_recipe_translation(self) -> None:
         """Translate plain text without adding Quick Reply data."""
-        request = LineSdkReplyMessenger._build_request("token", TextRecipe("Hello"))
+        message = LineSdkReplyMessenger._build_message(TextRecipe("Hello"))
 
-        assert isinstance(request, ReplyMessageRequest)
-        assert request.reply_token == "token"
-        assert request.notification_disabled is False
-        assert len(request.messages) == 1
-        message = request.messages[0]
         assert isinstance(message, TextMessage)
         assert message.text == "Hello"
         assert message.quick_reply is None
@@ -160,9 +156,11 @@ class TestRecipeTranslation:
             ),
         )
 
-        request = LineSdkReplyMessenger._build_request("token", recipe)
+        message = LineSdkReplyMessenger._build_message(recipe)
 
-        actions = [item.action for item in request.messages[0].quick_reply.items]
+        assert message.quick_reply is not None
+        assert message.quick_reply.items is not None
+        actions = [item.action for item in message.quick_reply.items]
         assert all(isinstance(action, MessageAction) for action in actions)
         assert [(action.label, action.text) for action in actions] == [
             ("臺北", "臺北市"),
@@ -173,9 +171,11 @@ class TestRecipeTranslation:
         """Translate a location recipe into one location action."""
         recipe = LocationRequestRecipe("請分享地點", "開啟地圖")
 
-        request = LineSdkReplyMessenger._build_request("token", recipe)
+        message = LineSdkReplyMessenger._build_message(recipe)
 
-        actions = [item.action for item in request.messages[0].quick_reply.items]
+        assert message.quick_reply is not None
+        assert message.quick_reply.items is not None
+        actions = [item.action for item in message.quick_reply.items]
         assert len(actions) == 1
         assert isinstance(actions[0], LocationAction)
         assert actions[0].label == "開啟地圖"
@@ -190,9 +190,11 @@ class TestRecipeTranslation:
             ),
         )
 
-        request = LineSdkReplyMessenger._build_request("token", recipe)
+        message = LineSdkReplyMessenger._build_message(recipe)
 
-        actions = [item.action for item in request.messages[0].quick_reply.items]
+        assert message.quick_reply is not None
+        assert message.quick_reply.items is not None
+        actions = [item.action for item in message.quick_reply.items]
         assert all(isinstance(action, URIAction) for action in actions)
         assert [(action.label, action.uri) for action in actions] == [
             ("文件", "https://example.com/docs"),
@@ -200,30 +202,84 @@ class TestRecipeTranslation:
         ]
 
 
+@contextmanager
+def _patched_sdk(status: int = 200) -> Iterator[tuple[MagicMock, MagicMock]]:
+    """Patch the SDK clients so replies are answered with the given HTTP status."""
+    with (
+        patch("app.line.messaging.ApiClient") as api_client_class,
+        patch("app.line.messaging.MessagingApi") as messaging_api_class,
+    ):
+        api_client = api_client_class.return_value
+        api_client.default_headers = {"Authorization": "Bearer access-token"}
+        api_client.rest_client.pool_manager.request.return_value.status = status
+        yield api_client_class, messaging_api_class
+
+
 class TestLineSdkReplyMessenger:
     """Test SDK lifecycle ownership and stable error containment."""
 
-    def test_reply_owns_client_lifecycle(self) -> None:
-        """Build, send, and close one SDK client for one reply attempt."""
-        adapter = LineSdkReplyMessenger("access-token")
-        sdk_client = Mock(name="sdk_client")
+    def test_reply_reuses_pooled_client(self) -> None:
+        """Build one SDK client and reuse its pool across replies with the configured timeouts."""
+        adapter = LineSdkReplyMessenger(
+            "access-token", pool_maxsize=4, connect_timeout=1.5, read_timeout=5.0
+        )
 
-        with (
-            patch("app.line.messaging.ApiClient") as api_client_class,
-            patch("app.line.messaging.MessagingApi") as messaging_api_class,
-        ):
-            api_client_class.return_value.__enter__.return_value = sdk_client
-            send_result = adapter.reply("reply-token", TextRecipe("Hello"))
+        with _patched_sdk() as (api_client_class, messaging_api_class):
+            first_result = adapter.reply("reply-token", TextRecipe("Hello"))
+            second_result = adapter.reply("second-token", TextRecipe("Again"))
 
-        assert send_result == SendResult.sent()
+        assert first_result == second_result == SendResult.sent()
+        assert adapter._configuration.connection_pool_maxsize == 4
         api_client_class.assert_called_once_with(adapter._configuration)
-        api_client_class.return_value.__enter__.assert_called_once_with()
-        api_client_class.return_value.__exit__.assert_called_once()
-        messaging_api_class.assert_called_once_with(sdk_client)
-        request = messaging_api_class.return_value.reply_message.call_args.args[0]
-        assert request.reply_token == "reply-token"
-        assert request.messages[0].text == "Hello"
-        messaging_api_class.return_value.reply_message.assert_called_once_with(request)
+        messaging_api_class.assert_called_once_with(api_client_class.return_value)
+        post = api_client_class.return_value.rest_client.pool_manager.request
+        assert post.call_count == 2
+        assert post.call_args_list[0].args == ("POST", "https://api.line.me/v2/bot/message/reply")
+        kwargs = post.call_args_list[0].kwargs
+        assert kwargs["body"] == serialize_reply("reply-token", TextRecipe("Hello"))
+        assert kwargs["headers"]["Authorization"] == "Bearer access-token"
+        assert kwargs["headers"]["Content-Type"] == "application/json"
+        assert (kwargs["timeout"].connect_timeout, kwargs["timeout"].read_timeout) == (1.5, 5.0)
+
+    def test_reply_posts_precompiled_template_to_host_override(self) -> None:
+        """Send the precompiled body of a constant recipe without building SDK models."""
+        recipe = precompile_reply(TextRecipe("Precompiled"))
+        adapter = LineSdkReplyMessenger("access-token", host="https://127.0.0.1:8443")
+        try:
+            expected_body = _templates[recipe].render("reply-token")
+            with (
+                _patched_sdk() as (api_client_class, _),
+                patch.object(LineSdkReplyMessenger, "_build_message") as build_message,
+            ):
+                send_result = adapter.reply("reply-token", recipe)
+        finally:
+            del _templates[recipe]
+
+        assert send_result == SendResult.sent()
+        post = api_client_class.return_value.rest_client.pool_manager.request
+        assert post.call_args.args[1] == "https://127.0.0.1:8443/v2/bot/message/reply"
+        assert post.call_args.kwargs["body"] == expected_body
+        build_message.assert_not_called()
+
+    def test_close_releases_pool_and_reopens_on_next_reply(self) -> None:
+        """Clear pooled connections on close and lazily rebuild the client afterwards."""
+        adapter = LineSdkReplyMessenger("access-token")
+        adapter.close()
+
+        with _patched_sdk() as (api_client_class, _):
+            adapter.reply("reply-token", TextRecipe("Hello"))
+            adapter.close()
+            adapter.reply("second-token", TextRecipe("Again"))
+
+        api_client = api_client_class.return_value
+        api_client.rest_client.pool_manager.clear.assert_called_once_with()
+        api_client.close.assert_called_once_with()
+        assert api_client_class.call_count == 2
+
+    def test_adapter_rejects_empty_pool(self) -> None:
+        """Reject a connection pool that could never send a reply."""
+        with pytest.raises(ValueError):
+            LineSdkReplyMessenger("access-token", pool_maxsize=0)
 
     def test_reply_rejects_missing_token_before_sdk_lifecycle(self) -> None:
         """Classify a missing token without opening an SDK client."""
@@ -244,30 +300,22 @@ class TestLineSdkReplyMessenger:
             (429, SendErrorCategory.RATE_LIMITED),
             (404, SendErrorCategory.LINE_API),
             (500, SendErrorCategory.LINE_API),
-            (None, SendErrorCategory.LINE_API),
         ],
     )
-    def test_reply_classifies_api_exception_without_retry(
+    def test_reply_classifies_api_error_without_retry(
         self,
-        status_code: int | None,
+        status_code: int,
         expected_category: SendErrorCategory,
     ) -> None:
-        """Map SDK API failures and make exactly one single-use-token attempt."""
+        """Map API error statuses and make exactly one single-use-token attempt."""
         adapter = LineSdkReplyMessenger("access-token")
 
-        with (
-            patch("app.line.messaging.ApiClient") as api_client_class,
-            patch("app.line.messaging.MessagingApi") as messaging_api_class,
-        ):
-            messaging_api_class.return_value.reply_message.side_effect = ApiException(
-                status=status_code,
-                reason="rejected",
-            )
+        with _patched_sdk(status_code) as (api_client_class, _):
             send_result = adapter.reply("reply-token", TextRecipe("Hello"))
 
         assert send_result == SendResult.failed(expected_category)
         api_client_class.assert_called_once()
-        messaging_api_class.return_value.reply_message.assert_called_once()
+        api_client_class.return_value.rest_client.pool_manager.request.assert_called_once()
 
     @pytest.mark.parametrize(
         "raw_exception",
@@ -277,31 +325,112 @@ class TestLineSdkReplyMessenger:
         """Contain transport exceptions behind the stable transport category."""
         adapter = LineSdkReplyMessenger("access-token")
 
+        with _patched_sdk() as (api_client_class, _):
+            post = api_client_class.return_value.rest_client.pool_manager.request
+            post.side_effect = raw_exception
+            send_result = adapter.reply("reply-token", TextRecipe("Hello"))
+
+        assert send_result == SendResult.failed(SendErrorCategory.TRANSPORT)
+        post.assert_called_once()
+
+    def test_reply_records_outcome_and_latency(self) -> None:
+        """Record each API call with its recipe type, outcome, and duration."""
+        adapter = LineSdkReplyMessenger("access-token")
+        recipe = MessageChoicesRecipe("Pick", (MessageChoice("A", "a"),))
+
+        with (
+            _patched_sdk(429),
+            patch("app.line.messaging.line_metrics.record_reply") as record_reply,
+        ):
+            adapter.reply("reply-token", recipe)
+            adapter.reply(None, recipe)
+
+        rate_limited, missing_token = record_reply.call_args_list
+        assert rate_limited.args[:2] == ("message_choices", "rate_limited")
+        assert rate_limited.args[2] >= 0
+        assert missing_token.args == ("message_choices", "invalid_request", None)
+
+    def test_reply_times_only_the_api_call(self) -> None:
+        """Start the latency timer after the request body is built."""
+        adapter = LineSdkReplyMessenger("access-token")
+        calls = MagicMock()
+
+        with (
+            _patched_sdk(),
+            patch("app.line.reply_payload.serialize_reply", return_value=b"{}") as serialize,
+            patch("app.line.messaging.time.perf_counter", return_value=1.0) as perf_counter,
+        ):
+            calls.attach_mock(serialize, "serialize")
+            calls.attach_mock(perf_counter, "perf_counter")
+            adapter.reply("reply-token", TextRecipe("Hello"))
+
+        assert [call[0] for call in calls.mock_calls] == [
+            "serialize",
+            "perf_counter",
+            "perf_counter",
+        ]
+
+    def test_multicast_sends_recipe_with_retry_key(self) -> None:
+        """Push one recipe to many users through the pooled client."""
+        adapter = LineSdkReplyMessenger("access-token")
+
         with (
             patch("app.line.messaging.ApiClient"),
             patch("app.line.messaging.MessagingApi") as messaging_api_class,
         ):
-            messaging_api_class.return_value.reply_message.side_effect = raw_exception
-            send_result = adapter.reply("reply-token", TextRecipe("Hello"))
+            send_result = adapter.multicast(["U1", "U2"], TextRecipe("Morning"), "retry-key")
 
-        assert send_result == SendResult.failed(SendErrorCategory.TRANSPORT)
-        messaging_api_class.return_value.reply_message.assert_called_once()
+        assert send_result == SendResult.sent()
+        multicast = messaging_api_class.return_value.multicast
+        request = multicast.call_args.args[0]
+        assert request.to == ["U1", "U2"]
+        assert request.messages[0].text == "Morning"
+        assert multicast.call_args.kwargs["x_line_retry_key"] == "retry-key"
 
-    def test_reply_contains_unexpected_exception(self) -> None:
-        """Contain arbitrary raw exceptions behind the stable internal category."""
+    @pytest.mark.parametrize(
+        ("retry_key", "expected"),
+        [
+            ("retry-key", SendResult.sent()),
+            (None, SendResult.failed(SendErrorCategory.LINE_API)),
+        ],
+    )
+    def test_multicast_treats_conflict_on_retry_key_as_sent(
+        self, retry_key: str | None, expected: SendResult
+    ) -> None:
+        """Report 409 for an already accepted retry key as sent."""
         adapter = LineSdkReplyMessenger("access-token")
 
         with (
             patch("app.line.messaging.ApiClient"),
             patch("app.line.messaging.MessagingApi") as messaging_api_class,
         ):
-            messaging_api_class.return_value.reply_message.side_effect = RuntimeError(
-                "unexpected raw failure"
-            )
+            messaging_api_class.return_value.multicast.side_effect = ApiException(status=409)
+            send_result = adapter.multicast(["U1"], TextRecipe("Morning"), retry_key)
+
+        assert send_result == expected
+
+    def test_multicast_rejects_invalid_recipient_count(self) -> None:
+        """Reject empty and oversized recipient lists before calling LINE."""
+        adapter = LineSdkReplyMessenger("access-token")
+
+        with patch("app.line.messaging.ApiClient") as api_client_class:
+            empty = adapter.multicast([], TextRecipe("Morning"))
+            oversized = adapter.multicast(["U"] * 501, TextRecipe("Morning"))
+
+        assert empty == oversized == SendResult.failed(SendErrorCategory.INVALID_REQUEST)
+        api_client_class.assert_not_called()
+
+    def test_reply_contains_unexpected_exception(self) -> None:
+        """Contain arbitrary raw exceptions behind the stable internal category."""
+        adapter = LineSdkReplyMessenger("access-token")
+
+        with _patched_sdk() as (api_client_class, _):
+            post = api_client_class.return_value.rest_client.pool_manager.request
+            post.side_effect = RuntimeError("unexpected raw failure")
             send_result = adapter.reply("reply-token", TextRecipe("Hello"))
 
         assert send_result == SendResult.failed(SendErrorCategory.INTERNAL)
-        messaging_api_class.return_value.reply_message.assert_called_once()
+        post.assert_called_once()
 
 
 def test_messaging_sdk_symbols_are_isolated_to_adapter_boundary() -> None:
@@ -7,12 +7,15 @@ from linebot.v3.exceptions import InvalidSignatureError
 
 from app.line.metrics import (
     extract_event_types_from_body,
+    line_reply_duration_seconds,
+    line_reply_total,
     line_webhook_event_duration_seconds,
     line_webhook_events_error_total,
     line_webhook_events_success_total,
     line_webhook_events_total,
     normalize_event_type,
     normalize_runtime_event_type,
+    record_reply,
     record_webhook_duration,
     record_webhook_error,
     record_webhook_received,
@@ -136,6 +139,27 @@ class TestLineMetrics:
         assert duration_metric._sum.get() == pytest.approx(duration_sum_before + 0.005)
         assert duration_metric._buckets[0].get() == duration_bucket_before + 1
 
+    def test_record_reply_counts_and_observes_api_calls(self) -> None:
+        """Test reply outcomes are counted and only API calls observe latency."""
+        sent_total = line_reply_total.labels(recipe_type="reply_test", outcome="sent")
+        invalid_total = line_reply_total.labels(recipe_type="reply_test", outcome="invalid")
+        sent_duration = line_reply_duration_seconds.labels(recipe_type="reply_test", outcome="sent")
+        invalid_duration = line_reply_duration_seconds.labels(
+            recipe_type="reply_test", outcome="invalid"
+        )
+        sent_before = sent_total._value.get()
+        invalid_before = invalid_total._value.get()
+        sent_sum_before = sent_duration._sum.get()
+        invalid_sum_before = invalid_duration._sum.get()
+
+        record_reply("reply_test", "sent", 0.2)
+        record_reply("reply_test", "invalid", None)
+
+        assert sent_total._value.get() == sent_before + 1
+        assert invalid_total._value.get() == invalid_before + 1
+        assert sent_duration._sum.get() == pytest.approx(sent_sum_before + 0.2)
+        assert invalid_duration._sum.get() == invalid_sum_before
+
     def test_process_webhook_events_records_per_event_metrics(self) -> None:
         """Test webhook processing records metrics for each dispatched event."""
         first_event = Mock()
@@ -0,0 +1,231 @@
+"""Tests for the outbound LINE API governor."""
+
+from collections.abc import Iterator
+from unittest.mock import Mock, patch
+
+import pytest
+from prometheus_client import REGISTRY
+from redis.exceptions import RedisError
+
+from app.line.messaging import SendErrorCategory, SendResult, TextRecipe
+from app.line.outbound_governor import (
+    _BACKOFF_KEY,
+    GovernedReplyMessenger,
+    OutboundGovernor,
+    _LocalTokenBucket,
+)
+
+
+@pytest.fixture
+def governor_settings() -> Iterator[Mock]:
+    """Provide small, deterministic governor settings."""
+    with patch("app.line.outbound_governor.settings") as mock_settings:
+        mock_settings.LINE_OUTBOUND_GOVERNOR_ENABLED = True
+        mock_settings.LINE_OUTBOUND_MAX_CONCURRENCY = 2
+        mock_settings.LINE_OUTBOUND_RATE_PER_SECOND = 10.0
+        mock_settings.LINE_OUTBOUND_BURST = 2
+        mock_settings.LINE_OUTBOUND_MAX_WAIT_SECONDS = 0.0
+        mock_settings.LINE_OUTBOUND_BACKOFF_SECONDS = 5.0
+        mock_settings.LINE_OUTBOUND_BACKOFF_MAX_SECONDS = 15.0
+        mock_settings.LINE_OUTBOUND_BACKOFF_RATE_FACTOR = 0.5
+        yield mock_settings
+
+
+@pytest.fixture
+def no_redis() -> Iterator[Mock]:
+    """Run the governor without a shared Redis client."""
+    with patch("app.line.outbound_governor.shared_redis") as mock_shared:
+        mock_shared.get_client.return_value = None
+        yield mock_shared
+
+
+class TestLocalTokenBucket:
+    """Test the in-process fallback bucket."""
+
+    def test_allows_burst_then_reports_wait(self) -> None:
+        """Spend the burst capacity and report the refill wait."""
+        bucket = _LocalTokenBucket()
+        with patch("app.line.outbound_governor.time.monotonic", return_value=0.0):
+            assert bucket.acquire(2, 10.0, 0.5).allowed
+            assert bucket.acquire(2, 10.0, 0.5).allowed
+            decision = bucket.acquire(2, 10.0, 0.5)
+        assert not decision.allowed
+        assert decision.wait_seconds == pytest.approx(0.1)
+
+    def test_backoff_slows_refill(self) -> None:
+        """Refill at the reduced rate while backing off."""
+        bucket = _LocalTokenBucket()
+        with patch("app.line.outbound_governor.time.monotonic", return_value=0.0):
+            bucket.acquire(1, 10.0, 0.5)
+            bucket.start_backoff(5.0)
+        with patch("app.line.outbound_governor.time.monotonic", return_value=0.1):
+            decision = bucket.acquire(1, 10.0, 0.5)
+        assert not decision.allowed
+        assert decision.tokens_left == pytest.approx(0.5)
+
+
+@pytest.mark.usefixtures("governor_settings")
+class TestOutboundGovernor:
+    """Test token and slot acquisition and 429 backoff."""
+
+    @pytest.mark.usefixtures("no_redis")
+    def test_local_bucket_limits_tokens(self) -> None:
+        """Refuse tokens once the local burst is spent and no wait is allowed."""
+        governor = OutboundGovernor()
+        assert governor.acquire_token()
+        assert governor.acquire_token()
+        assert not governor.acquire_token()
+
+    def test_uses_redis_script_when_available(self) -> None:
+        """Take tokens from the shared Redis bucket."""
+        redis_client = Mock()
+        script = redis_client.register_script.return_value
+        script.return_value = [1, "4.5", "0", 0]
+        with patch("app.line.outbound_governor.shared_redis") as mock_shared:
+            mock_shared.get_client.return_value = redis_client
+            governor = OutboundGovernor()
+            assert governor.acquire_token()
+            assert governor.acquire_token()
+
+        redis_client.register_script.assert_called_once()
+        assert script.call_args.kwargs["args"] == [2, 10.0, 0.5]
+
+    def test_falls_back_to_local_bucket_on_redis_error(self) -> None:
+        """Keep sending with the local bucket when the script fails."""
+        redis_client = Mock()
+        redis_client.register_script.return_value.side_effect = RedisError("down")
+        with patch("app.line.outbound_governor.shared_redis") as mock_shared:
+            mock_shared.get_client.return_value = redis_client
+            governor = OutboundGovernor()
+            assert governor.acquire_token()
+
+        mock_shared.record_failure.assert_called_once_with()
+        mock_shared.record_success.assert_not_called()
+
+    @pytest.mark.usefixtures("no_redis")
+    def test_concurrency_slots_are_bounded(self) -> None:
+        """Refuse slots past the concurrency cap until one is released."""
+        governor = OutboundGovernor()
+        assert governor.acquire_slot()
+        assert governor.acquire_slot()
+        assert not governor.acquire_slot()
+        governor.release_slot()
+        assert governor.acquire_slot()
+
+    def test_rate_limited_result_shares_doubling_backoff(self) -> None:
+        """Publish a doubling, capped backoff window and reset it on success."""
+        redis_client = Mock()
+        rate_limited = SendResult.failed(SendErrorCategory.RATE_LIMITED)
+        with patch("app.line.outbound_governor.shared_redis") as mock_shared:
+            mock_shared.get_client.return_value = redis_client
+            governor = OutboundGovernor()
+            for _ in range(3):
+                governor.record_result(rate_limited)
+            governor.record_result(SendResult.sent())
+            governor.record_result(rate_limited)
+
+        windows = [call.kwargs["px"] for call in redis_client.set.call_args_list]
+        assert windows == [5000, 10000, 15000, 5000]
+        assert redis_client.set.call_args.args == (_BACKOFF_KEY, "1")
+
+    @pytest.mark.usefixtures("no_redis")
+    def test_backoff_gauge_clears_on_success(self) -> None:
+        """Reset the backoff gauge when a reply succeeds."""
+        governor = OutboundGovernor()
+
+        governor.record_result(SendResult.failed(SendErrorCategory.RATE_LIMITED))
+        assert REGISTRY.get_sample_value("line_outbound_backoff_active") == 1
+        governor.record_result(SendResult.sent())
+        assert REGISTRY.get_sample_value("line_outbound_backoff_active") == 0
+
+    @pytest.mark.usefixtures("no_redis")
+    def test_backoff_gauge_follows_window_on_acquire(self) -> None:
+        """Report the backoff while its window lasts and clear it once it expired."""
+        governor = OutboundGovernor()
+        with patch("app.line.outbound_governor.time.monotonic", return_value=0.0):
+            governor.record_result(SendResult.failed(SendErrorCategory.RATE_LIMITED))
+            governor.acquire_token()
+        assert REGISTRY.get_sample_value("line_outbound_backoff_active") == 1
+
+        with patch("app.line.outbound_governor.time.monotonic", return_value=6.0):
+            governor.acquire_token()
+        assert REGISTRY.get_sample_value("line_outbound_backoff_active") == 0
+
+    def test_redis_backoff_flag_sets_gauge(self) -> None:
+        """Report a backoff started by another worker through the shared script."""
+        redis_client = Mock()
+        redis_client.register_script.return_value.return_value = [1, "1.0", "0", 1]
+        with patch("app.line.outbound_governor.shared_redis") as mock_shared:
+            mock_shared.get_client.return_value = redis_client
+            OutboundGovernor().acquire_token()
+
+        assert REGISTRY.get_sample_value("line_outbound_backoff_active") == 1
+
+
+@pytest.mark.usefixtures("governor_settings", "no_redis")
+class TestGovernedReplyMessenger:
+    """Test the governed messenger wrapper."""
+
+    def test_forwards_reply_and_records_result(self) -> None:
+        """Send through the inner messenger and feed the outcome back."""
+        inner = Mock()
+        inner.reply.return_value = SendResult.sent()
+        governor = Mock(spec=OutboundGovernor)
+        governor.acquire_slot.return_value = True
+        governor.acquire_token.return_value = True
+        messenger = GovernedReplyMessenger(inner, governor)
+
+        result = messenger.reply("token", TextRecipe("hi"))
+
+        assert result.success
+        governor.release_slot.assert_called_once()
+        governor.record_result.assert_called_once_with(result)
+
+    def test_drops_reply_without_token(self) -> None:
+        """Return RATE_LIMITED and release the slot when no token is available."""
+        inner = Mock()
+        governor = Mock(spec=OutboundGovernor)
+        governor.acquire_slot.return_value = True
+        governor.acquire_token.return_value = False
+        messenger = GovernedReplyMessenger(inner, governor)
+
+        with patch("app.line.messaging.line_metrics.record_reply") as record_reply:
+            result = messenger.reply("token", TextRecipe("hi"))
+
+        assert result.error_category == SendErrorCategory.RATE_LIMITED
+        inner.reply.assert_not_called()
+        governor.release_slot.assert_called_once()
+        record_reply.assert_called_once_with("text", "dropped", None)
+
+    def test_drops_reply_without_slot(self) -> None:
+        """Record a dropped reply when the concurrency cap is reached."""
+        inner = Mock()
+        governor = Mock(spec=OutboundGovernor)
+        governor.acquire_slot.return_value = False
+        messenger = GovernedReplyMessenger(inner, governor)
+
+        with patch("app.line.messaging.line_metrics.record_reply") as record_reply:
+            result = messenger.reply("token", TextRecipe("hi"))
+
+        assert result.error_category == SendErrorCategory.RATE_LIMITED
+        inner.reply.assert_not_called()
+        governor.release_slot.assert_not_called()
+        record_reply.assert_called_once_with("text", "dropped", None)
+
+    def test_bypasses_governor_when_disabled(self, governor_settings: Mock) -> None:
+        """Call the inner messenger directly when the governor is disabled."""
+        governor_settings.LINE_OUTBOUND_GOVERNOR_ENABLED = False
+        inner = Mock()
+        governor = Mock(spec=OutboundGovernor)
+        messenger = GovernedReplyMessenger(inner, governor)
+
+        messenger.reply("token", TextRecipe("hi"))
+
+        inner.reply.assert_called_once()
+        governor.acquire_slot.assert_not_called()
+
+    def test_close_delegates_to_inner(self) -> None:
+        """Release the inner messenger's connections on close."""
+        inner = Mock()
+        GovernedReplyMessenger(inner, Mock(spec=OutboundGovernor)).close()
+        inner.close.assert_called_once()
@@ -112,7 +112,7 @@ def test_execute_closes_history_session_before_returning() -> None:
     plan = prepare_postback("action=recent_queries", "user")
     with (
         patch("app.line.postback.SessionLocal") as factory,
-        patch("app.line.postback.get_user_by_line_id", return_value=Mock(id=1)),
+        patch("app.line.postback.get_user_profile", return_value=Mock(id=1)),
         patch("app.line.postback.get_recent_queries", return_value=[]),
     ):
         recipe = execute_postback(plan)
@@ -126,7 +126,7 @@ def test_execute_recent_queries_creates_user_and_returns_choices() -> None:
     plan = prepare_postback("action=recent_queries", "user")
     with (
         patch("app.line.postback.SessionLocal"),
-        patch("app.line.postback.get_user_by_line_id", return_value=None),
+        patch("app.line.postback.get_user_profile", return_value=None),
         patch("app.line.postback.create_user_if_not_exists", return_value=Mock(id=7)) as create,
         patch("app.line.postback.get_recent_queries", return_value=locations) as recent,
     ):
@@ -0,0 +1,63 @@
+"""Test the SDK-free reply serializer against the LINE SDK request body."""
+
+import json
+
+import pytest
+
+from app.line import postback
+from app.line.messaging import (
+    LineSdkReplyMessenger,
+    LocationRequestRecipe,
+    MessageChoice,
+    MessageChoicesRecipe,
+    ReplyRecipe,
+    TextRecipe,
+    UriChoice,
+    UriChoicesRecipe,
+)
+from app.line.reply_payload import _templates, precompile_reply, serialize_reply
+
+RECIPES = [
+    TextRecipe("晴時多雲 ☀️\n降雨機率 10%"),
+    MessageChoicesRecipe(
+        "請選擇",
+        (MessageChoice("臺北", "臺北市"), MessageChoice('"quoted"', "back\\slash")),
+    ),
+    LocationRequestRecipe("請分享地點", "開啟地圖"),
+    UriChoicesRecipe("請選擇", (UriChoice("文件", "https://example.com/docs?a=1&b=2"),)),
+]
+
+
+def _sdk_body(reply_token: str, recipe: ReplyRecipe) -> bytes:
+    """Serialize a recipe into the body the LINE SDK REST client would send."""
+    message = LineSdkReplyMessenger._build_message(recipe)
+    request = {"replyToken": reply_token, "messages": [message.to_dict()]}
+    return json.dumps({**request, "notificationDisabled": False}).encode()
+
+
+@pytest.mark.parametrize("recipe", RECIPES)
+def test_serialize_reply_matches_sdk_body(recipe: ReplyRecipe) -> None:
+    """Produce exactly the bytes the SDK sends for every recipe type."""
+    assert serialize_reply("reply-token", recipe) == _sdk_body("reply-token", recipe)
+
+
+@pytest.mark.parametrize("recipe", RECIPES)
+def test_precompiled_template_matches_sdk_body(recipe: ReplyRecipe) -> None:
+    """Splice tokens into precompiled templates without changing the body."""
+    assert precompile_reply(recipe) is recipe
+    try:
+        for reply_token in ("first-token", 'needs "escaping"'):
+            assert serialize_reply(reply_token, recipe) == _sdk_body(reply_token, recipe)
+    finally:
+        del _templates[recipe]
+
+
+def test_postback_constant_recipes_are_precompiled() -> None:
+    """Register the constant PostBack recipes at import time."""
+    for recipe in (
+        postback._LOCK_DENIED_RECIPE,
+        postback._CURRENT_LOCATION_RECIPE,
+        postback._OTHER_MENU_RECIPE,
+        postback._NO_RECENT_QUERIES_RECIPE,
+    ):
+        assert recipe in _templates
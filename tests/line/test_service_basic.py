@@ -4,6 +4,7 @@ from collections.abc import Callable
 from unittest.mock import Mock, patch
 
 from app.core.config import settings
+from app.core.rate_limiter import RateLimitDecision
 from app.line.messaging import (
     InMemoryReplyMessenger,
     SendResult,
@@ -21,6 +22,7 @@ from app.line.service import (
     handle_message_event,
     handle_postback_event,
     handle_unfollow_event,
+    process_webhook_events,
     production_reply_messenger,
 )
 from app.line.weather_presentation import QueryKind, build_weather_reply
@@ -232,6 +234,116 @@ class TestFollowHandler:
 
         assert messenger.sent_replies == []
 
+    def test_follow_batch_is_provisioned_with_one_upsert(
+        self,
+        create_mock_follow_event: Callable[..., Mock],
+        mock_db_session: Mock,
+    ) -> None:
+        """Upsert every followed user of a webhook once and skip per-event writes."""
+        events = [
+            create_mock_follow_event(user_id="first_user"),
+            create_mock_follow_event(user_id="second_user"),
+        ]
+        payload = Mock(events=events)
+        messenger = InMemoryReplyMessenger()
+
+        with (
+            patch("app.line.service.webhook_dispatcher.parse", return_value=payload),
+            patch(
+                "app.line.service.webhook_dispatcher.dispatch",
+                side_effect=lambda event, _: handle_follow_event(event, messenger) or True,
+            ),
+            patch("app.line.service.SessionLocal") as session_factory,
+            patch("app.line.service.create_users_if_not_exist") as create_users,
+            patch("app.line.service.create_user_if_not_exists") as create_user,
+        ):
+            session_factory.return_value.__enter__.return_value = mock_db_session
+            process_webhook_events("{}", "signature")
+
+        create_users.assert_called_once_with(mock_db_session, ["first_user", "second_user"])
+        create_user.assert_not_called()
+        assert len(messenger.sent_replies) == 2
+
+    def test_follow_after_unfollow_in_one_batch_is_applied_in_order(
+        self,
+        create_mock_follow_event: Callable[..., Mock],
+        create_mock_unfollow_event: Callable[..., Mock],
+        mock_db_session: Mock,
+    ) -> None:
+        """Keep users who also unfollow out of the batch so their last follow wins."""
+        events = [
+            create_mock_follow_event(user_id="first_user"),
+            create_mock_follow_event(user_id="second_user"),
+            create_mock_follow_event(user_id="flapping_user"),
+            create_mock_unfollow_event(user_id="flapping_user"),
+            create_mock_follow_event(user_id="flapping_user"),
+        ]
+        payload = Mock(events=events)
+        messenger = InMemoryReplyMessenger()
+        writes: list[tuple[str, str]] = []
+
+        def dispatch(event: Mock, _: object) -> bool:
+            """Route each event to its real handler."""
+            if event in events[3:4]:
+                handle_unfollow_event(event)
+            else:
+                handle_follow_event(event, messenger)
+            return True
+
+        with (
+            patch("app.line.service.webhook_dispatcher.parse", return_value=payload),
+            patch("app.line.service.webhook_dispatcher.dispatch", side_effect=dispatch),
+            patch("app.line.service.SessionLocal") as session_factory,
+            patch("app.line.service.create_users_if_not_exist") as create_users,
+            patch(
+                "app.line.service.create_user_if_not_exists",
+                side_effect=lambda _, user_id: writes.append(("follow", user_id)),
+            ),
+            patch(
+                "app.line.service.deactivate_user",
+                side_effect=lambda _, user_id: writes.append(("unfollow", user_id)),
+            ),
+        ):
+            session_factory.return_value.__enter__.return_value = mock_db_session
+            process_webhook_events("{}", "signature")
+
+        create_users.assert_called_once_with(mock_db_session, ["first_user", "second_user"])
+        assert writes == [
+            ("follow", "flapping_user"),
+            ("unfollow", "flapping_user"),
+            ("follow", "flapping_user"),
+        ]
+
+    def test_follow_batch_failure_falls_back_to_per_event_upserts(
+        self,
+        create_mock_follow_event: Callable[..., Mock],
+        mock_db_session: Mock,
+    ) -> None:
+        """Let each handler provision its user when the batch upsert fails."""
+        events = [
+            create_mock_follow_event(user_id="first_user"),
+            create_mock_follow_event(user_id="second_user"),
+        ]
+        payload = Mock(events=events)
+        messenger = InMemoryReplyMessenger()
+
+        with (
+            patch("app.line.service.webhook_dispatcher.parse", return_value=payload),
+            patch(
+                "app.line.service.webhook_dispatcher.dispatch",
+                side_effect=lambda event, _: handle_follow_event(event, messenger) or True,
+            ),
+            patch("app.line.service.SessionLocal") as session_factory,
+            patch(
+                "app.line.service.create_users_if_not_exist", side_effect=RuntimeError("db error")
+            ),
+            patch("app.line.service.create_user_if_not_exists") as create_user,
+        ):
+            session_factory.return_value.__enter__.return_value = mock_db_session
+            process_webhook_events("{}", "signature")
+
+        assert create_user.call_count == 2
+
 
 class TestUnfollowHandler:
     """Test unfollow event persistence behavior."""
@@ -292,6 +404,65 @@ class TestUnfollowHandler:
             handle_unfollow_event(create_mock_unfollow_event())
 
 
+class TestRateLimit:
+    """Test the per-user rate limit guard in front of each handler."""
+
+    def test_rate_limited_text_message_skips_query(
+        self, create_mock_message_event: Callable[..., Mock]
+    ) -> None:
+        """Reply with the rate limit notice instead of querying the weather."""
+        event = create_mock_message_event(text="臺北市")
+        event.source = Mock(user_id="test_user_id")
+        messenger = InMemoryReplyMessenger()
+
+        with (
+            patch("app.line.service.user_rate_limiter") as limiter,
+            patch("app.line.service.query_text") as query,
+        ):
+            limiter.check.return_value = RateLimitDecision(False, 6.0)
+            handle_message_event(event, messenger)
+
+        limiter.check.assert_called_once_with("text", "test_user_id")
+        query.assert_not_called()
+        assert messenger.sent_replies == [
+            SentReply("test_token", TextRecipe("查詢太頻繁了，請稍等一下再試。"))
+        ]
+
+    def test_rate_limited_location_message_skips_query(
+        self, create_mock_location_message_event: Callable[..., Mock]
+    ) -> None:
+        """Apply the location limit before resolving shared coordinates."""
+        event = create_mock_location_message_event()
+        event.source = Mock(user_id="test_user_id")
+
+        with (
+            patch("app.line.service.user_rate_limiter") as limiter,
+            patch("app.line.service.query_shared_location") as query,
+        ):
+            limiter.check.return_value = RateLimitDecision(False, 6.0)
+            handle_location_message_event(event, InMemoryReplyMessenger())
+
+        limiter.check.assert_called_once_with("location", "test_user_id")
+        query.assert_not_called()
+
+    def test_rate_limited_postback_skips_dispatch(
+        self, create_mock_postback_event: Callable[..., Mock]
+    ) -> None:
+        """Apply the PostBack limit before preparing the action."""
+        event = create_mock_postback_event()
+        event.source = Mock(user_id="test_user_id")
+
+        with (
+            patch("app.line.service.user_rate_limiter") as limiter,
+            patch("app.line.service.prepare_postback") as prepare,
+        ):
+            limiter.check.return_value = RateLimitDecision(False, 3.0)
+            handle_postback_event(event, InMemoryReplyMessenger())
+
+        limiter.check.assert_called_once_with("postback", "test_user_id")
+        prepare.assert_not_called()
+
+
 class TestPostbackLock:
     """Test the processing-lock guard around PostBack dispatch."""
 
@@ -2,10 +2,15 @@
 
 import importlib
 import tempfile
+import time
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
 from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.startup import StartupReport
 
 
 class TestMainApplication:
@@ -45,6 +50,97 @@ class TestMainApplication:
         assert "line_webhook_events_error_total" in response.text
         assert "line_webhook_event_duration_seconds" in response.text
 
+    def test_lifespan_closes_reply_messenger(self) -> None:
+        """Test application shutdown releases the pooled LINE Messaging API client."""
+        import app.main
+
+        with patch.object(app.main.production_reply_messenger, "close") as close:
+            with TestClient(app.main.app):
+                close.assert_not_called()
+
+        close.assert_called_once_with()
+
+    def test_lifespan_owns_line_platform_http_client(self) -> None:
+        """Test the auth HTTP client is started with the app and closed on shutdown."""
+        import app.main
+
+        with TestClient(app.main.app):
+            client = app.main.line_platform_http.get_async_client()
+            assert not client.is_closed
+
+        assert client.is_closed
+
+    def test_lifespan_runs_timed_startup_phases(self) -> None:
+        """Test import-time work now runs as timed lifespan phases."""
+        import app.main
+
+        with patch.object(app.main.static_assets, "load") as load:
+            with TestClient(app.main.app) as client:
+                load.assert_called_once_with(app.main.STATIC_DIR)
+                self._wait_until_ready(client)
+
+        for phase in ("logging", "admin_divisions", "static_assets", "http_clients"):
+            assert (
+                REGISTRY.get_sample_value("startup_phase_duration_seconds", {"phase": phase})
+                is not None
+            )
+        assert REGISTRY.get_sample_value("startup_duration_seconds") is not None
+
+    @staticmethod
+    def _wait_until_ready(client: TestClient) -> dict:
+        """Poll the readiness endpoint until the background warm-up finished."""
+        for _ in range(100):
+            response = client.get("/ready")
+            if response.status_code == 200:
+                return response.json()
+            time.sleep(0.01)
+        raise AssertionError(f"Application never became ready: {response.json()}")
+
+    def test_ready_endpoint_follows_warm_up_and_shutdown(self, client: TestClient) -> None:
+        """Test readiness is reported only between warm-up and shutdown."""
+        import app.main
+
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json() == {"status": "not_ready", "checks": {"warm_up": "pending"}}
+
+        with patch("app.core.readiness._check_redis", return_value="disabled"):
+            with TestClient(app.main.app) as lifespan_client:
+                body = self._wait_until_ready(lifespan_client)
+
+        assert body == {
+            "status": "ready",
+            "checks": {"warm_up": "done", "database": "ok", "redis": "disabled"},
+        }
+        assert client.get("/ready").status_code == 503
+
+    @pytest.mark.asyncio
+    async def test_warm_up_runs_every_step_and_survives_failures(self) -> None:
+        """Test a failing warm-up step is logged and the worker still becomes ready."""
+        import app.main
+
+        startup = StartupReport()
+        with (
+            patch.object(app.main.settings, "WARMUP_ENABLED", True),
+            patch.object(app.main.settings, "ENABLE_ID_TOKEN_SIGNATURE_VERIFICATION", True),
+            patch.object(app.main, "warm_up_connections", side_effect=OSError("db down")),
+            patch.object(app.main, "_connect_redis") as connect_redis,
+            patch.object(app.main, "prefetch_jwks") as prefetch_jwks,
+            patch.object(app.main, "preload_hot_forecasts") as preload_hot_forecasts,
+        ):
+            try:
+                await app.main.warm_up(startup)
+                assert app.main.readiness.is_warm
+            finally:
+                app.main.readiness.reset()
+
+        connect_redis.assert_called_once_with()
+        prefetch_jwks.assert_called_once_with()
+        preload_hot_forecasts.assert_called_once_with(
+            app.main.settings.WARMUP_HOT_FORECAST_LOCATIONS
+        )
+        assert list(startup.phases) == ["warm_redis", "warm_jwks", "warm_forecasts"]
+
     def test_app_has_registered_routers(self) -> None:
         """Test that the app has registered all expected routers."""
         import app.main
@@ -0,0 +1,159 @@
+"""Tests for the user profile cache."""
+
+import json
+from unittest.mock import Mock, patch
+from uuid import uuid4
+
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+
+from app.user.profile_cache import UserProfile, UserProfileCache
+from app.user.service import (
+    create_user_if_not_exists,
+    deactivate_user,
+    get_user_profile,
+    set_user_location,
+)
+from app.weather.models import Location
+
+
+def _profile(line_user_id: str = "U1") -> UserProfile:
+    """Build a profile for cache tests."""
+    return UserProfile(
+        line_user_id=line_user_id,
+        id=1,
+        is_active=True,
+        home_location_id=10,
+        work_location_id=None,
+    )
+
+
+class TestUserProfileCache:
+    """Test the in-process and Redis tiers of UserProfileCache."""
+
+    def test_set_and_get(self) -> None:
+        """Return a cached profile from the local tier."""
+        cache = UserProfileCache()
+        profile = _profile()
+        cache.set(profile)
+        assert cache.get("U1") is profile
+
+    def test_expired_entry_is_dropped(self) -> None:
+        """Treat entries past their TTL as misses."""
+        cache = UserProfileCache()
+        with patch("app.user.profile_cache.time.monotonic", return_value=0.0):
+            cache.set(_profile())
+        with patch("app.user.profile_cache.time.monotonic", return_value=3600.0):
+            assert cache.get("U1") is None
+
+    @patch("app.user.profile_cache.settings")
+    def test_evicts_least_recently_used(self, mock_settings: Mock) -> None:
+        """Keep the local tier within its configured size."""
+        mock_settings.USER_PROFILE_CACHE_ENABLED = True
+        mock_settings.USER_PROFILE_CACHE_REDIS_ENABLED = False
+        mock_settings.USER_PROFILE_CACHE_TTL_SECONDS = 30
+        mock_settings.USER_PROFILE_CACHE_MAX_ENTRIES = 2
+        cache = UserProfileCache()
+        cache.set(_profile("U1"))
+        cache.set(_profile("U2"))
+        cache.get("U1")
+        cache.set(_profile("U3"))
+
+        assert cache.get("U2") is None
+        assert cache.get("U1") is not None
+        assert cache.get("U3") is not None
+
+    @patch("app.user.profile_cache.settings")
+    def test_disabled_cache_never_stores(self, mock_settings: Mock) -> None:
+        """Bypass the cache entirely when disabled."""
+        mock_settings.USER_PROFILE_CACHE_ENABLED = False
+        cache = UserProfileCache()
+        cache.set(_profile())
+        assert cache.get("U1") is None
+
+    @patch("app.user.profile_cache.shared_redis")
+    @patch("app.user.profile_cache.settings")
+    def test_redis_tier_round_trip(self, mock_settings: Mock, mock_shared_redis: Mock) -> None:
+        """Write through to Redis and warm the local tier from it."""
+        mock_settings.USER_PROFILE_CACHE_ENABLED = True
+        mock_settings.USER_PROFILE_CACHE_REDIS_ENABLED = True
+        mock_settings.USER_PROFILE_CACHE_TTL_SECONDS = 30
+        mock_settings.USER_PROFILE_CACHE_MAX_ENTRIES = 10
+        mock_settings.USER_PROFILE_CACHE_REDIS_TTL_SECONDS = 3600
+        mock_redis = Mock()
+        mock_shared_redis.get_client.return_value = mock_redis
+
+        UserProfileCache().set(_profile())
+        key, payload = mock_redis.set.call_args.args
+        assert key == "user:profile:U1"
+        assert mock_redis.set.call_args.kwargs == {"ex": 3600}
+
+        mock_redis.get.return_value = payload
+        assert UserProfileCache().get("U1") == _profile()
+
+    @patch("app.user.profile_cache.shared_redis")
+    @patch("app.user.profile_cache.settings")
+    def test_redis_errors_fail_open(self, mock_settings: Mock, mock_shared_redis: Mock) -> None:
+        """Treat Redis failures and malformed payloads as cache misses."""
+        mock_settings.USER_PROFILE_CACHE_ENABLED = True
+        mock_settings.USER_PROFILE_CACHE_REDIS_ENABLED = True
+        mock_redis = Mock()
+        mock_shared_redis.get_client.return_value = mock_redis
+        cache = UserProfileCache()
+
+        mock_redis.get.side_effect = RedisError("down")
+        assert cache.get("U1") is None
+
+        mock_redis.get.side_effect = None
+        mock_redis.get.return_value = json.dumps({"unexpected": 1})
+        assert cache.get("U1") is None
+
+        mock_redis.delete.side_effect = RedisError("down")
+        cache.invalidate("U1")
+
+        assert mock_shared_redis.record_failure.call_count == 2
+        mock_shared_redis.record_success.assert_called_once_with()
+
+
+class TestUserProfileService:
+    """Test profile loading and invalidation through the user service."""
+
+    def test_get_user_profile_caches_known_users_only(self, session: Session) -> None:
+        """Serve repeated lookups from the cache and never cache unknown users."""
+        line_user_id = str(uuid4())
+        assert get_user_profile(session, line_user_id) is None
+
+        user = create_user_if_not_exists(session, line_user_id)
+        profile = get_user_profile(session, line_user_id)
+        assert profile is not None
+        assert profile.id == user.id
+
+        with patch("app.user.service.get_user_by_line_id") as mock_lookup:
+            assert get_user_profile(session, line_user_id) == profile
+        mock_lookup.assert_not_called()
+
+    def test_writers_invalidate_cached_profile(self, session: Session) -> None:
+        """Reflect deactivation, reactivation, and preset changes immediately."""
+        line_user_id = str(uuid4())
+        create_user_if_not_exists(session, line_user_id)
+        location = Location(
+            geocode=str(uuid4()), county="快取市", district="測試區", full_name="快取市測試區"
+        )
+        session.add(location)
+        session.commit()
+
+        get_user_profile(session, line_user_id)
+        set_user_location(session, line_user_id, "home", "快取市", "測試區")
+        profile = get_user_profile(session, line_user_id)
+        assert profile is not None
+        assert profile.home_location_id == location.id
+
+        deactivate_user(session, line_user_id)
+        profile = get_user_profile(session, line_user_id)
+        assert profile is not None
+        assert profile.is_active is False
+
+        create_user_if_not_exists(session, line_user_id)
+        profile = get_user_profile(session, line_user_id)
+        assert profile is not None
+        assert profile.is_active is True
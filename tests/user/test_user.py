@@ -3,15 +3,18 @@
 import base64
 import hashlib
 import hmac
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 from uuid import uuid4
 
 from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session
 
 from app.user.models import User, UserQuery
 from app.user.service import (
+    _recent_locations_statement,
     create_user_if_not_exists,
+    create_users_if_not_exist,
     deactivate_user,
     get_location_by_county_district,
     get_recent_queries,
@@ -121,6 +124,24 @@ class TestUserService:
         assert user.line_user_id == line_user_id
         assert user.is_active
 
+    def test_create_users_if_not_exist_bulk(self, session: Session) -> None:
+        """Test creating and reactivating many users in one upsert."""
+        inactive_id = str(uuid4())
+        inactive_user = User(line_user_id=inactive_id, is_active=False)
+        session.add(inactive_user)
+        session.commit()
+        existing_id = inactive_user.id
+        new_id = str(uuid4())
+
+        profiles = create_users_if_not_exist(session, [new_id, inactive_id, new_id])
+
+        assert [profile.line_user_id for profile in profiles] == sorted([new_id, inactive_id])
+        assert all(profile.is_active for profile in profiles)
+        assert {profile.line_user_id: profile.id for profile in profiles}[
+            inactive_id
+        ] == existing_id
+        assert create_users_if_not_exist(session, []) == []
+
     def test_deactivate_user_exists(self, session: Session) -> None:
         """Test deactivating user when user exists."""
         line_user_id = str(uuid4())
@@ -403,6 +424,55 @@ class TestUserRouterAdditional:
         assert response.status_code == 401
 
 
+class TestForecastSubscriptionRouter:
+    """Test the LIFF daily forecast subscription endpoints."""
+
+    def test_subscribe_then_unsubscribe(self, client: TestClient, session: Session) -> None:
+        """Save a subscription's push time, then cancel it once."""
+        line_user_id = str(uuid4())
+        session.add(User(line_user_id=line_user_id))
+        session.commit()
+        headers = {"Authorization": "Bearer test_token"}
+
+        with patch("app.core.auth.verify_line_access_token") as mock_auth:
+            mock_auth.return_value = line_user_id
+            subscribed = client.put(
+                "/users/subscriptions/office", json={"send_minute": 450}, headers=headers
+            )
+            unsubscribed = client.delete("/users/subscriptions/office", headers=headers)
+            repeated = client.delete("/users/subscriptions/office", headers=headers)
+
+        assert subscribed.status_code == 200
+        assert subscribed.json()["send_minute"] == 450
+        assert unsubscribed.status_code == 200
+        assert unsubscribed.json()["message"] == "已取消每日天氣推播"
+        assert repeated.status_code == 404
+
+    def test_subscribe_rejects_invalid_preset(self, client: TestClient) -> None:
+        """Return 400 for presets other than home and office."""
+        with patch("app.core.auth.verify_line_access_token") as mock_auth:
+            mock_auth.return_value = "test_line_user_id"
+            response = client.put(
+                "/users/subscriptions/gym",
+                json={"send_minute": 450},
+                headers={"Authorization": "Bearer test_token"},
+            )
+
+        assert response.status_code == 400
+
+    def test_subscribe_unknown_user(self, client: TestClient) -> None:
+        """Return 404 when the LINE user has no account yet."""
+        with patch("app.core.auth.verify_line_access_token") as mock_auth:
+            mock_auth.return_value = str(uuid4())
+            response = client.put(
+                "/users/subscriptions/home",
+                json={"send_minute": 450},
+                headers={"Authorization": "Bearer test_token"},
+            )
+
+        assert response.status_code == 404
+
+
 class TestUserQueryHistory:
     """Test user query history functionality."""
 
@@ -562,3 +632,28 @@ class TestUserQueryHistory:
         """Test getting recent queries for nonexistent user."""
         recent_locations = get_recent_queries(session, 99999)
         assert recent_locations == []
+
+    def test_get_recent_queries_uses_distinct_on_for_postgresql(self) -> None:
+        """Test that PostgreSQL sessions resolve recent locations in one statement."""
+        mock_session = Mock()
+        mock_session.get_bind.return_value.dialect.name = "postgresql"
+        expected_location = Location(id=7, full_name="臺北市中正區")
+        mock_session.scalars.return_value = iter([expected_location])
+
+        recent_locations = get_recent_queries(mock_session, 1, limit=3)
+
+        assert recent_locations == [expected_location]
+        mock_session.scalars.assert_called_once()
+        mock_session.query.assert_not_called()
+
+    def test_recent_locations_statement_compiles_distinct_on(self) -> None:
+        """Test the PostgreSQL statement de-duplicates, excludes presets and limits."""
+        statement = _recent_locations_statement(user_id=1, limit=5)
+
+        compiled_sql = str(statement.compile(dialect=postgresql.dialect()))
+
+        assert "DISTINCT ON (user_query.location_id)" in compiled_sql
+        assert 'IS DISTINCT FROM "user".home_location_id' in compiled_sql
+        assert 'IS DISTINCT FROM "user".work_location_id' in compiled_sql
+        assert "ORDER BY user_query.location_id, user_query.query_time DESC" in compiled_sql
+        assert "LIMIT" in compiled_sql
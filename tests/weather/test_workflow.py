@@ -6,14 +6,19 @@ from typing import Any
 from unittest.mock import patch
 
 import pytest
-from sqlalchemy import create_engine, select
+from sqlalchemy import create_engine, event, select
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.database import Base
 from app.user.models import User, UserQuery
 from app.weather.location_resolution import QueryOutcome
 from app.weather.models import Location, Weather
-from app.weather.workflow import query_preset, query_shared_location, query_text
+from app.weather.workflow import (
+    preload_hot_forecasts,
+    query_preset,
+    query_shared_location,
+    query_text,
+)
 
 
 @pytest.fixture
@@ -201,3 +206,96 @@ def test_preset_query_without_configured_location(
         session.add(User(line_user_id="blank"))
     result = query_preset("blank", "office", session_factory=factory)
     assert result.outcome == QueryOutcome.PRESET_NOT_SET
+
+
+def test_preset_query_reads_user_location_and_forecast_in_one_statement(
+    workflow_db: tuple[sessionmaker[Session], Location],
+) -> None:
+    """Resolve a preset reply with one SELECT besides the Query History savepoint."""
+    factory, _ = workflow_db
+    engine = factory.kw["bind"]
+    statements: list[str] = []
+
+    def capture(
+        conn: object, cursor: object, statement: str, *args: object, **kwargs: object
+    ) -> None:
+        """Record each statement sent to the database."""
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        result = query_preset("known", "home", session_factory=factory)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert result.outcome == QueryOutcome.FORECAST
+    assert result.selected_location is not None
+    assert result.selected_location.full_name == "臺北市松山區"
+    assert len(result.forecast) == 1
+    reads = [sql for sql in statements if sql.lstrip().upper().startswith(("SELECT", "WITH"))]
+    assert len(reads) == 1
+    assert "preset_user" in reads[0]
+    with factory() as session:
+        assert len(session.scalars(select(UserQuery)).all()) == 1
+
+
+def test_preset_query_ignores_stale_forecast_batch(
+    workflow_db: tuple[sessionmaker[Session], Location],
+) -> None:
+    """Report no weather for a preset whose only batch is outside the freshness window."""
+    factory, _ = workflow_db
+    with factory.begin() as session:
+        session.query(Weather).update({Weather.fetched_at: datetime.now(UTC) - timedelta(hours=7)})
+
+    result = query_preset("known", "office", session_factory=factory)
+
+    assert result.outcome == QueryOutcome.NO_WEATHER
+    assert result.selected_location is not None
+    assert result.forecast == ()
+
+
+def test_preset_query_uses_cached_profile(
+    workflow_db: tuple[sessionmaker[Session], Location],
+) -> None:
+    """Skip the user lookup for cached profiles and the database for unset presets."""
+    factory, _ = workflow_db
+    with factory.begin() as session:
+        session.add(User(line_user_id="blank"))
+    query_text("松山區", "known", session_factory=factory)
+    query_text("松山區", "blank", session_factory=factory)
+    engine = factory.kw["bind"]
+    statements: list[str] = []
+
+    def capture(
+        conn: object, cursor: object, statement: str, *args: object, **kwargs: object
+    ) -> None:
+        """Record each statement sent to the database."""
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        known = query_preset("known", "home", session_factory=factory)
+        blank = query_preset("blank", "home", session_factory=factory)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert known.outcome == QueryOutcome.FORECAST
+    assert blank.outcome == QueryOutcome.PRESET_NOT_SET
+    reads = [sql for sql in statements if sql.lstrip().upper().startswith(("SELECT", "WITH"))]
+    assert len(reads) == 1
+    assert "line_user_id" not in reads[0]
+
+
+def test_preload_hot_forecasts_loads_recently_queried_locations_only(
+    workflow_db: tuple[sessionmaker[Session], Location],
+) -> None:
+    """Preload forecasts of recently queried Locations without recording history."""
+    factory, _ = workflow_db
+    assert preload_hot_forecasts(5, session_factory=factory) == 0
+
+    query_text("松山區", "known", session_factory=factory)
+
+    assert preload_hot_forecasts(5, session_factory=factory) == 1
+    assert preload_hot_forecasts(5, since=timedelta(0), session_factory=factory) == 0
+    with factory() as session:
+        assert len(session.scalars(select(UserQuery)).all()) == 1